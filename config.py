@@ -4,9 +4,14 @@ Configuration Manager for Smutscrape
 """
 import os
 import re
+import threading
 import yaml
 from loguru import logger
 
+DEFAULT_POOL_SIZE       = 1     # drivers kept alive at once
+DEFAULT_MAX_NAVIGATIONS = 50    # page loads before a driver is recycled
+DEFAULT_ACQUIRE_TIMEOUT = 120   # seconds to wait for a free driver before giving up
+
 
 class ConfigManager:
     """Manages the general configuration for Smutscrape."""
@@ -15,7 +20,7 @@ class ConfigManager:
         self._script_dir = script_dir or os.path.dirname(os.path.realpath(__file__))
         self._config_path = self._find_config()
         self._general_config = None
-        self._selenium_driver = None
+        self._driver_pool = None
         self._site_manager = None
         self._download_manager = None
 
@@ -121,13 +126,39 @@ class ConfigManager:
         return self._download_manager
 
     # ------------------------------------------------------------------
-    # Selenium driver
+    # Selenium driver pool
     # ------------------------------------------------------------------
+    @property
+    def driver_pool(self) -> 'DriverPool':
+        if self._driver_pool is None:
+            selenium_config = self.general_config.get('selenium') or {}
+            self._driver_pool = DriverPool(
+                self._create_selenium_driver,
+                size=int(selenium_config.get('pool_size', DEFAULT_POOL_SIZE)),
+                max_navigations=int(selenium_config.get('max_navigations', DEFAULT_MAX_NAVIGATIONS)),
+                acquire_timeout=float(selenium_config.get('acquire_timeout', DEFAULT_ACQUIRE_TIMEOUT)),
+            )
+        return self._driver_pool
+
     def get_selenium_driver(self, force_new: bool = False):
-        """Initialize and return a Selenium WebDriver instance."""
-        if self._selenium_driver is not None and not force_new:
-            return self._selenium_driver
+        """
+        Lease a Selenium driver from the pool for the calling thread.
 
+        Nested calls on the same thread return the same driver; every call
+        should be paired with release_selenium_driver(). With force_new the
+        thread's current driver is discarded and replaced by a fresh one.
+        """
+        if force_new:
+            return self.driver_pool.replace()
+        return self.driver_pool.acquire()
+
+    def release_selenium_driver(self):
+        """Return the calling thread's driver lease to the pool."""
+        if self._driver_pool is not None:
+            self._driver_pool.release()
+
+    def _create_selenium_driver(self):
+        """Start a new Selenium WebDriver instance, or return None on failure."""
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.chrome.service import Service
@@ -189,7 +220,6 @@ class ConfigManager:
                 logger.debug(f"Selenium User-Agent: {driver.execute_script('return navigator.userAgent;')}")
             except Exception:
                 pass
-            self._selenium_driver = driver
 
         return driver
 
@@ -197,11 +227,167 @@ class ConfigManager:
     # Cleanup
     # ------------------------------------------------------------------
     def cleanup(self):
-        """Release resources (Selenium driver, etc.)."""
-        if self._selenium_driver is not None:
-            try:
-                self._selenium_driver.quit()
-                logger.debug("Selenium driver closed.")
-            except Exception:
-                pass
-            self._selenium_driver = None
+        """Release resources (Selenium drivers, etc.)."""
+        if self._driver_pool is not None:
+            self._driver_pool.close()
+            logger.debug("Selenium drivers closed.")
+
+
+class DriverPool:
+    """
+    A small pool of Selenium drivers shared by core, the Browse tab and the
+    download fallback.
+
+    Leases are per thread and re-entrant: a list page and the video pages it
+    processes on the same thread share one driver. Drivers are health-checked
+    when handed out and replaced after ``max_navigations`` page loads (see
+    record_navigation) or when a caller reports a crash via replace().
+    """
+
+    def __init__(self, factory, size: int = DEFAULT_POOL_SIZE,
+                 max_navigations: int = DEFAULT_MAX_NAVIGATIONS,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_navigations = max_navigations
+        self.acquire_timeout = acquire_timeout
+        self._idle = []                 # drivers ready to be leased
+        self._leases = {}               # thread id -> [driver, depth]
+        self._navigations = {}          # id(driver) -> page loads so far
+        self._live = 0                  # drivers currently started (idle + leased)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # -- leasing -------------------------------------------------------------
+
+    def acquire(self, timeout: float = None):
+        """
+        Lease a healthy driver to the calling thread.
+
+        Args:
+            timeout: Seconds to wait when every driver is leased elsewhere
+                (defaults to the pool's acquire_timeout).
+
+        Returns:
+            A WebDriver, or None if none could be started or none freed up in time.
+        """
+        tid = threading.get_ident()
+        with self._cond:
+            lease = self._leases.get(tid)
+            if lease is not None:
+                lease[1] += 1
+                return lease[0]
+            if self._closed:
+                return None
+            wait = self.acquire_timeout if timeout is None else timeout
+            if not self._cond.wait_for(lambda: self._idle or self._live < self.size, timeout=wait):
+                logger.warning(f"[SELENIUM] No driver free after {wait:g}s (pool_size={self.size}).")
+                return None
+            driver = self._idle.pop() if self._idle else None
+            self._live += 0 if driver else 1
+
+        if driver is not None and not self._healthy(driver):
+            logger.info("[SELENIUM] Pooled driver is unresponsive -- starting a new one.")
+            self._navigations.pop(id(driver), None)
+            self._quit(driver)
+            driver = None
+        if driver is None:
+            driver = self._start()
+            if driver is None:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                return None
+
+        with self._cond:
+            self._leases[tid] = [driver, 1]
+        return driver
+
+    def release(self):
+        """End one level of the calling thread's lease; the driver returns to the pool at depth 0."""
+        tid = threading.get_ident()
+        with self._cond:
+            lease = self._leases.get(tid)
+            if lease is None:
+                return
+            lease[1] -= 1
+            if lease[1] > 0:
+                return
+            del self._leases[tid]
+            driver = lease[0]
+            worn = self._navigations.get(id(driver), 0) >= self.max_navigations > 0
+            if not worn and not self._closed:
+                self._idle.append(driver)
+                self._cond.notify()
+                return
+            self._live -= 1
+            self._navigations.pop(id(driver), None)
+            self._cond.notify()
+        if worn:
+            logger.debug(f"[SELENIUM] Recycling driver after {self.max_navigations} navigations.")
+        self._quit(driver)
+
+    def replace(self):
+        """Discard the calling thread's driver (e.g. after a crash) and lease a fresh one in its place."""
+        tid = threading.get_ident()
+        with self._cond:
+            lease = self._leases.get(tid)
+            old = lease[0] if lease else None
+            if old is not None:
+                self._navigations.pop(id(old), None)
+        if lease is None:
+            return self.acquire()
+        self._quit(old)
+        driver = self._start()
+        with self._cond:
+            if driver is None:
+                del self._leases[tid]
+                self._live -= 1
+                self._cond.notify()
+                return None
+            lease[0] = driver
+        return driver
+
+    def current(self):
+        """The driver leased to the calling thread, if any."""
+        lease = self._leases.get(threading.get_ident())
+        return lease[0] if lease else None
+
+    def record_navigation(self, driver):
+        """Count a page load; the driver is recycled on release once it reaches max_navigations."""
+        with self._cond:
+            self._navigations[id(driver)] = self._navigations.get(id(driver), 0) + 1
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def close(self):
+        """Quit idle drivers now; leased ones are quit as their leases end."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for driver in idle:
+            self._navigations.pop(id(driver), None)
+            self._quit(driver)
+
+    def _start(self):
+        driver = self._factory()
+        if driver is not None:
+            self._navigations[id(driver)] = 0
+        return driver
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
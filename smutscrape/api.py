@@ -135,7 +135,8 @@ async def root():
             "/sites/{code}": "Get detailed information about a specific site",
             "/scrape": "Execute a scrape command (returns immediately with task_id)",
             "/tasks/{task_id}": "Get status of a specific task",
-            "/tasks": "List all tasks (optional: ?status=pending/running/completed/failed)"
+            "/tasks": "List all tasks (optional: ?status=pending/running/completed/failed)",
+            "/stats": "Fetch-layer statistics per site (requests, retries, time spent throttled)"
         },
         "notes": [
             "POST /scrape returns immediately with a task_id",
@@ -509,6 +510,13 @@ async def list_tasks(status: Optional[str] = None):
         return tasks
 
 
+@app.get("/stats", response_model=Dict[str, Any])
+async def get_stats():
+    """Get fetch-layer statistics per site"""
+    from smutscrape.network import get_fetch_stats
+    return {key: stats.to_dict() for key, stats in get_fetch_stats().items()}
+
+
 def run_api_server(host: str = "0.0.0.0", port: int = 8000):
     """Run the FastAPI server"""
     if not FASTAPI_AVAILABLE:
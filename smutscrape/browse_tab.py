@@ -14,14 +14,12 @@ Supported sites: xHamster, PornHub, YouPorn, XNXX, XVideos
 import os
 import re
 import io
-import time
 import queue
 import threading
 import datetime
 import urllib.parse
 import urllib.request
 import subprocess
-import random
 import traceback
 from typing import Optional
 
@@ -141,9 +139,10 @@ _DEFAULT_UA = [
 
 def _get_real_driver():
     """
-    Return the cached Selenium driver via the same path core.py uses:
+    Lease a driver from the shared pool via the same path core.py uses:
       get_config_manager().get_selenium_driver()
-    Returns None if unavailable (Chrome not running / selenium not installed).
+    Pair with _release_driver(). Returns None if unavailable (Chrome not
+    running / selenium not installed / every pooled driver busy).
     """
     try:
         from smutscrape.cli import get_config_manager
@@ -153,58 +152,81 @@ def _get_real_driver():
         return None
 
 
-def _fetch_with_selenium(driver, url: str, wait: float = 3.5):
-    """Navigate and return BeautifulSoup, or None on error."""
+def _release_driver():
     try:
-        from bs4 import BeautifulSoup
+        from smutscrape.cli import get_config_manager
+        get_config_manager().release_selenium_driver()
+    except Exception as exc:
+        logger.debug(f"[BROWSE] Driver release failed: {exc}")
+
+
+def _fetch_with_selenium(driver, url: str, wait: float = 3.5, parser: str = "html.parser",
+                         ready_selector: Optional[str] = None, blocked: tuple = ()):
+    """Navigate, wait until the cards render (at most `wait` s) and return a parsed page, or None."""
+    try:
+        from smutscrape.browser import apply_resource_blocking, ready_condition, wait_until_ready
+        from smutscrape.cli import get_config_manager
+        from smutscrape.parsers import make_soup
+        apply_resource_blocking(driver, blocked)
         driver.get(url)
-        time.sleep(wait)
-        return BeautifulSoup(driver.page_source, "html.parser")
+        get_config_manager().driver_pool.record_navigation(driver)
+        wait_until_ready(driver, ready_condition(None, 'list', ready_selector), timeout=wait)
+        return make_soup(driver.page_source, parser)
     except Exception as exc:
         logger.warning(f"[BROWSE] Selenium fetch error: {exc}")
         return None
 
 
-def _fetch_with_cloudscraper(url: str, general_config: dict):
-    """HTTP fetch via cloudscraper (same fallback core.py uses)."""
+def _fetch_with_cloudscraper(url: str, general_config: dict, shortcode: Optional[str] = None):
+    """HTTP fetch via the site's pooled cloudscraper session (shared with core.py)."""
     try:
-        import cloudscraper
-        from bs4 import BeautifulSoup
-        scraper = cloudscraper.create_scraper()
-        ua_list  = general_config.get("user_agents") or _DEFAULT_UA
+        from smutscrape.network import get_http_session, http_get
+        from smutscrape.parsers import make_soup, resolve_parser
+        site     = {"shortcode": shortcode}
+        get_http_session(site, general_config, _DEFAULT_UA)   # pins the session's UA
         headers  = dict(general_config.get("headers") or {})
-        headers.setdefault("User-Agent", random.choice(ua_list))
-        time.sleep(random.uniform(1, 3))
-        resp = scraper.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        return BeautifulSoup(resp.content, "html.parser")
+        resp = http_get(url, site, general_config, headers=headers)
+        if resp is None:
+            return None
+        return make_soup(resp.content, resolve_parser(site, general_config))
     except Exception as exc:
         logger.warning(f"[BROWSE] cloudscraper fetch error: {exc}")
         return None
 
 
-def _fetch_page_browse(url: str, use_selenium: bool, general_config: dict):
+def _fetch_page_browse(url: str, use_selenium: bool, general_config: dict,
+                       shortcode: Optional[str] = None, ready_selector: Optional[str] = None):
     """
     Mirror of core.fetch_page() for the Browse tab:
       1. Try Selenium (if use_selenium and driver available)
       2. Fall back to cloudscraper
-    Returns BeautifulSoup or None.
+    Returns BeautifulSoup (or the selectolax adapter) or None.
     """
-    soup = None
+    from smutscrape.browser import blocked_url_patterns
+    from smutscrape.parsers import resolve_parser
+    soup    = None
+    parser  = resolve_parser({"shortcode": shortcode}, general_config)
+    blocked = blocked_url_patterns(None, general_config)
 
     if use_selenium:
         driver = _get_real_driver()
         if driver is not None:
-            soup = _fetch_with_selenium(driver, url)
-            if soup is None:
-                # Try once more with a fresh driver
-                try:
-                    from smutscrape.cli import get_config_manager
-                    driver2 = get_config_manager().get_selenium_driver(force_new=True)
-                    if driver2:
-                        soup = _fetch_with_selenium(driver2, url)
-                except Exception:
-                    pass
+            try:
+                soup = _fetch_with_selenium(driver, url, parser=parser,
+                                            ready_selector=ready_selector, blocked=blocked)
+                if soup is None:
+                    # Try once more with a fresh driver
+                    try:
+                        from smutscrape.cli import get_config_manager
+                        driver2 = get_config_manager().get_selenium_driver(force_new=True)
+                        if driver2:
+                            soup = _fetch_with_selenium(driver2, url, parser=parser,
+                                                        ready_selector=ready_selector,
+                                                        blocked=blocked)
+                    except Exception:
+                        pass
+            finally:
+                _release_driver()
         else:
             logger.info(
                 "[BROWSE] Chrome/Selenium not available — "
@@ -212,7 +234,7 @@ def _fetch_page_browse(url: str, use_selenium: bool, general_config: dict):
             )
 
     if soup is None:
-        soup = _fetch_with_cloudscraper(url, general_config)
+        soup = _fetch_with_cloudscraper(url, general_config, shortcode)
 
     return soup
 
@@ -544,7 +566,8 @@ class BrowseTab:
         logger.debug(f"[BROWSE] Fetching: {url}")
 
         try:
-            soup = _fetch_page_browse(url, use_selenium, general_config)
+            soup = _fetch_page_browse(url, use_selenium, general_config,
+                                      site_cfg.get("shortcode"), site_cfg.get("card"))
         except Exception as exc:
             logger.error(f"[BROWSE] Unexpected fetch error:\n{traceback.format_exc()}")
             soup = None
@@ -779,6 +802,7 @@ class BrowseTab:
 
     def _dl_worker(self, urls: list, general_config: dict, shortcode: str):
         from smutscrape.core import resolve_download_dir
+        from smutscrape.ytdlp import DEFAULT_FORMAT, embedded, get_ytdlp_engine
         out_dir  = resolve_download_dir(general_config)
         site_dir = os.path.join(out_dir, shortcode)
         os.makedirs(site_dir, exist_ok=True)
@@ -787,6 +811,7 @@ class BrowseTab:
         cookies = general_config.get("cookies_file", "")
         if cookies:
             cookies = os.path.expanduser(cookies)
+        in_process = embedded(None, general_config)
 
         total = len(urls)
         for idx, url in enumerate(urls, 1):
@@ -794,13 +819,35 @@ class BrowseTab:
                 self._dl_queue.put(("status", "Stopped."))
                 break
 
-            self._dl_queue.put(("status",
-                f"Downloading {idx}/{total}: {url.split('/')[-1][:50]}"
-            ))
+            name = url.split('/')[-1][:50]
+            self._dl_queue.put(("status", f"Downloading {idx}/{total}: {name}"))
+            logger.info(f"[BROWSE-DL] {url}")
+
+            if in_process:
+                options = {
+                    "format": DEFAULT_FORMAT,
+                    "merge_output_format": "mp4",
+                    "noplaylist": True,
+                    "outtmpl": out_tpl,
+                }
+                if cookies and os.path.isfile(cookies):
+                    options["cookiefile"] = cookies
+
+                def progress(pct, speed="", eta="", idx=idx, name=name):
+                    self._dl_queue.put(("status",
+                        f"Downloading {idx}/{total}: {name}  {pct:.0f}%  {speed}"
+                    ))
+
+                if get_ytdlp_engine().download(url, options, progress, self._stop_dl) is not None:
+                    logger.success(f"[BROWSE-DL] OK: {url}")
+                    self._dl_queue.put(("done_one", url))
+                else:
+                    logger.error(f"[BROWSE-DL] Failed: {url}")
+                continue
 
             cmd = [
                 "yt-dlp",
-                "--format", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best",
+                "--format", DEFAULT_FORMAT,
                 "--merge-output-format", "mp4",
                 "--no-playlist",
                 "--no-warnings",
@@ -810,7 +857,6 @@ class BrowseTab:
                 cmd += ["--cookies", cookies]
             cmd.append(url)
 
-            logger.info(f"[BROWSE-DL] {url}")
             try:
                 proc = subprocess.run(
                     cmd, capture_output=True, text=True, timeout=600
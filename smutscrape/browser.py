@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Browser Helpers for Smutscrape
+
+Page-readiness waits for Selenium loads. Instead of sleeping a fixed time
+after every driver.get(), callers poll a readiness condition and return as
+soon as it holds; the old sleep survives only as the timeout ceiling.
+
+A site YAML declares its condition with a `ready:` block, either flat (used
+for every page) or split per page kind:
+
+    ready:
+      list:
+        selector: "div.video-list"        # element present (a list means any of them)
+      video:
+        script: "return !!window.player"  # JS predicate
+        network_idle: 0.5                 # seconds with no new resource loads
+        timeout: 6                        # override the ceiling
+
+All checks given in a condition must hold. Without a `ready:` block, list
+pages wait for their video_container selector and other pages for the
+network to go idle.
+
+solve_challenge() is the browser half of the Selenium-to-HTTP handoff
+(network.clear_challenge): it waits out an anti-bot interstitial and hands
+back the cookies and User-Agent that cleared it.
+
+Resource blocking: a site's `block_resources:` list (resource types from
+RESOURCE_TYPES and/or raw URL globs) is applied to the pooled driver
+through CDP Network.setBlockedURLs before each of that site's page loads,
+so listing pages don't pull images, fonts, ads and previews we never read.
+A top-level `block_resources:` in config.yaml is the default for sites
+that don't set their own.
+
+In-page extraction: with `extract_in_browser: true` (site YAML, or
+config.yaml as the default) the compiled scraper selectors run inside the
+page in one execute_script call that returns only the raw field values,
+instead of serializing the DOM through page_source and re-parsing it.
+Pages or plans the browser can't answer (iframe fields, :contains(), a
+container that doesn't match) fall back to page_source transparently.
+"""
+
+import functools
+import json
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from smutscrape.extraction import BrowserFields
+from smutscrape.parsers import SOUPSIEVE_ONLY
+
+READY_CHECKS = ('selector', 'script', 'network_idle')
+DEFAULT_NETWORK_IDLE = 0.5   # seconds without new resource requests
+POLL_INTERVAL = 0.1
+
+# One round trip per poll: document state, which selectors match, resource count.
+_PROBE_JS = """
+const sels = arguments[0];
+function has(s) { try { return !!document.querySelector(s); } catch (e) { return false; } }
+return [document.readyState, sels.map(has), performance.getEntriesByType('resource').length];
+"""
+
+
+def ready_condition(site_config: Optional[Dict[str, Any]], page: str = 'list',
+                    default_selector=None) -> Dict[str, Any]:
+    """
+    Resolve the readiness condition for a page kind.
+
+    Args:
+        site_config: Raw site dict (may carry a `ready:` block).
+        page: 'list' or 'video'.
+        default_selector: Selector (or list) to wait for when the site
+            declares nothing, e.g. the list page's video_container.
+
+    Returns:
+        Condition dict for wait_until_ready().
+    """
+    ready = (site_config or {}).get('ready') or {}
+    if isinstance(ready.get(page), dict):
+        condition = dict(ready[page])
+    else:
+        condition = {k: v for k, v in ready.items() if k not in ('list', 'video')}
+    if not any(k in condition for k in READY_CHECKS):
+        if default_selector:
+            condition['selector'] = default_selector
+        else:
+            condition['network_idle'] = DEFAULT_NETWORK_IDLE
+    return condition
+
+
+def wait_until_ready(driver, condition: Optional[Dict[str, Any]], timeout: float) -> float:
+    """
+    Block until the page satisfies the condition, or the timeout runs out.
+
+    An empty condition just waits for document.readyState == 'complete'.
+
+    Args:
+        driver: Selenium WebDriver that has just navigated.
+        condition: Dict from ready_condition() (or hand-built).
+        timeout: Ceiling in seconds; a `timeout` key in the condition wins.
+
+    Returns:
+        Seconds spent waiting.
+    """
+    condition = condition or {}
+    timeout = float(condition.get('timeout', timeout))
+    selectors: List[str] = condition.get('selector') or []
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    script = condition.get('script')
+    idle = condition.get('network_idle')
+
+    start = time.monotonic()
+    deadline = start + timeout
+    last_count, last_change = None, start
+    while True:
+        now = time.monotonic()
+        try:
+            state, matches, count = driver.execute_script(_PROBE_JS, selectors)
+            if count != last_count:
+                last_count, last_change = count, now
+            ready = (
+                (not selectors or any(matches))
+                and (idle is None or (state == 'complete' and now - last_change >= float(idle)))
+                and (script is None or bool(driver.execute_script(script)))
+                and (selectors or script or idle is not None or state == 'complete')
+            )
+        except Exception as e:
+            logger.debug(f"[READY] Probe failed: {e}")
+            ready = False
+        if ready:
+            waited = time.monotonic() - start
+            logger.debug(f"[READY] Page ready after {waited:.2f}s")
+            return waited
+        if now >= deadline:
+            logger.debug(f"[READY] Condition not met within {timeout:g}s; continuing with the page as is.")
+            return now - start
+        time.sleep(min(POLL_INTERVAL, max(0.0, deadline - now)))
+
+
+def resource_seen_script(fragment: str) -> str:
+    """JS predicate that holds once the page has requested a URL containing fragment."""
+    return ("return performance.getEntriesByType('resource')"
+            f".some(e => e.name.includes({fragment!r}));")
+
+
+def solve_challenge(driver, url: str, timeout: float = 30) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Load url and wait for its anti-bot challenge to clear.
+
+    Args:
+        driver: Selenium WebDriver.
+        url: Page that answered plain HTTP with a challenge.
+        timeout: Seconds to wait for the challenge to go away.
+
+    Returns:
+        (navigator.userAgent, driver.get_cookies()) once the real page is
+        showing, or None if it never did.
+    """
+    from smutscrape.network import CHALLENGE_MARKERS
+    condition = {'script': (
+        "if (document.readyState !== 'complete') return false;"
+        "const head = document.documentElement.outerHTML.slice(0, 4096);"
+        f"return !{json.dumps(CHALLENGE_MARKERS)}.some(m => head.includes(m));"
+    )}
+    try:
+        driver.get(url)
+        waited = wait_until_ready(driver, condition, timeout)
+        if not driver.execute_script(condition['script']):
+            logger.warning(f"[CLEARANCE] Challenge on {url} still showing after {waited:.0f}s")
+            return None
+        return driver.execute_script('return navigator.userAgent'), driver.get_cookies()
+    except Exception as e:
+        logger.error(f"[CLEARANCE] Browser could not load {url}: {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Resource blocking
+# ---------------------------------------------------------------------------
+
+RESOURCE_TYPES = {
+    'image':      ['*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.png', '*.png?*', '*.gif', '*.gif?*',
+                   '*.webp', '*.webp?*', '*.avif', '*.avif?*', '*.svg', '*.svg?*', '*.ico', '*.ico?*'],
+    'font':       ['*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+                   '*.eot', '*.eot?*'],
+    'stylesheet': ['*.css', '*.css?*'],
+    'media':      ['*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.m4s', '*.m4s?*', '*.ts?*', '*.mp3', '*.mp3?*'],
+    'ads':        ['*doubleclick.net*', '*googlesyndication.com*', '*google-analytics.com*',
+                   '*googletagmanager.com*', '*exoclick.com*', '*exosrv.com*', '*trafficjunky.*',
+                   '*juicyads.com*', '*adsterra*', '*popads.net*', '*tsyndicate.com*'],
+}
+
+# Patterns currently installed on each driver, so unchanged lists cost no CDP round trip.
+_blocked: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_blocked_lock = threading.Lock()
+
+
+def blocked_url_patterns(site_config: Optional[Dict[str, Any]],
+                         general_config: Optional[Dict[str, Any]] = None) -> Tuple[str, ...]:
+    """
+    Expand a site's `block_resources` (falling back to the global one) into URL globs.
+
+    Args:
+        site_config: Raw site dict.
+        general_config: General config, for the global default.
+
+    Returns:
+        Sorted, de-duplicated tuple of CDP URL patterns (empty = block nothing).
+    """
+    entries = (site_config or {}).get('block_resources')
+    if entries is None:
+        entries = (general_config or {}).get('block_resources')
+    if isinstance(entries, str):
+        entries = [entries]
+    patterns = set()
+    for entry in entries or []:
+        entry = str(entry).strip()
+        if entry.lower() in RESOURCE_TYPES:
+            patterns.update(RESOURCE_TYPES[entry.lower()])
+        elif entry:
+            patterns.add(entry)
+    return tuple(sorted(patterns))
+
+
+def apply_resource_blocking(driver, patterns: Tuple[str, ...]) -> bool:
+    """
+    Install the URL block list on a Chrome driver (no-op when already installed).
+
+    Returns:
+        False if the driver doesn't speak CDP (e.g. some remote grids).
+    """
+    with _blocked_lock:
+        try:
+            if _blocked.get(driver) == patterns:
+                return True
+        except TypeError:
+            pass
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+    except Exception as e:
+        logger.debug(f"[BLOCK] Could not set blocked URLs: {e}")
+        return False
+    with _blocked_lock:
+        try:
+            _blocked[driver] = patterns
+        except TypeError:
+            pass
+    if patterns:
+        logger.debug(f"[BLOCK] Blocking {len(patterns)} URL patterns")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# In-page extraction
+# ---------------------------------------------------------------------------
+
+# Mirrors FieldPlan.elements()/raw_values(): texts follow BeautifulSoup's
+# .text (script/style contents of descendants are left out).
+_EXTRACT_JS = """
+const [spec, list] = arguments;
+function text(el) {
+  if (el.nodeType !== 1 || /^(SCRIPT|STYLE)$/.test(el.tagName) || !el.querySelector('script,style'))
+    return el.textContent;
+  let out = '';
+  const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+  while (walker.nextNode()) {
+    const owner = walker.currentNode.parentElement.closest('script,style');
+    if (!owner || !el.contains(owner) || owner === el) out += walker.currentNode.data;
+  }
+  return out;
+}
+function attr(el, name) {
+  if (!el.getAttribute) return null;
+  const v = el.getAttribute(name);
+  return (name === 'class' && v !== null) ? v.split(/\\s+/).filter(Boolean) : v;
+}
+function pick(root, f) {
+  if (f.mode === 'self') return [root];
+  for (const s of f.selectors) {
+    const found = f.all ? Array.from(root.querySelectorAll(s)) : [root.querySelector(s)].filter(Boolean);
+    if (found.length) return found;
+  }
+  return [];
+}
+function fields(root) {
+  const out = {};
+  for (const f of spec) {
+    const els = pick(root, f);
+    out[f.name] = f.attribute ? els.map(e => attr(e, f.attribute)) : els.map(text);
+  }
+  return out;
+}
+try {
+  if (!list) return {fields: fields(document)};
+  let container = null;
+  for (const s of list.containers) { container = document.querySelector(s); if (container) break; }
+  if (!container) return null;
+  const items = Array.from(container.querySelectorAll(list.item));
+  if (!items.length) return null;
+  let next = null;
+  if (list.next) { const n = document.querySelector(list.next); if (n) next = n.getAttribute(list.next_attr); }
+  return {items: items.map(fields), next: next};
+} catch (e) {
+  return {error: String(e)};
+}
+"""
+
+
+class BrowserListPage(NamedTuple):
+    """A list page extracted in the browser: one BrowserFields per item, plus the next-page link."""
+    items: List[BrowserFields]
+    next_page: Optional[str]
+
+
+def _browser_selector(selector) -> bool:
+    return isinstance(selector, str) and bool(selector.strip()) and \
+        not any(token in selector for token in SOUPSIEVE_ONLY)
+
+
+def extract_in_browser(driver, spec: List[Dict[str, Any]],
+                       list_spec: Optional[Dict[str, Any]] = None):
+    """
+    Run the extraction script in the current page.
+
+    Args:
+        driver: Selenium WebDriver on the loaded page.
+        spec: ExtractionPlan.browser_spec() of the page (or list item) fields.
+        list_spec: For list pages: container selectors, item selector and
+            the optional next-page selector/attribute.
+
+    Returns:
+        BrowserFields (video pages), BrowserListPage (list pages), or None
+        when the page should be read through page_source instead.
+    """
+    try:
+        result = driver.execute_script(_EXTRACT_JS, spec, list_spec)
+    except Exception as e:
+        logger.debug(f"[EXTRACT] In-page extraction failed: {e}")
+        return None
+    if not result:
+        logger.debug("[EXTRACT] In-page extraction matched nothing -- reading page source.")
+        return None
+    if 'error' in result:
+        logger.debug(f"[EXTRACT] In-page extraction failed: {result['error']}")
+        return None
+    if list_spec is None:
+        return BrowserFields(result['fields'])
+    return BrowserListPage([BrowserFields(item) for item in result['items']], result.get('next'))
+
+
+def browser_extractor(plan, site_config: Optional[Dict[str, Any]],
+                      general_config: Optional[Dict[str, Any]] = None,
+                      container=None, item: Optional[str] = None,
+                      next_page: Optional[Dict[str, Any]] = None) -> Optional[Callable]:
+    """
+    Build the `in_browser` hook for core.fetch_markup(), if the site wants one.
+
+    Args:
+        plan: ExtractionPlan of the video scraper, or of the list item fields.
+        site_config: Raw site dict (`extract_in_browser` key).
+        general_config: General config, for the global default.
+        container: List pages only: video_container selector (or list).
+        item: List pages only: video_item selector.
+        next_page: List pages only: pagination.next_page config.
+
+    Returns:
+        A callable taking the driver, or None when in-page extraction is
+        off or the selectors need the Python engine.
+    """
+    enabled = (site_config or {}).get('extract_in_browser')
+    if enabled is None:
+        enabled = (general_config or {}).get('extract_in_browser', False)
+    if not enabled:
+        return None
+    spec = plan.browser_spec()
+    list_spec = None
+    if item is not None:
+        containers = container if isinstance(container, list) else [container]
+        list_spec = {'containers': containers, 'item': item, 'next': None, 'next_attr': 'href'}
+        if next_page and next_page.get('selector'):
+            list_spec['next'] = next_page['selector']
+            list_spec['next_attr'] = next_page.get('attribute', 'href')
+        selectors = containers + [item] + ([list_spec['next']] if list_spec['next'] else [])
+        if not all(_browser_selector(s) for s in selectors):
+            spec = None
+    if spec is None:
+        logger.debug(f"[EXTRACT] {(site_config or {}).get('name', 'site')}: selectors need page source; "
+                     "in-page extraction skipped.")
+        return None
+    return functools.partial(extract_in_browser, spec=spec, list_spec=list_spec)
@@ -17,8 +17,9 @@ from smutscrape.utilities import (
     display_global_examples, display_usage, handle_vpn, console,
     is_url
 )
-from smutscrape.core import process_url, process_list_page, process_video_page
+from smutscrape.core import process_url, process_list_pages, process_video_page
 from smutscrape.sites import SiteConfiguration
+from smutscrape.network import get_fetch_stats
 
 # Global manager instances
 config_manager = None
@@ -37,7 +38,9 @@ def get_session_manager():
     if session_manager is None:
         script_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
         state_file = os.path.join(script_dir, '.state')
-        session_manager = SessionManager(state_file)
+        ledger_file = (get_config_manager().general_config or {}).get('ledger_file')
+        get_site_manager()   # registers each site's URL rules, which the ledger's keys depend on
+        session_manager = SessionManager(state_file, os.path.expanduser(ledger_file) if ledger_file else None)
     return session_manager
 
 def get_site_manager():
@@ -63,6 +66,9 @@ def get_available_modes(site_config):
 
 def cleanup(general_config):
     """Clean up resources like Selenium driver."""
+    for key, stats in get_fetch_stats().items():
+        if stats.requests:
+            logger.info(f"[HTTP] {key}: {stats.summary()}")
     get_config_manager().cleanup()
     print()
 
@@ -77,7 +83,7 @@ def handle_single_arg(arg, general_config, args, term_width, state_set):
             render_ascii(config.get("domain", "unknown"), general_config, term_width)
             console.print()
             # Pass filters to process_url
-            process_url(arg, config, general_config, args.overwrite, args.re_nfo, args.page, apply_state=args.applystate, state_set=state_set, after_date=args.after, min_duration=args.min_duration)
+            process_url(arg, config, general_config, args.overwrite, args.re_nfo, args.page, apply_state=args.applystate, state_set=state_set, after_date=args.after, min_duration=args.min_duration, fan_out=args.fan_out or None, incremental=args.incremental or None)
         else:
             site_obj = get_site_manager().get_site_by_identifier(arg)
             if site_obj:
@@ -129,31 +135,20 @@ def handle_multi_arg(args, general_config, args_obj, state_set):
         mode_config["url_pattern_pages"] if page_num > 1 and "url_pattern_pages" in mode_config else mode_config["url_pattern"],
         site_config,
         mode=mode,
+        filters={'after': args_obj.after, 'min_duration': args_obj.min_duration},
         **kwargs_for_url
     )
     
     if mode == 'video':
         process_video_page(constructed_url, site_config, general_config, args_obj.overwrite, general_config.get('headers', {}), args_obj.re_nfo, apply_state=args_obj.applystate, state_set=state_set)
     else:
-        current_url_to_process = constructed_url
-        current_page_num_for_list = page_num
-        current_video_offset_for_list = video_offset
-        
-        while current_url_to_process:
-            next_page_url, next_page_number, page_processed_successfully = process_list_page(
-                current_url_to_process, site_config, general_config, 
-                current_page_num_for_list, current_video_offset_for_list,
-                mode, identifier, args_obj.overwrite, general_config.get('headers', {}), 
-                args_obj.re_nfo, apply_state=args_obj.applystate, state_set=state_set,
-                after_date=args_obj.after, min_duration=args_obj.min_duration
-            )
-            current_video_offset_for_list = 0 
-            current_url_to_process = next_page_url
-            if next_page_number: current_page_num_for_list = next_page_number
-            else: current_url_to_process = None
-            if current_url_to_process:
-                import time
-                time.sleep(general_config['sleep']['between_pages'])
+        process_list_pages(
+            constructed_url, site_config, general_config, page_num, video_offset,
+            mode, identifier, args_obj.overwrite, general_config.get('headers', {}),
+            args_obj.re_nfo, apply_state=args_obj.applystate, state_set=state_set,
+            after_date=args_obj.after, min_duration=args_obj.min_duration,
+            fan_out=args_obj.fan_out or None, incremental=args_obj.incremental or None
+        )
 
 def main():
     """Main CLI entry point."""
@@ -166,6 +161,8 @@ def main():
     parser.add_argument("-a", "--applystate", action="store_true", help="Apply state.")
     parser.add_argument("-A", "--after", type=str, help="Filter videos uploaded after YYYY-MM-DD.")
     parser.add_argument("-D", "--min-duration", type=float, help="Filter videos longer than X minutes.")
+    parser.add_argument("-F", "--fan-out", action="store_true", help="Find the last list page and read pages concurrently.")
+    parser.add_argument("-I", "--incremental", action="store_true", help="Stop paginating at videos already processed by an earlier run.")
     parser.add_argument("--gui", action="store_true", help="Launch the graphical user interface.")
 
     args = parser.parse_args()
@@ -187,12 +184,15 @@ def main():
     args.page_num = int(page_parts[0])
     args.video_offset = int(page_parts[1]) if len(page_parts) > 1 else 0
     
-    if len(args.args) == 1:
-        handle_single_arg(args.args[0], general_config, args, term_width, state_set)
-    elif len(args.args) >= 2:
-        handle_multi_arg(args.args, general_config, args, state_set)
-    else:
-        display_usage(term_width, get_site_manager().generate_global_table(term_width))
+    try:
+        if len(args.args) == 1:
+            handle_single_arg(args.args[0], general_config, args, term_width, state_set)
+        elif len(args.args) >= 2:
+            handle_multi_arg(args.args, general_config, args, state_set)
+        else:
+            display_usage(term_width, get_site_manager().generate_global_table(term_width))
+    finally:
+        cleanup(general_config)
 
 if __name__ == "__main__":
     main()
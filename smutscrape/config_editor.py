@@ -394,7 +394,16 @@ class ConfigEditor(tk.Toplevel):
         _section_header(tab, 'Sleep Delays')
         _hint(tab, 'Seconds to wait between actions to avoid overloading sites.')
         self._field(tab, 'Between videos (s):', 'sleep_between_videos', width=8)
-        self._field(tab, 'Between pages (s):', 'sleep_between_pages', width=8)
+        self._field(tab, 'Between pages (s):', 'sleep_between_pages', width=8,
+                    hint='only waits for what is left since the last request')
+
+        _section_header(tab, 'Request Rate (per domain)')
+        _hint(tab, 'Token bucket applied before every page fetch. Site YAMLs may override with rate:.')
+        self._field(tab, 'Requests per second:', 'rate_rps', width=8)
+        self._field(tab, 'Burst:', 'rate_burst', width=8,
+                    hint='back-to-back requests after idle')
+        self._field(tab, 'Jitter (s):', 'rate_jitter', width=8,
+                    hint='random extra wait when throttled')
 
     # ------------------------------------------------------------------
     # ── TAB: Naming
@@ -432,6 +441,12 @@ class ConfigEditor(tk.Toplevel):
         self._field(tab, 'Remote host:', 'selenium_remote_host', width=22)
         self._field(tab, 'Remote port:', 'selenium_remote_port', width=8)
 
+        _section_header(tab, 'Driver pool')
+        self._field(tab, 'Pool size:', 'selenium_pool_size', width=8,
+                    hint='browsers kept open and reused between pages')
+        self._field(tab, 'Max navigations:', 'selenium_max_navigations', width=8,
+                    hint='page loads before a browser is restarted')
+
     # ------------------------------------------------------------------
     # ── TAB: VPN
     # ------------------------------------------------------------------
@@ -563,6 +578,10 @@ class ConfigEditor(tk.Toplevel):
         sl = cfg.get('sleep', {})
         self._widgets['sleep_between_videos'].set(str(sl.get('between_videos', 3)))
         self._widgets['sleep_between_pages'].set(str(sl.get('between_pages', 5)))
+        rate = cfg.get('rate', {})
+        self._widgets['rate_rps'].set(str(rate.get('rps', 0.5)))
+        self._widgets['rate_burst'].set(str(rate.get('burst', 1)))
+        self._widgets['rate_jitter'].set(str(rate.get('jitter', 1.0)))
 
         # ── Naming ──
         fn = cfg.get('file_naming', {})
@@ -583,6 +602,8 @@ class ConfigEditor(tk.Toplevel):
             sel.get('host', '127.0.0.1'))
         self._widgets['selenium_remote_port'].set(
             str(sel.get('port', '4444')))
+        self._widgets['selenium_pool_size'].set(str(sel.get('pool_size', 1)))
+        self._widgets['selenium_max_navigations'].set(str(sel.get('max_navigations', 50)))
 
         # ── VPN ──
         vpn = cfg.get('vpn', {})
@@ -639,6 +660,12 @@ class ConfigEditor(tk.Toplevel):
         except (ValueError, TypeError):
             return default
 
+    def _float(self, key, default=0.0):
+        try:
+            return float(self._get(key, str(default)))
+        except (ValueError, TypeError):
+            return default
+
     def _save(self):
         cfg = copy.deepcopy(self._cfg)
 
@@ -662,6 +689,11 @@ class ConfigEditor(tk.Toplevel):
             'between_videos': self._int('sleep_between_videos', 3),
             'between_pages':  self._int('sleep_between_pages', 5),
         }
+        cfg['rate'] = {
+            'rps':    self._float('rate_rps', 0.5),
+            'burst':  self._int('rate_burst', 1),
+            'jitter': self._float('rate_jitter', 1.0),
+        }
 
         # ── Naming ──
         cfg['file_naming'] = {
@@ -671,7 +703,10 @@ class ConfigEditor(tk.Toplevel):
         }
 
         # ── Selenium ──
-        sel = {'mode': self._get('selenium_mode', 'local')}
+        sel = dict(cfg.get('selenium') or {})
+        for key in ('chromedriver_path', 'chrome_binary', 'host', 'port'):
+            sel.pop(key, None)
+        sel['mode'] = self._get('selenium_mode', 'local')
         cd = self._get('selenium_chromedriver').strip()
         cb = self._get('selenium_chrome_binary').strip()
         rh = self._get('selenium_remote_host').strip()
@@ -680,6 +715,8 @@ class ConfigEditor(tk.Toplevel):
         if cb: sel['chrome_binary']     = cb
         if rh: sel['host']              = rh
         if rp: sel['port']              = rp
+        sel['pool_size']       = self._int('selenium_pool_size', 1)
+        sel['max_navigations'] = self._int('selenium_max_navigations', 50)
         cfg['selenium'] = sel
 
         # ── VPN ──
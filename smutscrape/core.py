@@ -5,15 +5,15 @@ Core Processing Module for Smutscrape
 
 import os
 import re
-import time
-import random
+import calendar
 import datetime
 import tempfile
+import threading
 import subprocess
 import urllib.parse
 import feedparser
+from collections import deque
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 from loguru import logger
 from termcolor import colored
 
@@ -24,13 +24,36 @@ except ImportError:
     SELENIUM_AVAILABLE = False
 
 from smutscrape.utilities import (
-    get_terminal_width, is_url, handle_vpn, pattern_to_regex,
+    canonical_url, get_terminal_width, is_url, handle_vpn, pattern_to_regex,
     should_ignore_video, construct_filename
 )
 from smutscrape.metadata import finalize_metadata, generate_nfo
 from smutscrape.session import is_url_processed
+from smutscrape.ledger import DOWNLOADING, DONE, FAILED, DownloadLedger
+from smutscrape.network import get_http_session, get_rate_limiter, handoff_enabled, throttle, http_get
+from smutscrape.parsers import make_soup, resolve_parser, scope_strainer
+from smutscrape.extraction import BrowserFields, get_extraction_plan
+from smutscrape.pipeline import Pipeline, pipeline_settings
+from smutscrape.scheduler import get_download_scheduler, popen_kwargs
+from smutscrape.prefetch import Prefetcher, prefetch_depth
+from smutscrape.fanout import PageFanout, fanout_settings
+from smutscrape.incremental import (
+    DateCutoff, IncrementalSync, date_cutoff_items, date_sorted, incremental_settings,
+)
+from smutscrape.probe import get_probe_service, probe_settings, take_probed_info
+from smutscrape.ytdlp import (
+    DEFAULT_FORMAT, cookies_file, downloaded_files as ytdlp_output_files, embedded,
+    get_ytdlp_engine, rate_limit_bytes, write_info_json
+)
+from smutscrape.browser import (
+    BrowserListPage, apply_resource_blocking, blocked_url_patterns, browser_extractor,
+    ready_condition, wait_until_ready
+)
 from smutscrape.sites import SiteConfiguration
 
+# Held while a pipeline worker prints a multi-line block (item headers).
+_console_lock = threading.Lock()
+
 
 def get_config_manager():
     from smutscrape.cli import get_config_manager as _get_config_manager
@@ -44,19 +67,44 @@ def get_storage_manager():
     from smutscrape.storage import get_storage_manager as _get_storage_manager
     return _get_storage_manager()
 
+def browser_fetches(site_config, general_config):
+    """True if pages of this site are loaded in Selenium (not just its challenges)."""
+    return bool(site_config.get('use_selenium', False)) and not handoff_enabled(site_config, general_config)
+
 def get_selenium_driver(general_config, force_new=False):
     return get_config_manager().get_selenium_driver(force_new=force_new)
 
+def release_selenium_driver():
+    get_config_manager().release_selenium_driver()
+
 
 # ---------------------------------------------------------------------------
 # Filter helpers
 # ---------------------------------------------------------------------------
 
-def parse_date_loose(date_str):
+# "3 days ago", "an hour ago", ... as printed on list pages. Units are their shortest
+# length, so the date computed is never earlier than the one the site means.
+_RELATIVE_DATE_RE = re.compile(
+    r"\b(\d+|an?|one)\s*(second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b", re.IGNORECASE)
+_RELATIVE_DAYS = {'second': 0, 'sec': 0, 'minute': 0, 'min': 0, 'hour': 0, 'hr': 0,
+                  'day': 1, 'week': 7, 'month': 28, 'year': 365}
+
+def _end_of_month(year, month):
+    return datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+def parse_date_loose(date_str, latest=False):
+    """
+    Parse a listed or probed date in whatever form the site gives it, or None.
+
+    A date given only to the month or year ("2024-03", "2024") is its first
+    day, or with `latest` its last day -- the latest date the text can mean,
+    which filters use so that a video is only dropped when it is definitely
+    older. Relative dates ("3 days ago", "yesterday") count from today.
+    """
     if not date_str:
         return None
     date_str = str(date_str).strip()
-    for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d", "%Y-%m", "%Y",
+    for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d",
                 "%Y%m%d",
                 "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y",
                 "%m/%d/%Y", "%d/%m/%Y"]:
@@ -64,13 +112,31 @@ def parse_date_loose(date_str):
             return datetime.datetime.strptime(date_str[:20], fmt).date()
         except (ValueError, TypeError):
             continue
+    for fmt in ["%Y-%m", "%B %Y", "%b %Y"]:
+        try:
+            parsed = datetime.datetime.strptime(date_str[:20], fmt).date()
+            return _end_of_month(parsed.year, parsed.month) if latest else parsed
+        except (ValueError, TypeError):
+            continue
+    today = datetime.date.today()
+    lowered = date_str.lower()
+    if lowered in ('today', 'just now', 'now'):
+        return today
+    if lowered == 'yesterday':
+        return today - datetime.timedelta(days=1)
+    m = _RELATIVE_DATE_RE.search(date_str)
+    if m:
+        count = int(m.group(1)) if m.group(1).isdigit() else 1
+        return today - datetime.timedelta(days=count * _RELATIVE_DAYS[m.group(2).lower()])
     m = re.search(r"(\d{4})[-/](\d{1,2})", date_str)
     if m:
-        try: return datetime.date(int(m.group(1)), int(m.group(2)), 1)
+        try:
+            year, month = int(m.group(1)), int(m.group(2))
+            return _end_of_month(year, month) if latest else datetime.date(year, month, 1)
         except ValueError: pass
     m = re.search(r"(\d{4})", date_str)
     if m:
-        try: return datetime.date(int(m.group(1)), 1, 1)
+        try: return datetime.date(int(m.group(1)), 12 if latest else 1, 31 if latest else 1)
         except ValueError: pass
     return None
 
@@ -105,7 +171,7 @@ def video_passes_filters(video_data, after_threshold, min_duration_minutes):
     if after_threshold is not None:
         raw_date = video_data.get("date", "")
         if raw_date:
-            video_date = parse_date_loose(raw_date)
+            video_date = parse_date_loose(raw_date, latest=True)
             if video_date is not None and video_date < after_threshold:
                 logger.info(f"[FILTER] Skipping (date {video_date} < {after_threshold}): {video_data.get('url','?')}")
                 return False
@@ -125,89 +191,41 @@ def video_passes_filters(video_data, after_threshold, min_duration_minutes):
 
 def _probe_metadata_ytdlp(page_url, general_config, site_config=None, cookies=None):
     """
-    Run ``yt-dlp --print duration --print upload_date`` on *page_url*.
+    Ask yt-dlp for *page_url*'s duration and upload date (see probe.py).
     Returns (duration_minutes: float|None, upload_date: datetime.date|None).
-    Takes ~1-3 s and does NOT download anything.
+    Takes ~1-3 s and does NOT download anything; answered from the probe
+    cache, or from a batch already started for the list page, when possible.
     Called only when HTML scraping produced no duration/date AND a filter
     is active.  Fully invisible for sites that already expose those fields.
-
-    NOTE: --no-warnings suppresses the xhamster impersonation advisory
-    (which is just informational, not an error -- downloads work fine
-    without curl_cffi).
     """
-    cmd = [
-        'yt-dlp',
-        '--no-download',
-        '--no-playlist',
-        '--print', 'duration',
-        '--print', 'upload_date',
-        '--quiet',
-        '--no-warnings',
-    ]
-
-    # Resolve cookies: explicit arg > general_config > site_config
-    if not cookies:
-        cookies = (general_config or {}).get('cookies_file') or \
-                  (site_config   or {}).get('cookies_file')
     if cookies:
         cookies = os.path.expanduser(cookies)
-    if cookies and os.path.isfile(cookies):
-        cmd += ['--cookies', cookies]
-        logger.debug(f"[PROBE] Using cookies: {cookies}")
-    elif cookies:
-        logger.warning(f"[PROBE] cookies_file not found: {cookies}")
+        if not os.path.isfile(cookies):
+            logger.warning(f"[PROBE] cookies_file not found: {cookies}")
+            cookies = None
 
-    cmd.append(page_url)
-
-    logger.info(f"[PROBE] yt-dlp metadata probe \u2192 {page_url}")
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True, text=True, timeout=30
-        )
-        lines = [l.strip() for l in result.stdout.strip().splitlines() if l.strip()]
-        # yt-dlp prints values in --print order:
-        #   line 0 = duration (seconds as float, or 'NA')
-        #   line 1 = upload_date (YYYYMMDD, or 'NA')
-        dur_min  = None
-        upl_date = None
-
-        if len(lines) >= 1 and lines[0] not in ('NA', 'none', 'None', ''):
-            try:
-                dur_min = float(lines[0]) / 60.0
-            except ValueError:
-                pass
-
-        if len(lines) >= 2 and lines[1] not in ('NA', 'none', 'None', ''):
-            upl_date = parse_date_loose(lines[1])
-
-        # Log what was resolved
-        dur_str  = f"{dur_min:.1f} min" if dur_min is not None else "N/A"
-        date_str = str(upl_date)         if upl_date is not None else "N/A"
-        logger.info(f"[PROBE] duration={dur_str}  upload_date={date_str}")
+    result = get_probe_service(general_config).get(page_url, site_config, general_config, cookies=cookies)
+    if result is None:
+        return None, None
+    dur_min  = result['duration'] / 60.0 if result.get('duration') else None
+    upl_date = parse_date_loose(result.get('upload_date'))
 
-        # Warn if probe returned nothing -- likely needs cookies or login
-        if dur_min is None and upl_date is None and result.returncode != 0:
-            stderr = result.stderr.strip()
-            if stderr:
-                logger.warning(f"[PROBE] yt-dlp stderr: {stderr[:400]}")
-            else:
-                logger.warning(
-                    f"[PROBE] yt-dlp returned no data (rc={result.returncode}). "
-                    "Site may require cookies/login for metadata."
-                )
+    # Log what was resolved
+    dur_str  = f"{dur_min:.1f} min" if dur_min is not None else "N/A"
+    date_str = str(upl_date)         if upl_date is not None else "N/A"
+    logger.info(f"[PROBE] duration={dur_str}  upload_date={date_str}")
+    return dur_min, upl_date
 
-        return dur_min, upl_date
 
-    except FileNotFoundError:
-        logger.warning("[PROBE] yt-dlp not found -- metadata probe skipped.")
-        return None, None
-    except subprocess.TimeoutExpired:
-        logger.warning(f"[PROBE] yt-dlp probe timed out for {page_url}")
-        return None, None
-    except Exception as exc:
-        logger.warning(f"[PROBE] yt-dlp probe error: {exc}")
-        return None, None
+def _needs_probe(video_data, site_config, after_threshold, min_dur_minutes, general_config=None):
+    """True if a filter needs a field that neither the list item nor the video page scraper provides."""
+    if lazy_video_page(site_config, general_config):
+        video_scraper = {}   # the video page is never scraped
+    else:
+        video_scraper = site_config.get('scrapers', {}).get('video_scraper', {})
+    if after_threshold is not None and not video_data.get('date') and 'date' not in video_scraper:
+        return True
+    return bool(min_dur_minutes) and not video_data.get('duration') and 'duration' not in video_scraper
 
 
 # ---------------------------------------------------------------------------
@@ -220,15 +238,16 @@ def pierce_iframe(driver, url, site_config):
         driver.get(url)
         return url
     logger.debug(f"Attempting iframe piercing for: {url}")
+    iframe_selector = iframe_config.get('selector', 'iframe')
     driver.get(url)
-    time.sleep(random.uniform(1, 2))
+    wait_until_ready(driver, {'selector': iframe_selector}, timeout=2)
     try:
-        iframe = driver.find_element(By.CSS_SELECTOR, iframe_config.get('selector', 'iframe'))
+        iframe = driver.find_element(By.CSS_SELECTOR, iframe_selector)
         iframe_url = iframe.get_attribute("src")
         if iframe_url:
             logger.info(f"Found iframe with src: {iframe_url}")
             driver.get(iframe_url)
-            time.sleep(random.uniform(1, 2))
+            wait_until_ready(driver, {}, timeout=2)
             return iframe_url
         logger.warning("Iframe found but no src attribute.")
     except Exception as e:
@@ -236,25 +255,42 @@ def pierce_iframe(driver, url, site_config):
     return url
 
 
-def fetch_page(url, user_agents, headers, use_selenium=False, driver=None, retry_count=0):
+def fetch_markup(url, user_agents, headers, use_selenium=False, driver=None, retry_count=0,
+                 site_config=None, general_config=None, ready=None, in_browser=None):
+    """
+    Fetch a page and return its raw markup (page source or response bytes), or None.
+
+    With Selenium, `ready` is the readiness condition (see browser.ready_condition)
+    waited for after navigation, for at most 4 seconds. `in_browser` (from
+    browser.browser_extractor) is then run on the driver; when it returns a
+    result, that is returned instead of the page source.
+    """
     if use_selenium and driver is not None:
         logger.debug(f"Fetching URL (selenium): {url}")
+        throttle(url, site_config, general_config)
         try:
-            site_config = globals().get('site_config', {})
+            apply_resource_blocking(driver, blocked_url_patterns(site_config, general_config))
             if isinstance(site_config, dict) and site_config.get('iframe', {}).get('enabled'):
                 final_url = pierce_iframe(driver, url, site_config)
             else:
                 driver.get(url)
                 final_url = url
             logger.debug(f"Final URL after iframe handling: {final_url}")
-            time.sleep(random.uniform(2, 4))
-            return BeautifulSoup(driver.page_source, 'html.parser')
+            get_config_manager().driver_pool.record_navigation(driver)
+            wait_until_ready(driver, ready, timeout=4)
+            if in_browser is not None:
+                extracted = in_browser(driver)
+                if extracted is not None:
+                    return extracted
+            return driver.page_source
         except Exception as e:
             if retry_count < 2:
                 logger.warning(f"Selenium error: {e}. Retrying with new session...")
                 new_driver = get_selenium_driver({}, force_new=True)
                 if new_driver:
-                    return fetch_page(url, user_agents, headers, use_selenium, new_driver, retry_count+1)
+                    return fetch_markup(url, user_agents, headers, use_selenium, new_driver, retry_count+1,
+                                        site_config=site_config, general_config=general_config,
+                                        ready=ready, in_browser=in_browser)
             logger.error(f"Failed to fetch {url} with Selenium: {e}")
             return None
 
@@ -264,20 +300,27 @@ def fetch_page(url, user_agents, headers, use_selenium=False, driver=None, retry
             "  Install Chrome/Chromium for full JS-rendered page support."
         )
 
-    import cloudscraper
-    scraper = cloudscraper.create_scraper()
-    if 'User-Agent' not in headers:
-        headers = dict(headers)
-        headers['User-Agent'] = random.choice(user_agents)
+    # The session pins its User-Agent when created; a 'User-Agent' in the
+    # site's headers still overrides it per request.
+    get_http_session(site_config, general_config, user_agents)
     logger.debug(f"Fetching URL (requests): {url}")
-    time.sleep(random.uniform(1, 3))
-    try:
-        response = scraper.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return BeautifulSoup(response.content, "html.parser")
-    except Exception as e:
-        logger.error(f"Error fetching {url}: {e}")
+    response = http_get(url, site_config, general_config, headers=headers,
+                        browsers=get_config_manager())
+    if response is None:
+        return None
+    return response.content
+
+
+def fetch_page(url, user_agents, headers, use_selenium=False, driver=None, retry_count=0,
+               site_config=None, general_config=None, ready=None, in_browser=None):
+    markup = fetch_markup(url, user_agents, headers, use_selenium, driver, retry_count,
+                          site_config=site_config, general_config=general_config, ready=ready,
+                          in_browser=in_browser)
+    if markup is None:
         return None
+    if isinstance(markup, BrowserFields):
+        return markup   # already extracted in the page; extract_data takes it as is
+    return make_soup(markup, resolve_parser(site_config, general_config))
 
 
 # ---------------------------------------------------------------------------
@@ -285,86 +328,23 @@ def fetch_page(url, user_agents, headers, use_selenium=False, driver=None, retry
 # ---------------------------------------------------------------------------
 
 def extract_data(soup, selectors, driver=None, site_config=None):
-    data = {}
     if soup is None:
         logger.error("Soup is None; cannot extract data")
-        return data
-    for field, config in selectors.items():
-        if field == 'download_url' and site_config and site_config.get('m3u8_mode', False):
-            continue
-        if isinstance(config, str):
-            elements = soup.select(config)
-        elif isinstance(config, dict):
-            if 'iframe' in config and driver and site_config:
-                try:
-                    iframe = driver.find_element(By.CSS_SELECTOR, config['iframe'])
-                    driver.switch_to.frame(iframe)
-                    iframe_soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    elements = iframe_soup.select(config.get('selector', ''))
-                    driver.switch_to.default_content()
-                except Exception as e:
-                    logger.error(f"Failed to pierce iframe for '{field}': {e}")
-                    elements = []
-            elif 'selector' in config:
-                selector = config['selector']
-                if isinstance(selector, list):
-                    elements = []
-                    for sel in selector:
-                        elements.extend(soup.select(sel))
-                        if elements: break
-                elif '|' in selector:
-                    namespace, tag = selector.split('|', 1)
-                    elements = soup.find_all(f"{namespace}:{tag}")
-                else:
-                    elements = soup.select(selector)
-            elif 'attribute' in config:
-                elements = [soup]
-            else:
-                elements = []
-        else:
-            elements = []
-
-        if not elements:
-            data[field] = ''
-            continue
-
-        if isinstance(config, dict) and 'attribute' in config:
-            values = [el.get(config['attribute']) for el in elements if el.get(config['attribute'])]
-            if field in ('url', 'download_url', 'image', 'date', 'duration'):
-                value = values[0] if values else ''
-            else:
-                value = values[0] if len(values) == 1 else values if values else ''
-            if value is None: value = ''
-        else:
-            value = elements[0].text.strip() if hasattr(elements[0], 'text') and elements[0].text else ''
-            if value is None: value = ''
-
-        if field in ['tags', 'actors', 'producers', 'studios'] and not (isinstance(config, dict) and 'attribute' in config):
-            values = [el.text.strip() for el in elements if hasattr(el, 'text') and el.text and el.text.strip()]
-            seen = set()
-            value = [v for v in values if not (v.lower() in seen or seen.add(v.lower()))]
-
-        if isinstance(config, dict) and 'postProcess' in config:
-            for step in config['postProcess']:
-                if 'replace' in step:
-                    for pair in step['replace']:
-                        regex, replacement = pair['regex'], pair['with']
-                        try:
-                            if isinstance(value, list):
-                                value = [re.sub(regex, replacement, v, flags=re.DOTALL) if v else '' for v in value]
-                            else:
-                                value = re.sub(regex, replacement, value, flags=re.DOTALL) if value else ''
-                        except re.error:
-                            value = ''
-        data[field] = value
-    return data
+        return {}
+    return get_extraction_plan(selectors).extract(soup, driver, site_config)
 
 
 # ---------------------------------------------------------------------------
 # URL construction
 # ---------------------------------------------------------------------------
 
-def construct_url(base_url, pattern, site_config, mode=None, **kwargs):
+def construct_url(base_url, pattern, site_config, mode=None, filters=None, **kwargs):
+    """
+    Fill a url_pattern's placeholders from kwargs and make the URL absolute.
+
+    `filters` ({'after': ..., 'min_duration': ...}) adds the mode's
+    `filter_params` for the active filters (see filter_query_params).
+    """
     url = pattern
     for key, value in kwargs.items():
         if value is not None:
@@ -376,9 +356,94 @@ def construct_url(base_url, pattern, site_config, mode=None, **kwargs):
             url = url.replace(f"{{{key}}}", str(value))
     if not url.startswith(('http://', 'https://')):
         url = urllib.parse.urljoin(base_url, url)
+    if filters:
+        url = _set_query_params(url, filter_query_params(site_config, mode, **filters))
     return url
 
 
+def filter_query_params(site_config, mode, after=None, min_duration=None):
+    """
+    Query parameters that push --after/--min-duration down to the site.
+
+    A mode's `filter_params` in the site YAML names them. Each entry has a
+    `param` and either a `value` template or `values`, a table of the
+    site's fixed choices (minutes for min_duration, days back for after):
+
+        filter_params:
+          min_duration: {param: min_duration, values: {10: 10, 20: 20, 30: 30}}
+          after:        {param: t, value: "{after_days}"}
+          sort:         {param: o, value: mr}       # sent with --after: newest first
+
+    A table entry is only used if the site then still returns every video
+    the filter keeps (the largest minimum not above --min-duration, the
+    shortest period reaching back to --after), so the client-side filter
+    checks stay correct; without a fitting entry the parameter is left out.
+    `value` templates may use {min_duration}, {min_duration_seconds},
+    {after} (YYYY-MM-DD) and {after_days}.
+    """
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    spec = mode_config.get('filter_params') or {}
+    params = {}
+    if min_duration and spec.get('min_duration'):
+        minutes = float(min_duration)
+        value = _filter_param_value(spec['min_duration'],
+                                    lambda choices: max((k for k in choices if k <= minutes), default=None),
+                                    min_duration=int(minutes), min_duration_seconds=int(minutes * 60))
+        if value is not None:
+            params[spec['min_duration']['param']] = value
+    threshold = parse_after_threshold(after) if after else None
+    if threshold:
+        days = max(0, (datetime.date.today() - threshold).days)
+        if spec.get('after'):
+            value = _filter_param_value(spec['after'],
+                                        lambda choices: min((k for k in choices if k >= days), default=None),
+                                        after=threshold.isoformat(), after_days=days)
+            if value is not None:
+                params[spec['after']['param']] = value
+        if spec.get('sort'):
+            params[spec['sort']['param']] = str(spec['sort']['value'])
+    return params
+
+
+def _filter_param_value(entry, choose, **fields):
+    if 'values' in entry:
+        choices = {float(k): v for k, v in entry['values'].items()}
+        key = choose(choices)
+        return None if key is None else str(choices[key])
+    return str(entry['value']).format(**fields)
+
+
+def pushes_date_sort(site_config, mode):
+    """True if --after URLs built for the mode ask the site for newest-first order."""
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    return bool((mode_config.get('filter_params') or {}).get('sort'))
+
+
+def _set_query_params(url, params):
+    """Set query parameters on url, leaving the rest of it (and its encoding) untouched."""
+    if not params:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    query = parts.query
+    for name, value in params.items():
+        pair = f"{urllib.parse.quote_plus(name)}={urllib.parse.quote_plus(value)}"
+        query, n = re.subn(r'(^|&)' + re.escape(urllib.parse.quote_plus(name)) + r'=[^&]*',
+                           lambda m: m.group(1) + pair, query)
+        if not n:
+            query = f"{query}&{pair}" if query else pair
+    return urllib.parse.urlunsplit(parts._replace(query=query))
+
+
+def _carry_filter_params(next_url, from_url, site_config, mode):
+    """Copy the mode's pushed-down filter parameters from from_url onto next_url."""
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    names = [entry['param'] for entry in (mode_config.get('filter_params') or {}).values()]
+    if not next_url or not from_url or not names:
+        return next_url
+    current = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(from_url).query))
+    return _set_query_params(next_url, {name: current[name] for name in names if name in current})
+
+
 # ---------------------------------------------------------------------------
 # resolve_download_dir
 # ---------------------------------------------------------------------------
@@ -414,16 +479,32 @@ def resolve_download_dir(general_config):
 # download_video  (yt-dlp wrapper)
 # ---------------------------------------------------------------------------
 
+# Subprocess engine only: progress parsed from yt-dlp's --newline output.
 _DL_PROGRESS_RE = re.compile(
     r'\[download\]\s+(\d+\.?\d*)%'
     r'(?:.*?at\s+([\d.]+\s*\S+/s))?'
     r'(?:.*?ETA\s+(\S+))?',
     re.IGNORECASE
 )
+# ... and the file it writes; a later merge line names the final file.
+_DL_DEST_RE = re.compile(
+    r'^\[download\] Destination: (.+)$'
+    r'|^\[Merger\] Merging formats into "(.+)"$'
+    r'|^\[download\] (.+) has already been downloaded'
+)
 
 
 def download_video(page_url, site_config, general_config, output_dir=None,
-                   progress_callback=None, stop_event=None):
+                   progress_callback=None, stop_event=None, files=None):
+    """
+    Download a video page with yt-dlp into the site's folder.
+
+    Args:
+        files: Optional list the downloaded file's path is appended to.
+
+    Returns:
+        True on success.
+    """
     if output_dir is None:
         output_dir = resolve_download_dir(general_config)
 
@@ -431,33 +512,65 @@ def download_video(page_url, site_config, general_config, output_dir=None,
     site_dir     = os.path.join(output_dir, shortcode)
     os.makedirs(site_dir, exist_ok=True)
     out_template = os.path.join(site_dir, '%(title)s [%(id)s].%(ext)s')
+    cookies      = cookies_file(site_config, general_config)
+    rate_limit   = general_config.get('rate_limit')
+    # A filter's metadata probe may already have extracted this page.
+    probed_info  = take_probed_info(page_url)
+
+    if embedded(site_config, general_config):
+        options = {
+            'format': DEFAULT_FORMAT,
+            'merge_output_format': 'mp4',
+            'noplaylist': True,
+            'outtmpl': out_template,
+        }
+        if cookies:
+            options['cookiefile'] = cookies
+        if rate_limit:
+            options['ratelimit'] = rate_limit_bytes(rate_limit)
+        engine = get_ytdlp_engine()
+        info = None
+        # The scheduler kills the ffmpeg processes yt-dlp starts on stop or exit.
+        with get_download_scheduler(general_config).adopt(stop_event) as adopt:
+            if probed_info is not None:
+                logger.info(f"[DOWNLOAD] yt-dlp (in-process, probed info): {page_url}")
+                info = engine.download_info(probed_info, options, progress_callback, stop_event, adopt)
+                if info is None and not (stop_event and stop_event.is_set()):
+                    logger.debug("[DOWNLOAD] Probed info failed (expired media URLs?) -- extracting again")
+            if info is None and not (stop_event and stop_event.is_set()):
+                logger.info(f"[DOWNLOAD] yt-dlp (in-process): {page_url}")
+                info = engine.download(page_url, options, progress_callback, stop_event, adopt)
+        if stop_event and stop_event.is_set():
+            logger.warning("[DOWNLOAD] Aborted by user stop request.")
+            return False
+        if info is None:
+            return False
+        if files is not None:
+            files.extend(ytdlp_output_files(info))
+        if progress_callback:
+            progress_callback(100.0, "", "")
+        logger.success(f"[DOWNLOAD] OK: {page_url}")
+        return True
 
     cmd = [
         'yt-dlp',
-        '--format', 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best',
+        '--format', DEFAULT_FORMAT,
         '--merge-output-format', 'mp4',
         '--no-playlist',
         '--newline',
         '--no-warnings',
         '--output', out_template,
     ]
-
-    cookies = general_config.get('cookies_file') or site_config.get('cookies_file')
     if cookies:
-        cookies = os.path.expanduser(cookies)
-    if cookies and os.path.isfile(cookies):
         cmd += ['--cookies', cookies]
-        logger.debug(f"[DOWNLOAD] Using cookies: {cookies}")
-    elif cookies:
-        logger.warning(f"[DOWNLOAD] cookies_file not found: {cookies}")
-
-    rate_limit = general_config.get('rate_limit')
     if rate_limit:
         cmd += ['--limit-rate', str(rate_limit)]
 
-    cmd.append(page_url)
+    # yt-dlp re-extracts the page by itself if the probed info's media URLs fail.
+    info_file = write_info_json(probed_info) if probed_info is not None else None
+    cmd += ['--load-info-json', info_file] if info_file else [page_url]
 
-    logger.info(f"[DOWNLOAD] yt-dlp: {page_url}")
+    logger.info(f"[DOWNLOAD] yt-dlp{' (probed info)' if info_file else ''}: {page_url}")
     logger.debug(f"[DOWNLOAD] cmd: {' '.join(cmd)}")
 
     try:
@@ -467,22 +580,30 @@ def download_video(page_url, site_config, general_config, output_dir=None,
             stderr=subprocess.STDOUT,
             text=True,
             bufsize=1,
+            **popen_kwargs(),
         )
-        for line in proc.stdout:
-            if stop_event and stop_event.is_set():
-                proc.terminate()
-                logger.warning("[DOWNLOAD] Aborted by user stop request.")
-                return False
-            line = line.rstrip()
-            if not line:
-                continue
-            m = _DL_PROGRESS_RE.search(line)
-            if m and progress_callback:
-                progress_callback(float(m.group(1)), m.group(2) or "", m.group(3) or "")
-            elif line and not line.startswith('[download]'):
-                logger.debug(f"[yt-dlp] {line}")
-        proc.wait(timeout=600)
+        # The scheduler kills yt-dlp and its ffmpeg children on stop or exit.
+        destination = None
+        with get_download_scheduler(general_config).track(proc, stop_event):
+            for line in proc.stdout:
+                line = line.rstrip()
+                if not line:
+                    continue
+                d = _DL_DEST_RE.match(line)
+                if d:
+                    destination = next(filter(None, d.groups()))
+                m = _DL_PROGRESS_RE.search(line)
+                if m and progress_callback:
+                    progress_callback(float(m.group(1)), m.group(2) or "", m.group(3) or "")
+                elif line and not line.startswith('[download]'):
+                    logger.debug(f"[yt-dlp] {line}")
+            proc.wait(timeout=600)
+        if stop_event and stop_event.is_set():
+            logger.warning("[DOWNLOAD] Aborted by user stop request.")
+            return False
         if proc.returncode == 0:
+            if files is not None and destination:
+                files.append(destination)
             if progress_callback:
                 progress_callback(100.0, "", "")
             logger.success(f"[DOWNLOAD] OK: {page_url}")
@@ -499,6 +620,12 @@ def download_video(page_url, site_config, general_config, output_dir=None,
     except Exception as e:
         logger.error(f"[DOWNLOAD] Unexpected error: {e}")
         return False
+    finally:
+        if info_file:
+            try:
+                os.remove(info_file)
+            except OSError:
+                pass
 
 
 # ---------------------------------------------------------------------------
@@ -506,7 +633,8 @@ def download_video(page_url, site_config, general_config, output_dir=None,
 # ---------------------------------------------------------------------------
 
 def process_url(url, site_config, general_config, overwrite=False, re_nfo=False, page="1",
-                apply_state=False, state_set=None, after_date=None, min_duration=None):
+                apply_state=False, state_set=None, after_date=None, min_duration=None,
+                fan_out=None, incremental=None):
     page_parts = str(page).split('.')
     current_page_num     = int(page_parts[0])
     current_video_offset = int(page_parts[1]) if len(page_parts) > 1 else 0
@@ -519,24 +647,13 @@ def process_url(url, site_config, general_config, overwrite=False, re_nfo=False,
                                               general_config.get('headers', {}), re_nfo,
                                               apply_state=apply_state, state_set=state_set)
                 else:
-                    constructed_url = url
-                    success = False
-                    while constructed_url:
-                        next_page, new_page_num, page_success = process_list_page(
-                            constructed_url, site_config, general_config,
-                            current_page_num, current_video_offset,
-                            mode_name, "direct_url", overwrite,
-                            general_config.get('headers', {}), re_nfo,
-                            apply_state=apply_state, state_set=state_set,
-                            after_date=after_date, min_duration=min_duration
-                        )
-                        success = success or page_success
-                        constructed_url = next_page
-                        current_page_num = new_page_num
-                        current_video_offset = 0
-                        if constructed_url:
-                            time.sleep(general_config["sleep"]["between_pages"])
-                    return success
+                    return process_list_pages(
+                        url, site_config, general_config, current_page_num, current_video_offset,
+                        mode_name, "direct_url", overwrite, general_config.get('headers', {}), re_nfo,
+                        apply_state=apply_state, state_set=state_set,
+                        after_date=after_date, min_duration=min_duration, fan_out=fan_out,
+                        incremental=incremental
+                    )
     return False
 
 
@@ -544,26 +661,53 @@ def process_url(url, site_config, general_config, overwrite=False, re_nfo=False,
 # process_list_page
 # ---------------------------------------------------------------------------
 
-def process_list_page(url, site_config, general_config, page_num=1, video_offset=0,
-                      mode=None, identifier=None, overwrite=False, headers=None,
-                      new_nfo=False, do_not_ignore=False, apply_state=False,
-                      state_set=None, after_date=None, min_duration=None,
-                      dl_progress_cb=None, video_info_cb=None, global_progress_cb=None,
-                      stop_event=None):
+def _select_container(soup, container_selector):
+    """First match of the container selector (or of the first selector in a list that matches)."""
+    selectors = container_selector if isinstance(container_selector, list) else [container_selector]
+    for sel in selectors:
+        container = soup.select_one(sel)
+        if container:
+            return container
+    return None
 
-    after_threshold = parse_after_threshold(after_date) if after_date else None
-    min_dur_minutes = float(min_duration) if min_duration else None
 
-    use_selenium = site_config.get('use_selenium', False)
-    driver = get_selenium_driver(general_config) if use_selenium else None
-    soup   = fetch_page(url, general_config['user_agents'], headers or {}, use_selenium, driver)
-    if soup is None:
-        logger.error(f"Failed to fetch page: {url}")
-        return None, None, False
+def _list_page_strainer(list_scraper, parser):
+    """Strainer for the container and next-page selectors, or None to parse everything."""
+    if parser == 'selectolax':
+        return None
+    container_selector = list_scraper['video_container']['selector']
+    selectors = list(container_selector) if isinstance(container_selector, list) else [container_selector]
+    next_page = (list_scraper.get('pagination') or {}).get('next_page')
+    if isinstance(next_page, dict) and next_page.get('selector'):
+        selectors.append(next_page['selector'])
+    return scope_strainer(selectors)
 
-    list_scraper       = site_config['scrapers']['list_scraper']
-    base_url           = site_config['base_url']
+
+def _list_page_items(markup, url, site_config, general_config, list_scraper):
+    """
+    Parse a fetched list page and find its video items.
+
+    Returns:
+        (soup, video_elements), or (None, None) when nothing usable matched.
+    """
     container_selector = list_scraper['video_container']['selector']
+    item_selector      = list_scraper['video_item']['selector']
+
+    # -- Parse ----------------------------------------------------------------
+    # Build only the container and pagination subtrees when the selectors allow
+    # it; anything the scoped tree can't answer gets a full parse instead.
+    parser   = resolve_parser(site_config, general_config)
+    strainer = _list_page_strainer(list_scraper, parser)
+    soup     = None
+    if strainer is not None:
+        scoped = make_soup(markup, parser, parse_only=strainer)
+        scoped_container = _select_container(scoped, container_selector)
+        if scoped_container is not None and scoped_container.select(item_selector):
+            soup = scoped
+        else:
+            logger.debug("[PARSE] Scoped parse found no items -- parsing the full page.")
+    if soup is None:
+        soup = make_soup(markup, parser)
 
     # -- Container ------------------------------------------------------------
     container = None
@@ -582,7 +726,7 @@ def process_list_page(url, site_config, general_config, page_num=1, video_offset
                 f"  Page title: {soup.title.string if soup.title else 'N/A'}\n"
                 f"  Body classes: {soup.body.get('class', []) if soup.body else 'N/A'}"
             )
-            return None, None, False
+            return None, None
     else:
         container = soup.select_one(container_selector)
         if not container:
@@ -590,10 +734,9 @@ def process_list_page(url, site_config, general_config, page_num=1, video_offset
                 f"[CONTAINER] Selector '{container_selector}' matched nothing on {url}.\n"
                 f"  Page title: {soup.title.string if soup.title else 'N/A'}"
             )
-            return None, None, False
+            return None, None
 
     # -- Video items ----------------------------------------------------------
-    item_selector  = list_scraper['video_item']['selector']
     video_elements = container.select(item_selector)
     if not video_elements:
         fallback = soup.select("a[href*='/watch/']")
@@ -606,106 +749,314 @@ def process_list_page(url, site_config, general_config, page_num=1, video_offset
             logger.warning(f"[ITEMS] Using {len(fallback)} fallback <a> elements (URL-only mode).")
             video_elements = fallback
         else:
-            return None, None, False
+            return None, None
+
+    return soup, video_elements
+
+
+def process_list_page(url, site_config, general_config, page_num=1, video_offset=0,
+                      mode=None, identifier=None, overwrite=False, headers=None,
+                      new_nfo=False, do_not_ignore=False, apply_state=False,
+                      state_set=None, after_date=None, min_duration=None,
+                      dl_progress_cb=None, video_info_cb=None, global_progress_cb=None,
+                      stop_event=None, job_progress_cb=None, page=None, incremental=None,
+                      date_cutoff=None, prefetcher=None):
+    """
+    Read one list page and run its items through the download pipeline.
+
+    `page` is the page's (video_items, next_url) when it has already been
+    read (see process_list_pages); it is then not fetched again.
+    `incremental` and `date_cutoff` are the run's IncrementalSync and
+    DateCutoff, if any; either may end the listing on this page.
+    `prefetcher` is the run's Prefetcher: the page is taken from it if it
+    was read ahead, and the pages after it are queued on it.
 
-    term_width  = get_terminal_width()
-    total_items = len(video_elements)
+    Returns:
+        (next_url, next_page_num, success); the first two are None on the last page.
+    """
+    after_threshold = parse_after_threshold(after_date) if after_date else None
+    min_dur_minutes = float(min_duration) if min_duration else None
+
+    if page is None and prefetcher is not None:
+        page = prefetcher.take((url, page_num))
+        if page is not None:
+            logger.debug(f"[PREFETCH] Page {page_num} was read ahead: {url}")
+    if page is None:
+        # The pooled driver is leased only while the list page itself is read, then
+        # handed back so the pipeline's page workers can lease it for video pages.
+        use_selenium = browser_fetches(site_config, general_config)
+        driver = get_selenium_driver(general_config) if use_selenium else None
+        try:
+            page = _scrape_list_page(driver, url, site_config, general_config, page_num,
+                                     mode, identifier, headers)
+        finally:
+            if driver is not None:
+                release_selenium_driver()
+    if page is None:
+        if incremental is not None:
+            incremental.abort(f"page {page_num} could not be read")
+        return None, None, False
+    video_items, next_url = page
+
+    term_width = get_terminal_width()
     print()
     print(colored(f" page {page_num}, {site_config['name'].lower()} {mode}: \"{identifier}\" ".center(term_width, "\u2550"), "yellow"))
-    logger.info(f"Found {total_items} video elements on page {page_num}")
+    logger.info(f"Found {len(video_items)} video elements on page {page_num}")
+    if prefetcher is not None:
+        _prefetch_list_pages(prefetcher, next_url, site_config, general_config, page_num,
+                             mode, identifier, headers)
+
     if after_threshold: logger.info(f"[FILTER] Date filter: > {after_threshold}")
     if min_dur_minutes: logger.info(f"[FILTER] Duration filter: > {min_dur_minutes} min")
 
-    success        = False
-    skipped_filter = 0
-    processed      = 0
+    success = _process_list_items(
+        video_items, site_config, general_config, video_offset, overwrite, headers,
+        new_nfo, do_not_ignore, apply_state, state_set, after_threshold, min_dur_minutes,
+        dl_progress_cb, video_info_cb, global_progress_cb, stop_event, job_progress_cb,
+        incremental, date_cutoff,
+    )
+
+    if stop_event and stop_event.is_set():
+        return None, None, success
+    if any(stop is not None and stop.stopped for stop in (incremental, date_cutoff)):
+        return None, None, success
+    return (next_url, page_num+1, success) if next_url else (None, None, success)
+
+
+def process_list_pages(url, site_config, general_config, page_num=1, video_offset=0,
+                       mode=None, identifier=None, overwrite=False, headers=None,
+                       new_nfo=False, apply_state=False, state_set=None,
+                       after_date=None, min_duration=None, dl_progress_cb=None,
+                       video_info_cb=None, global_progress_cb=None, stop_event=None,
+                       job_progress_cb=None, fan_out=None, incremental=None):
+    """
+    Process a listing from page_num through its last page (or until stop_event).
 
-    for i, video_element in enumerate(video_elements, 1):
+    Pages are read one after another, paced by `between_pages`, unless
+    pagination fan-out applies (see fanout.py); `fan_out` overrides the
+    `fanout.enabled` setting for this call. With `incremental`, pages are
+    read in order until the listing reaches videos already known, and
+    with `after_date` on a `sort: date_desc` mode until it reaches older
+    videos (see incremental.py); fan-out is not used then.
+
+    Returns:
+        True if any page had downloads or already-processed videos.
+    """
+    page_kwargs = dict(
+        mode=mode, identifier=identifier, overwrite=overwrite, headers=headers,
+        new_nfo=new_nfo, apply_state=apply_state, state_set=state_set,
+        after_date=after_date, min_duration=min_duration, dl_progress_cb=dl_progress_cb,
+        video_info_cb=video_info_cb, global_progress_cb=global_progress_cb,
+        stop_event=stop_event, job_progress_cb=job_progress_cb,
+    )
+    tracker = None
+    if incremental:
+        query = canonical_url(url) if identifier == "direct_url" else identifier
+        query = f"{site_config.get('shortcode', site_config['name'])}:{mode}:{query}"
+        # A filtered run only knows about the videos its filters let through.
+        after_threshold = parse_after_threshold(after_date) if after_date else None
+        if after_threshold:
+            query += f"|after={after_threshold.isoformat()}"
+        if min_duration:
+            query += f"|min_duration={float(min_duration):g}"
+        tracker = IncrementalSync(
+            query,
+            ledger=state_set if isinstance(state_set, DownloadLedger) else None,
+            known_items=incremental_settings(site_config, general_config)['known_items'],
+            record_newest=page_num == 1 and video_offset == 0,
+        )
+        page_kwargs['incremental'] = tracker
+    cutoff = None
+    if after_date and (date_sorted(site_config, mode)
+                       or (identifier != "direct_url" and pushes_date_sort(site_config, mode))):
+        cutoff = DateCutoff(parse_after_threshold(after_date),
+                            date_cutoff_items(site_config, general_config, mode))
+        page_kwargs['date_cutoff'] = cutoff
+    if tracker is None and cutoff is None and _fanout_applies(site_config, general_config, mode, fan_out):
+        return _process_list_pages_fanout(url, site_config, general_config, page_num,
+                                          video_offset, page_kwargs)
+
+    # Pages read ahead belong to this run only (its filters, cookies and headers).
+    prefetcher = page_kwargs['prefetcher'] = Prefetcher()
+    success = False
+    try:
+        while url:
+            if stop_event and stop_event.is_set():
+                break
+            url, next_page, ok = process_list_page(url, site_config, general_config, page_num,
+                                                   video_offset, **page_kwargs)
+            success = success or ok
+            video_offset = 0
+            if next_page:
+                page_num = next_page
+            stops = [stop for stop in (tracker, cutoff) if stop is not None]
+            for stop in stops:
+                stop.end_page()
+            if any(stop.stopped for stop in stops):
+                break
+            if url and not (stop_event and stop_event.is_set()):
+                pace_list_page(url, general_config.get('sleep', {}).get('between_pages', 3), page_num,
+                               prefetcher)
+    finally:
+        prefetcher.close()
+    if tracker is not None:
         if stop_event and stop_event.is_set():
-            logger.warning("[STOP] Aborting page processing due to user stop request.")
-            break
+            tracker.abort("the run was stopped")
+        tracker.finish()
+    return success
 
-        if video_offset > 0 and i < video_offset:
-            continue
 
-        video_data = extract_data(video_element, list_scraper['video_item']['fields'], driver, site_config)
+def _fanout_applies(site_config, general_config, mode, fan_out=None):
+    """True if the mode's pages can be read concurrently (url_pattern_pages, HTTP fetches)."""
+    enabled = fanout_settings(site_config, general_config)['enabled'] if fan_out is None else fan_out
+    if not enabled:
+        return False
+    if not (site_config.get('modes', {}).get(mode) or {}).get('url_pattern_pages'):
+        logger.debug(f"[FANOUT] Mode '{mode}' has no url_pattern_pages -- reading pages in sequence.")
+        return False
+    if browser_fetches(site_config, general_config):
+        logger.debug("[FANOUT] Site loads pages in Selenium -- reading pages in sequence.")
+        return False
+    return True
 
-        if not video_passes_filters(video_data, after_threshold, min_dur_minutes):
-            skipped_filter += 1
-            processed += 1
-            if global_progress_cb:
-                global_progress_cb(processed, total_items)
-            continue
 
-        raw_url = video_data.get('url', '')
-        if isinstance(raw_url, list):
-            raw_url = raw_url[0] if raw_url else ''
-
-        if raw_url:
-            video_url = raw_url
-            if not video_url.startswith(('http://', 'https://')):
-                video_url = f"http:{video_url}" if video_url.startswith('//') else urllib.parse.urljoin(base_url, video_url)
-        elif video_data.get('video_key'):
-            video_url = construct_url(
-                base_url,
-                site_config['modes']['video']['url_pattern'],
-                site_config, mode='video',
-                video=video_data['video_key']
-            )
-        else:
-            logger.debug(f"[ITEMS] No URL for element {i}: {video_data}")
-            processed += 1
-            if global_progress_cb:
-                global_progress_cb(processed, total_items)
-            continue
+def _process_list_pages_fanout(url, site_config, general_config, page_num, video_offset, page_kwargs):
+    """Find the last page, read all pages concurrently, and process them in page order."""
+    settings   = fanout_settings(site_config, general_config)
+    mode       = page_kwargs['mode']
+    identifier = page_kwargs['identifier']
+    headers    = page_kwargs['headers']
+    stop_event = page_kwargs['stop_event']
+    pagination = site_config['scrapers']['list_scraper'].get('pagination') or {}
+    max_pages  = site_config['modes'][mode].get('max_pages', pagination.get('max_pages'))
+    limit      = settings['probe_limit'] if max_pages is None else min(int(max_pages), settings['probe_limit'])
+
+    def page_url(num):
+        if num == page_num:
+            return url
+        return _next_page_url(None, None, site_config, num - 1, mode, identifier, url)
+
+    def read_page(num):
+        num_url = page_url(num)
+        if not num_url:
+            return None
+        logger.debug(f"[FANOUT] Reading page {num}: {num_url}")
+        page = _scrape_list_page(None, num_url, site_config, general_config, num,
+                                 mode, identifier, headers)
+        return page[0] if page else None
+
+    fanout = PageFanout(read_page, settings['workers'], first=page_num, limit=limit,
+                        stop_event=stop_event)
+    success = False
+    try:
+        for num, video_items in fanout.pages(key=lambda item: _item_key(item, site_config)):
+            if stop_event and stop_event.is_set():
+                break
+            _, _, ok = process_list_page(page_url(num), site_config, general_config, num,
+                                         video_offset, page=(video_items, None), **page_kwargs)
+            success = success or ok
+            video_offset = 0
+    finally:
+        fanout.close()
+    return success
 
-        print()
-        print(colored(f"\u2508\u2508\u2508 {i} of {total_items} \u2508 {video_url} ".ljust(term_width, "\u2508"), "magenta"))
 
-        if video_info_cb:
-            v_title = video_data.get('title', '') or video_url.split('/')[-2] or video_url
-            video_info_cb(v_title, video_data.get('date', ''), video_data.get('duration', ''))
-
-        if is_url_processed(video_url, state_set) and not (overwrite or new_nfo):
-            logger.info(f"Skipping already processed: {video_url}")
-            success = True
-            processed += 1
-            if global_progress_cb:
-                global_progress_cb(processed, total_items)
-            continue
+def _scrape_list_page(driver, url, site_config, general_config, page_num, mode, identifier, headers):
+    """
+    Fetch a list page and extract every item on it.
 
-        if process_video_page(
-            video_url, site_config, general_config, overwrite, headers,
-            new_nfo, do_not_ignore, apply_state=apply_state, state_set=state_set,
-            dl_progress_cb=dl_progress_cb, video_info_cb=video_info_cb,
-            after_threshold=after_threshold, min_dur_minutes=min_dur_minutes,
-            stop_event=stop_event,
-        ):
-            success = True
-
-        processed += 1
-        if global_progress_cb:
-            global_progress_cb(processed, total_items)
-
-    if skipped_filter:
-        logger.info(f"[FILTER] Skipped {skipped_filter} videos due to filters.")
-    if driver:
-        driver.quit()
-
-    # -- Pagination -----------------------------------------------------------
-    if stop_event and stop_event.is_set():
-        return None, None, success
+    Returns:
+        (video_items, next_url) -- the items' field dicts in page order and
+        the next page's URL (or None) -- or None if the page yielded nothing.
+    """
+    list_scraper       = site_config['scrapers']['list_scraper']
+    container_selector = list_scraper['video_container']['selector']
+    item_selector      = list_scraper['video_item']['selector']
+    item_plan          = get_extraction_plan(list_scraper['video_item']['fields'])
+
+    # With `extract_in_browser` the item fields come back from the page itself.
+    in_browser = None
+    if driver is not None:
+        in_browser = browser_extractor(
+            item_plan, site_config, general_config,
+            container=container_selector, item=item_selector,
+            next_page=(list_scraper.get('pagination') or {}).get('next_page'),
+        )
+
+    use_selenium = browser_fetches(site_config, general_config)
+    markup = fetch_markup(url, general_config['user_agents'], headers or {}, use_selenium, driver,
+                          site_config=site_config, general_config=general_config,
+                          ready=ready_condition(site_config, 'list', container_selector),
+                          in_browser=in_browser)
+    if markup is None:
+        logger.error(f"Failed to fetch page: {url}")
+        return None
 
+    if isinstance(markup, BrowserListPage):
+        soup, video_elements = None, markup.items
+        logger.debug(f"[EXTRACT] {len(video_elements)} items extracted in the browser")
+    else:
+        soup, video_elements = _list_page_items(markup, url, site_config, general_config, list_scraper)
+        if video_elements is None:
+            return None
+
+    # Items are read while the page (and driver, for iframe fields) is still current.
+    video_items = [item_plan.extract(element, driver, site_config) for element in video_elements]
+    return video_items, _next_page_url(soup, markup, site_config, page_num, mode, identifier, url)
+
+
+def _prefetch_list_pages(prefetcher, next_url, site_config, general_config, page_num, mode, identifier, headers):
+    """Queue the pages after page_num on prefetcher for background reading (url_pattern_pages modes only)."""
+    depth = prefetch_depth(site_config, general_config)
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    if not depth or not next_url or not mode_config.get('url_pattern_pages'):
+        return
+    if browser_fetches(site_config, general_config):
+        return   # would hold a pooled browser the page workers need
+    for ahead in range(1, depth + 1):
+        if not next_url:
+            break
+        prefetcher.schedule((next_url, page_num + ahead), _read_list_page_ahead, next_url,
+                            site_config, general_config, page_num + ahead, mode, identifier, headers)
+        next_url = _next_page_url(None, None, site_config, page_num + ahead, mode, identifier, next_url)
+
+
+def _read_list_page_ahead(url, site_config, general_config, page_num, mode, identifier, headers):
+    """Prefetch worker: the same between_pages pacing as the pagination loops, then read the page."""
+    get_rate_limiter().pace(url, general_config.get('sleep', {}).get('between_pages', 0))
+    logger.debug(f"[PREFETCH] Reading page {page_num} ahead: {url}")
+    return _scrape_list_page(None, url, site_config, general_config, page_num, mode, identifier, headers)
+
+
+def pace_list_page(url, min_interval, page_num=None, prefetcher=None):
+    """
+    The between_pages pause before the next list page -- skipped when that
+    page has already been read ahead on prefetcher (it then costs no request at all).
+    """
+    if page_num is not None and prefetcher is not None and prefetcher.has((url, page_num)):
+        return 0.0
+    return get_rate_limiter().pace(url, min_interval)
+
+
+def _next_page_url(soup, markup, site_config, page_num, mode, identifier, current_url=None):
+    """
+    URL of the page after page_num, from url_pattern_pages or the next-page link.
+
+    Pushed-down filter parameters on current_url (a page of the same
+    listing) are carried over to it.
+    """
     if mode not in site_config.get('modes', {}):
-        return None, None, success
+        return None
 
+    list_scraper       = site_config['scrapers']['list_scraper']
+    base_url           = site_config['base_url']
     mode_config        = site_config['modes'][mode]
     scraper_pagination = list_scraper.get('pagination', {})
     url_pattern_pages  = mode_config.get('url_pattern_pages')
     max_pages          = mode_config.get('max_pages', scraper_pagination.get('max_pages', float('inf')))
 
     if page_num >= max_pages:
-        return None, None, success
+        return None
 
     next_url = None
     if url_pattern_pages:
@@ -717,48 +1068,218 @@ def process_list_page(url, site_config, general_config, page_num=1, video_offset
         )
     elif scraper_pagination and 'next_page' in scraper_pagination:
         cfg = scraper_pagination['next_page']
-        el  = soup.select_one(cfg.get('selector', ''))
-        if el:
-            next_url = el.get(cfg.get('attribute', 'href'))
-            if next_url and not next_url.startswith(('http://', 'https://')):
-                next_url = urllib.parse.urljoin(base_url, next_url)
+        if soup is None:
+            next_url = markup.next_page
+        else:
+            el = soup.select_one(cfg.get('selector', ''))
+            next_url = el.get(cfg.get('attribute', 'href')) if el else None
+        if next_url and not next_url.startswith(('http://', 'https://')):
+            next_url = urllib.parse.urljoin(base_url, next_url)
+    return _carry_filter_params(next_url, current_url, site_config, mode)
+
+
+def _item_video_url(video_data, site_config):
+    """Absolute video-page URL for a list item, or None if it has neither url nor video_key."""
+    base_url = site_config['base_url']
+    raw_url = video_data.get('url', '')
+    if isinstance(raw_url, list):
+        raw_url = raw_url[0] if raw_url else ''
+    if raw_url:
+        if raw_url.startswith(('http://', 'https://')):
+            return raw_url
+        if raw_url.startswith('//'):
+            return f"{urllib.parse.urlparse(base_url).scheme or 'https'}:{raw_url}"
+        return urllib.parse.urljoin(base_url, raw_url)
+    if video_data.get('video_key'):
+        return construct_url(
+            base_url,
+            site_config['modes']['video']['url_pattern'],
+            site_config, mode='video',
+            video=video_data['video_key']
+        )
+    return None
 
-    return (next_url, page_num+1, success) if next_url else (None, None, success)
+
+def _item_key(video_data, site_config):
+    """Dedupe key for a list item: its video URL's canonical form."""
+    video_url = _item_video_url(video_data, site_config)
+    return canonical_url(video_url, site_config) if video_url else None
+
+
+def _process_list_items(video_items, site_config, general_config, video_offset, overwrite,
+                        headers, new_nfo, do_not_ignore, apply_state, state_set,
+                        after_threshold, min_dur_minutes, dl_progress_cb, video_info_cb,
+                        global_progress_cb, stop_event, job_progress_cb=None, incremental=None,
+                        date_cutoff=None):
+    """
+    Run a list page's items through the fetch -> download -> finalize pipeline.
+
+    With `incremental` (an IncrementalSync) or `date_cutoff` (a DateCutoff),
+    the page is cut short at the first item that tells it the rest of the
+    listing is already known or too old.
+
+    Returns:
+        True if any item was downloaded or had already been processed.
+    """
+    term_width     = get_terminal_width()
+    total_items    = len(video_items)
+    settings       = pipeline_settings(site_config, general_config)
+    counts         = {'skipped_filter': 0, 'already_done': 0}
+
+    def fetch_stage(item):
+        i, video_url, video_data = item
+        with _console_lock:   # page workers run side by side; keep each header in one piece
+            print()
+            print(colored(f"\u2508\u2508\u2508 {i} of {total_items} \u2508 {video_url} ".ljust(term_width, "\u2508"), "magenta"))
+        return prepare_video(video_url, site_config, general_config, headers,
+                             after_threshold=after_threshold, min_dur_minutes=min_dur_minutes,
+                             stop_event=stop_event, listed=video_data)
+
+    def download_stage(job):
+        ok = download_job(job, site_config, general_config, dl_progress_cb=dl_progress_cb,
+                          video_info_cb=video_info_cb, stop_event=stop_event,
+                          job_progress_cb=job_progress_cb, state_set=state_set)
+        return job if ok else None
+
+    def finalize_stage(job):
+        finalize_job(job, apply_state, state_set, site_config)
+        return job
+
+    pipeline = Pipeline(
+        [('page', fetch_stage, settings['page_workers']),
+         ('download', download_stage, settings['download_workers']),
+         ('finalize', finalize_stage, 1)],
+        queue_size=settings['queue_size'], stop_event=stop_event,
+        progress_cb=(lambda done: global_progress_cb(done, total_items)) if global_progress_cb else None,
+        total=total_items,
+    )
+
+    def candidates():
+        seen = set()
+        for stop in (incremental, date_cutoff):
+            if stop is not None:
+                stop.begin_page()
+        for i, video_data in enumerate(video_items, 1):
+            if video_offset > 0 and i < video_offset:
+                pipeline.skip()
+                continue
+            if date_cutoff is not None and date_cutoff.stopped:   # stopped by a probed date
+                pipeline.skip(total_items - i + 1)
+                break
+            video_url = _item_video_url(video_data, site_config)
+            if video_url and incremental is not None and incremental.see(
+                    video_url, canonical_url(video_url, site_config),
+                    parse_date_loose(video_data.get('date')), is_url_processed(video_url, state_set)):
+                pipeline.skip(total_items - i + 1)
+                break
+            # Items whose date only a probe can tell are accounted for in discover().
+            if date_cutoff is not None and (video_data.get('date') or not _needs_probe(
+                    video_data, site_config, after_threshold, min_dur_minutes, general_config)):
+                if date_cutoff.see(parse_date_loose(video_data.get('date'), latest=True)):
+                    pipeline.skip(total_items - i + 1)
+                    break
+            if not video_passes_filters(video_data, after_threshold, min_dur_minutes):
+                counts['skipped_filter'] += 1
+                pipeline.skip()
+                continue
+            if not video_url:
+                logger.debug(f"[ITEMS] No URL for element {i}: {video_data}")
+                pipeline.skip()
+                continue
+            key = canonical_url(video_url, site_config)
+            if key in seen:
+                logger.debug(f"[ITEMS] Element {i} repeats an earlier video on this page: {video_url}")
+                pipeline.skip()
+                continue
+            seen.add(key)
+            if is_url_processed(video_url, state_set) and not (overwrite or new_nfo):
+                logger.info(f"Skipping already processed: {video_url}")
+                counts['already_done'] += 1
+                pipeline.skip()
+                continue
+            yield i, video_data, video_url
+
+    def probe_ahead(items):
+        """Pass items on, keeping probes scheduled in batches for the next few ahead of discover()."""
+        probe = probe_settings(site_config, general_config)
+        window = probe['workers'] * probe['batch_size']
+        items, pending = iter(items), deque()
+
+        def fill():
+            urls = []
+            for item in items:
+                pending.append(item)
+                if _needs_probe(item[1], site_config, after_threshold, min_dur_minutes, general_config):
+                    urls.append(item[2])
+                if len(pending) >= window:
+                    break
+            if urls:
+                get_probe_service(general_config).schedule(urls, site_config, general_config)
+
+        fill()
+        while pending:
+            yield pending.popleft()
+            if len(pending) <= window - probe['batch_size']:
+                fill()
+
+    def discover(items):
+        for i, video_data, video_url in items:
+            if date_cutoff is not None and date_cutoff.stopped:
+                pipeline.skip()
+                continue
+            if _needs_probe(video_data, site_config, after_threshold, min_dur_minutes, general_config):
+                # Filter on the probed values before the video page is ever fetched.
+                probe_dur, probe_date = _probe_metadata_ytdlp(video_url, general_config, site_config)
+                if date_cutoff is not None and not video_data.get('date') and date_cutoff.see(probe_date):
+                    pipeline.skip()
+                    continue
+                probed = dict(video_data)
+                if probe_dur is not None and not probed.get('duration'):
+                    probed['duration'] = str(probe_dur * 60)
+                if probe_date is not None and not probed.get('date'):
+                    probed['date'] = probe_date.strftime("%Y-%m-%d")
+                if not video_passes_filters(probed, after_threshold, min_dur_minutes):
+                    counts['skipped_filter'] += 1
+                    pipeline.skip()
+                    continue
+                video_data = probed
+            yield i, video_url, video_data
+
+    # Lazily: the first download starts while later items are still being filtered and probed.
+    downloaded = pipeline.run(discover(probe_ahead(candidates())))
+
+    if counts['skipped_filter']:
+        logger.info(f"[FILTER] Skipped {counts['skipped_filter']} videos due to filters.")
+    return bool(downloaded) or counts['already_done'] > 0
 
 
 # ---------------------------------------------------------------------------
 # process_video_page
 # ---------------------------------------------------------------------------
 
-def process_video_page(url, site_config, general_config, overwrite=False, headers=None,
-                       new_nfo=False, do_not_ignore=False, apply_state=False,
-                       state_set=None, dl_progress_cb=None, video_info_cb=None,
-                       after_threshold=None, min_dur_minutes=None, stop_event=None):
+def lazy_video_page(site_config, general_config=None):
     """
-    Fetch the video page, apply a hard second-pass filter on the accurate
-    date and duration, then download.
-
-    For sites that don't expose duration/date in HTML, a lightweight
-    yt-dlp metadata probe is run when either filter is active and the
-    HTML scrape produced no value.  The probe takes ~1-3 s and is skipped
-    entirely when not needed.
+    True if a yt-dlp-method site's video pages are left to yt-dlp instead of
+    being fetched for their title, date and duration (`lazy_video_page`,
+    site YAML first, then config.yaml; on by default).
     """
-    if stop_event and stop_event.is_set():
+    if site_config.get('download', {}).get('method', 'yt-dlp') != 'yt-dlp':
         return False
+    lazy = site_config.get('lazy_video_page')
+    if lazy is None:
+        lazy = (general_config or {}).get('lazy_video_page', True)
+    return bool(lazy)
 
-    logger.info(f"Processing video page: {url}")
-    use_selenium = site_config.get('use_selenium', False)
-    driver = get_selenium_driver(general_config) if use_selenium else None
-    soup   = fetch_page(url, general_config['user_agents'], headers or {}, use_selenium, driver)
-    if not soup:
-        return False
 
-    raw_data = extract_data(soup, site_config['scrapers']['video_scraper'], driver, site_config)
-    title    = raw_data.get('title', 'Unknown')
-    v_date   = raw_data.get('date', '')
-    v_dur    = raw_data.get('duration', '')
+def _resolve_and_filter(url, site_config, general_config, v_date, v_dur,
+                        after_threshold, min_dur_minutes):
+    """
+    Fill a missing date/duration a filter needs from a yt-dlp probe, then
+    apply the hard filter.
 
-    # -- yt-dlp metadata probe when HTML gave us nothing ---------------------
+    Returns:
+        (date, duration), or None if the video is filtered out.
+    """
     need_dur_probe  = (min_dur_minutes is not None and min_dur_minutes > 0 and not v_dur)
     need_date_probe = (after_threshold is not None and not v_date)
 
@@ -773,36 +1294,151 @@ def process_video_page(url, site_config, general_config, overwrite=False, header
 
     # -- Hard filter ---------------------------------------------------------
     if after_threshold is not None and v_date:
-        parsed = parse_date_loose(v_date)
+        parsed = parse_date_loose(v_date, latest=True)
         if parsed is not None and parsed < after_threshold:
             logger.info(f"[FILTER] Skipping (video-page date {parsed} < {after_threshold}): {url}")
-            return False
+            return None
 
     if min_dur_minutes is not None and min_dur_minutes > 0 and v_dur:
         dur_min = duration_str_to_minutes(v_dur)
         if dur_min is not None and dur_min < min_dur_minutes:
             logger.info(f"[FILTER] Skipping (video-page duration {dur_min:.1f}m < min {min_dur_minutes}m): {url}")
-            return False
+            return None
+    return v_date, v_dur
+
+
+def prepare_video(url, site_config, general_config, headers=None,
+                  after_threshold=None, min_dur_minutes=None, stop_event=None, listed=None):
+    """
+    Fetch the video page and apply a hard second-pass filter on the accurate
+    date and duration.
+
+    For sites that don't expose duration/date in HTML, a lightweight
+    yt-dlp metadata probe is run when either filter is active and the
+    HTML scrape produced no value.  The probe takes ~1-3 s and is skipped
+    entirely when not needed.
+
+    On yt-dlp-method sites (see lazy_video_page()) the page is not fetched
+    at all: yt-dlp reads it when downloading, the title comes from the list
+    item (`listed`) and a date/duration a filter needs from the probe, whose
+    info dict the download then reuses.
 
-    if video_info_cb:
-        video_info_cb(title, v_date, v_dur)
+    Returns:
+        A download job dict (url, title, date, duration, download_url), or
+        None if the page failed or was filtered out.
+    """
+    if stop_event and stop_event.is_set():
+        return None
+
+    if lazy_video_page(site_config, general_config):
+        listed = listed or {}
+        logger.info(f"Processing video page (left to yt-dlp): {url}")
+        resolved = _resolve_and_filter(url, site_config, general_config,
+                                       listed.get('date', ''), listed.get('duration', ''),
+                                       after_threshold, min_dur_minutes)
+        if resolved is None:
+            return None
+        v_date, v_dur = resolved
+        return {'url': url, 'title': listed.get('title') or url, 'date': v_date,
+                'duration': v_dur, 'download_url': url}
+
+    logger.info(f"Processing video page: {url}")
+    use_selenium = browser_fetches(site_config, general_config)
+    driver = get_selenium_driver(general_config) if use_selenium else None
+    try:
+        video_scraper = site_config['scrapers']['video_scraper']
+        in_browser = (browser_extractor(get_extraction_plan(video_scraper), site_config, general_config)
+                      if driver is not None else None)
+        soup = fetch_page(url, general_config['user_agents'], headers or {}, use_selenium, driver,
+                          site_config=site_config, general_config=general_config,
+                          ready=ready_condition(site_config, 'video'), in_browser=in_browser)
+        if soup is None:
+            return None
+        raw_data = extract_data(soup, video_scraper, driver, site_config)
+    finally:
+        if driver is not None:
+            release_selenium_driver()
+    title    = raw_data.get('title', 'Unknown')
+
+    resolved = _resolve_and_filter(url, site_config, general_config,
+                                   raw_data.get('date', ''), raw_data.get('duration', ''),
+                                   after_threshold, min_dur_minutes)
+    if resolved is None:
+        return None
+    v_date, v_dur = resolved
 
     download_cfg = site_config.get('download', {})
     method = download_cfg.get('method', 'yt-dlp')
-
     if method == 'yt-dlp':
-        logger.success(f"Successfully processed video: {title}")
-        ok = download_video(url, site_config, general_config,
-                            progress_callback=dl_progress_cb, stop_event=stop_event)
+        download_url = url
     else:
-        video_url = raw_data.get('download_url')
-        if not video_url:
+        download_url = raw_data.get('download_url')
+        if not download_url:
             logger.error("No download URL found")
+            return None
+    return {'url': url, 'title': title, 'date': v_date, 'duration': v_dur, 'download_url': download_url}
+
+
+def download_job(job, site_config, general_config, dl_progress_cb=None, video_info_cb=None,
+                 stop_event=None, job_progress_cb=None, state_set=None):
+    """
+    Download a job from prepare_video() once the scheduler grants it a slot.
+
+    dl_progress_cb(pct, speed, eta) sees every running job; job_progress_cb
+    gets (job_id, title, pct, speed, eta) so a UI can keep one bar per job.
+    When state_set is the download ledger, the attempt and a failure are
+    recorded in it. Returns True on success.
+    """
+    ledger = state_set if isinstance(state_set, DownloadLedger) else None
+    scheduler = get_download_scheduler(general_config)
+    with scheduler.slot(site_config, general_config, job['title'],
+                        dl_progress_cb, job_progress_cb) as channel:
+        if stop_event and stop_event.is_set():
             return False
-        logger.success(f"Successfully processed video: {title}")
-        ok = download_video(video_url, site_config, general_config,
-                            progress_callback=dl_progress_cb, stop_event=stop_event)
+        if video_info_cb:
+            video_info_cb(job['title'], job['date'], job['duration'])
+        logger.success(f"Successfully processed video: {job['title']}")
+        if ledger is not None and job['url'] not in ledger:
+            ledger.record(job['url'], DOWNLOADING, site=site_config.get('shortcode'), attempt=True)
+        job['files'] = []
+        ok = download_video(job['download_url'], site_config, general_config,
+                            progress_callback=channel, stop_event=stop_event, files=job['files'])
+        if not ok and ledger is not None and job['url'] not in ledger:
+            ledger.record(job['url'], FAILED)
+        return ok
+
+
+def finalize_job(job, apply_state=False, state_set=None, site_config=None):
+    """Record a downloaded job's page URL in the state set (or ledger), if requested."""
+    if not apply_state or state_set is None:
+        return
+    if isinstance(state_set, DownloadLedger):
+        path = job['files'][-1] if job.get('files') else None
+        size = os.path.getsize(path) if path and os.path.exists(path) else None
+        state_set.record(job['url'], DONE, site=(site_config or {}).get('shortcode'), size=size, path=path)
+    else:
+        state_set.add(job['url'])
 
-    if ok and apply_state and state_set is not None:
-        state_set.add(url)
+
+def process_video_page(url, site_config, general_config, overwrite=False, headers=None,
+                       new_nfo=False, do_not_ignore=False, apply_state=False,
+                       state_set=None, dl_progress_cb=None, video_info_cb=None,
+                       after_threshold=None, min_dur_minutes=None, stop_event=None,
+                       job_progress_cb=None):
+    """
+    Fetch the video page, filter it, then download (all in the calling thread).
+
+    See prepare_video() for the filtering; list pages run the same steps
+    through the pipeline instead.
+    """
+    job = prepare_video(url, site_config, general_config, headers,
+                        after_threshold=after_threshold, min_dur_minutes=min_dur_minutes,
+                        stop_event=stop_event)
+    if job is None:
+        return False
+    ok = download_job(job, site_config, general_config, dl_progress_cb=dl_progress_cb,
+                      video_info_cb=video_info_cb, stop_event=stop_event,
+                      job_progress_cb=job_progress_cb, state_set=state_set)
+    if ok:
+        finalize_job(job, apply_state, state_set, site_config)
     return ok
@@ -13,17 +13,22 @@ import random
 import requests
 import subprocess
 import shlex
-import cloudscraper
 import urllib.parse
 import tempfile
 import shutil
 import uuid
-import time
 from datetime import datetime
 from abc import ABC, abstractmethod
 from typing import Dict, Optional, Tuple, Any
 from tqdm import tqdm
 from loguru import logger
+from smutscrape.network import get_http_session
+from smutscrape.ytdlp import (
+    downloaded_files as ytdlp_output_files, embedded, extractor_args, get_ytdlp_engine
+)
+from smutscrape.browser import (
+    apply_resource_blocking, ready_condition, resource_seen_script, wait_until_ready
+)
 
 
 class DownloadError(Exception):
@@ -231,6 +236,10 @@ class YtDlpDownloader(BaseDownloader):
         """Download using yt-dlp with various options"""
         headers = headers or {}
         ua = self.get_user_agent(headers)
+
+        if embedded(self.site_config, self.general_config):
+            return self._download_embedded(url, destination_path, ua, metadata, desc,
+                                           overwrite, impersonate)
         
         command = ["yt-dlp", "-o", destination_path, "--user-agent", ua, "--progress"]
         
@@ -274,6 +283,33 @@ class YtDlpDownloader(BaseDownloader):
             logger.error(f"Exception during yt-dlp execution: {str(e)}")
             return False
 
+    def _download_embedded(self, url: str, destination_path: str, ua: str, metadata: Optional[Dict],
+                           desc: str, overwrite: bool, impersonate) -> bool:
+        """Same download through the in-process engine, with a tqdm bar fed by its progress hook"""
+        options = {'outtmpl': destination_path, 'http_headers': {'User-Agent': ua}}
+        if overwrite:
+            options['overwrites'] = True
+        if metadata and 'Image' in metadata:
+            options['writethumbnail'] = True
+            options['postprocessors'] = [
+                {'key': 'FFmpegThumbnailsConvertor', 'format': 'jpg', 'when': 'before_dl'},
+                {'key': 'EmbedThumbnail', 'already_have_thumbnail': False},
+            ]
+        if impersonate:
+            options['extractor_args'] = extractor_args(
+                "generic:impersonate" if impersonate is True else impersonate)
+
+        logger.debug(f"yt-dlp (in-process) options: {options}")
+        with tqdm(total=100, unit="%", desc=desc, bar_format="{l_bar}{bar}| {postfix}") as pbar:
+            def progress(pct, speed="", eta=""):
+                pbar.update(pct - pbar.n)
+                pbar.set_postfix_str(f"{speed} ETA {eta}" if eta else speed)
+            info = get_ytdlp_engine().download(url, options, progress)
+        if info is None:
+            return False
+        logger.debug(f"Successfully completed yt-dlp download to {destination_path}")
+        return True
+
 
 class FFmpegDownloader(BaseDownloader):
     """Downloader using FFmpeg for M3U8/streaming content"""
@@ -305,7 +341,7 @@ class FFmpegDownloader(BaseDownloader):
         
         try:
             # Fetch M3U8 content
-            scraper = cloudscraper.create_scraper()
+            scraper = get_http_session(self.site_config, self.general_config)
             response = scraper.get(url, headers=fetch_headers, timeout=30)
             response.raise_for_status()
             m3u8_content = response.text
@@ -604,7 +640,7 @@ class DownloadManager:
 
         # Import here to avoid circular imports
         try:
-            from config import get_config_manager
+            from smutscrape.cli import get_config_manager
             from smutscrape.utilities import is_url
             from smutscrape.storage import get_storage_manager
         except ImportError as e:
@@ -617,12 +653,18 @@ class DownloadManager:
             if not driver:
                 logger.error("Fallback: Failed to initialize Selenium driver for detection.")
                 return False
+            try:
+                selenium_user_agent = driver.execute_script('return navigator.userAgent;')
+            except Exception:
+                selenium_user_agent = None
             
             current_url_for_scan = url
             # Simplified iframe check for fallback
             try:
+                apply_resource_blocking(driver, ()) # Media sniffing needs every request to go through
                 driver.get(url) # Load the initial URL first
-                time.sleep(random.uniform(2,4)) # Allow page to load and scripts to potentially run
+                get_config_manager().driver_pool.record_navigation(driver)
+                wait_until_ready(driver, ready_condition(None, 'video'), timeout=4) # Let scripts inject the player/iframes
                 iframes = driver.find_elements(By.TAG_NAME, "iframe")
                 if iframes:
                     # Try to find a visible, reasonably sized iframe, or just the first one with a src
@@ -650,7 +692,7 @@ class DownloadManager:
                 video_url_detected = mp4_found_url
                 download_method = 'requests'
                 detection_headers.update({"Cookie": mp4_cookies, "Referer": current_url_for_scan,
-                                     "User-Agent": get_config_manager().selenium_user_agent or detection_headers["User-Agent"]})
+                                     "User-Agent": selenium_user_agent or detection_headers["User-Agent"]})
                 logger.info(f"Fallback: Detected MP4: {video_url_detected}")
             else:
                 logger.info(f"Fallback: MP4 not found via direct detection for {current_url_for_scan}, trying M3U8.")
@@ -660,7 +702,7 @@ class DownloadManager:
                     video_url_detected = m3u8_found_url
                     download_method = 'ffmpeg'
                     detection_headers.update({"Cookie": m3u8_cookies, "Referer": current_url_for_scan,
-                                         "User-Agent": get_config_manager().selenium_user_agent or detection_headers["User-Agent"]})
+                                         "User-Agent": selenium_user_agent or detection_headers["User-Agent"]})
                     logger.info(f"Fallback: Detected M3U8: {video_url_detected}")
                 else:
                     logger.warning(f"Fallback: Direct detection failed for MP4 and M3U8 on {current_url_for_scan}.")
@@ -668,6 +710,9 @@ class DownloadManager:
         except Exception as e:
             logger.warning(f"Fallback: Selenium not available or failed, cannot perform direct MP4/M3U8 detection: {e}")
             return False
+        finally:
+            if driver is not None:
+                get_config_manager().release_selenium_driver()
 
         if not video_url_detected or not download_method:
             logger.debug("Fallback: video_url_detected or download_method is missing after detection attempts.")
@@ -747,7 +792,7 @@ class DownloadManager:
             })();
         """)
 
-        time.sleep(5) # Wait for network requests
+        wait_until_ready(driver, {'script': resource_seen_script('.mp4')}, timeout=5) # Wait for network requests
 
         logs = driver.get_log("performance")
         mp4_urls = []
@@ -811,7 +856,7 @@ class DownloadManager:
             })();
         """)
 
-        time.sleep(5)
+        wait_until_ready(driver, {'script': resource_seen_script('.m3u8')}, timeout=5)
         
         logs = driver.get_log("performance")
         m3u8_urls = []
@@ -859,6 +904,24 @@ def download_with_ytdlp_fallback(url: str, temp_dir: str, general_config: Dict[s
     Returns:
         Tuple of (success, list of downloaded files)
     """
+    if embedded(None, general_config):
+        options = {
+            'paths': {'home': temp_dir},
+            'format': 'best',
+            'postprocessors': [{'key': 'FFmpegMetadata', 'add_metadata': True}],
+        }
+        if general_config.get('user_agents'):
+            options['http_headers'] = {'User-Agent': random.choice(general_config['user_agents'])}
+        with tqdm(total=100, unit="%", desc="Downloading") as pbar:
+            try:
+                info = get_ytdlp_engine().download(url, options, lambda pct, *_: pbar.update(pct - pbar.n))
+            except KeyboardInterrupt:
+                return False, []
+        files = [os.path.relpath(f, temp_dir) for f in ytdlp_output_files(info)]
+        if info is not None and not files:
+            files = os.listdir(temp_dir)
+        return info is not None, files
+
     command = f"yt-dlp --paths {temp_dir} --format best --add-metadata"
     if general_config.get('user_agents'):
         command += f" --user-agent \"{random.choice(general_config['user_agents'])}\""
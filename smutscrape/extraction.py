@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Compiled extraction plans for Smutscrape.
+
+A site's scraper selectors are interpreted once, when the site is loaded,
+into an ExtractionPlan: soupsieve selectors and postProcess regexes are
+precompiled and every field gets a FieldStrategy, so extracting 60-100
+items per list page is a tight loop instead of re-reading the YAML dict
+for each element.
+
+Plans produce exactly what the dict-walking extract_data() used to.
+They can also be shipped into a Selenium page (browser_spec()), in which
+case the browser returns raw texts/attributes as BrowserFields and only
+the finishing steps (dedup, postProcess) run in Python.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import soupsieve
+from bs4.element import Tag
+from loguru import logger
+
+from smutscrape.parsers import SOUPSIEVE_ONLY
+
+# Fields whose plain-text values are collected from every match (deduplicated).
+MULTI_VALUE_FIELDS = ('tags', 'actors', 'producers', 'studios')
+# Attribute fields that always take the first match, even when several elements match.
+SINGLE_ATTRIBUTE_FIELDS = ('url', 'download_url', 'image', 'date', 'duration')
+
+_UNSET = object()
+
+
+class FieldStrategy(Enum):
+    """How a field locates its elements."""
+    CSS = 'css'                    # one CSS selector
+    CSS_FALLBACKS = 'fallbacks'    # list of selectors, first one with matches wins
+    NAMESPACED_TAG = 'namespaced'  # 'media|content' style selector -> find_all('media:content')
+    SELF = 'self'                  # attribute read from the element itself (no selector)
+    IFRAME = 'iframe'              # selector evaluated inside an iframe via Selenium
+    NONE = 'none'                  # nothing usable configured; always ''
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """One compiled field of a scraper."""
+    name: str
+    strategy: FieldStrategy
+    selectors: Tuple[str, ...] = ()
+    compiled: Tuple[Optional[Any], ...] = ()
+    attribute: Optional[str] = None
+    iframe: Optional[str] = None
+    replacements: Tuple[Tuple[Optional[Pattern], str], ...] = ()
+    direct: Optional['FieldPlan'] = None   # IFRAME only: how to read the field without a driver
+
+    @property
+    def multi(self) -> bool:
+        return self.attribute is None and self.name in MULTI_VALUE_FIELDS
+
+    def _select(self, root, index: int, first_only: bool) -> List[Any]:
+        compiled = self.compiled[index]
+        if compiled is not None and isinstance(root, Tag):
+            if first_only:
+                match = compiled.select_one(root)
+                return [match] if match is not None else []
+            return compiled.select(root)
+        if first_only:
+            match = root.select_one(self.selectors[index])
+            return [match] if match is not None else []
+        return root.select(self.selectors[index])
+
+    def elements(self, root, driver=None, site_config=None) -> List[Any]:
+        first_only = self.attribute is None and not self.multi
+        strategy = self.strategy
+        if strategy is FieldStrategy.IFRAME:
+            if driver and site_config:
+                return self._iframe_elements(driver, site_config)
+            # Without a driver the iframe key is ignored and the selector used directly.
+            return self.direct.elements(root)
+        if strategy is FieldStrategy.CSS:
+            return self._select(root, 0, first_only)
+        if strategy is FieldStrategy.CSS_FALLBACKS:
+            for index in range(len(self.selectors)):
+                found = self._select(root, index, first_only)
+                if found:
+                    return found
+            return []
+        if strategy is FieldStrategy.NAMESPACED_TAG:
+            return root.find_all(self.selectors[0].replace('|', ':', 1))
+        if strategy is FieldStrategy.SELF:
+            return [root]
+        return []
+
+    def _iframe_elements(self, driver, site_config) -> List[Any]:
+        from selenium.webdriver.common.by import By
+        from smutscrape.parsers import make_soup, resolve_parser
+        try:
+            iframe = driver.find_element(By.CSS_SELECTOR, self.iframe)
+            driver.switch_to.frame(iframe)
+            iframe_soup = make_soup(driver.page_source, resolve_parser(site_config))
+            elements = iframe_soup.select(self.selectors[0])
+            driver.switch_to.default_content()
+            return elements
+        except Exception as e:
+            logger.error(f"Failed to pierce iframe for '{self.name}': {e}")
+            return []
+
+    def raw_values(self, elements: List[Any]) -> List[Any]:
+        """What value() reads from the elements: attribute values, or texts."""
+        if self.attribute is not None:
+            return [el.get(self.attribute) for el in elements]
+        if not self.multi:
+            elements = elements[:1]
+        return [el.text if hasattr(el, 'text') else None for el in elements]
+
+    def value(self, elements: List[Any]) -> Any:
+        """Turn matched elements into the field value, then apply postProcess."""
+        return self.finalize(self.raw_values(elements))
+
+    def finalize(self, raw: List[Any]) -> Any:
+        """Build the field value from raw_values() output (or the in-browser equivalent)."""
+        if not raw:
+            return ''
+        if self.attribute is not None:
+            values = [v for v in raw if v]
+            if self.name in SINGLE_ATTRIBUTE_FIELDS:
+                value = values[0] if values else ''
+            else:
+                value = values[0] if len(values) == 1 else values if values else ''
+            if value is None: value = ''
+        elif self.multi:
+            texts = (t.strip() for t in raw if t)
+            seen = set()
+            value = [v for v in texts if v and not (v.lower() in seen or seen.add(v.lower()))]
+        else:
+            value = raw[0].strip() if raw[0] else ''
+
+        for pattern, replacement in self.replacements:
+            if pattern is None:
+                return ''
+            if isinstance(value, list):
+                value = [pattern.sub(replacement, v) if v else '' for v in value]
+            else:
+                value = pattern.sub(replacement, value) if value else ''
+        return value
+
+    def browser_spec(self) -> Optional[Dict[str, Any]]:
+        """
+        JSON-able description of this field for in-page extraction
+        (see browser.extract_in_browser), or None if it needs Python:
+        iframe and namespaced-tag fields and soupsieve-only selectors.
+        """
+        if self.strategy in (FieldStrategy.IFRAME, FieldStrategy.NAMESPACED_TAG):
+            return None
+        if any(token in s for s in self.selectors for token in SOUPSIEVE_ONLY):
+            return None
+        return {
+            'name': self.name,
+            'mode': self.strategy.value,
+            'selectors': list(self.selectors),
+            'attribute': self.attribute,
+            'all': self.attribute is not None or self.multi,
+        }
+
+
+class BrowserFields(dict):
+    """Raw per-field values collected inside the page, keyed by field name."""
+
+
+class ExtractionPlan:
+    """A scraper's fields compiled for repeated extraction."""
+
+    def __init__(self, fields: Tuple[FieldPlan, ...]):
+        self.fields = fields
+        self._browser_spec = _UNSET
+
+    def __repr__(self) -> str:
+        return f"ExtractionPlan({[f'{f.name}:{f.strategy.value}' for f in self.fields]})"
+
+    def browser_spec(self) -> Optional[List[Dict[str, Any]]]:
+        """Field specs for in-page extraction, or None if any field can't run there."""
+        if self._browser_spec is _UNSET:
+            specs = [plan.browser_spec() for plan in self.fields]
+            self._browser_spec = None if any(s is None for s in specs) else specs
+        return self._browser_spec
+
+    def extract(self, soup, driver=None, site_config=None) -> Dict[str, Any]:
+        """
+        Extract every field from a page or list-item element.
+
+        Args:
+            soup: Parsed page or element (BeautifulSoup Tag or parsers.LexborNode),
+                or BrowserFields already collected inside the page.
+            driver: Selenium driver, only needed for iframe fields.
+            site_config: Raw site dict; used for m3u8_mode and iframe parsing.
+
+        Returns:
+            Dict mapping field name to its value ('' when nothing matched).
+        """
+        data = {}
+        skip_download = bool(site_config and site_config.get('m3u8_mode', False))
+        if isinstance(soup, BrowserFields):
+            for plan in self.fields:
+                if not (skip_download and plan.name == 'download_url'):
+                    data[plan.name] = plan.finalize(soup.get(plan.name) or [])
+            return data
+        for plan in self.fields:
+            if skip_download and plan.name == 'download_url':
+                continue
+            elements = plan.elements(soup, driver, site_config)
+            data[plan.name] = plan.value(elements) if elements else ''
+        return data
+
+
+def _compile_selector(selector: str):
+    try:
+        return soupsieve.compile(selector)
+    except Exception as e:
+        logger.warning(f"[PLAN] Selector '{selector}' does not compile ({e}); it will be evaluated per call.")
+        return None
+
+
+def _compile_replacements(post_process) -> Tuple[Tuple[Optional[Pattern], str], ...]:
+    steps = []
+    for step in post_process or []:
+        if not isinstance(step, dict) or 'replace' not in step:
+            continue
+        for pair in step['replace']:
+            try:
+                steps.append((re.compile(pair['regex'], re.DOTALL), pair['with']))
+            except re.error as e:
+                # An invalid regex blanks the field, as it always has; say why once.
+                logger.warning(f"[PLAN] Invalid postProcess regex {pair['regex']!r}: {e}")
+                steps.append((None, pair['with']))
+    return tuple(steps)
+
+
+def compile_field(name: str, config: Any) -> FieldPlan:
+    """Compile one field's selector config (string or dict) into a FieldPlan."""
+    if isinstance(config, str):
+        return FieldPlan(name, FieldStrategy.CSS, (config,), (_compile_selector(config),))
+    if not isinstance(config, dict):
+        return FieldPlan(name, FieldStrategy.NONE)
+
+    attribute = config.get('attribute')
+    replacements = _compile_replacements(config.get('postProcess'))
+    selector = config.get('selector')
+
+    if 'iframe' in config:
+        direct = compile_field(name, {k: v for k, v in config.items() if k != 'iframe'})
+        selector = selector if selector is not None else ''
+        return FieldPlan(name, FieldStrategy.IFRAME, (selector,), (None,),
+                         attribute, config['iframe'], replacements, direct)
+    if selector is None:
+        strategy = FieldStrategy.SELF if 'attribute' in config else FieldStrategy.NONE
+        return FieldPlan(name, strategy, attribute=attribute, replacements=replacements)
+    if isinstance(selector, list):
+        selectors = tuple(selector)
+        return FieldPlan(name, FieldStrategy.CSS_FALLBACKS, selectors,
+                         tuple(_compile_selector(s) for s in selectors), attribute, None, replacements)
+    if '|' in selector:
+        return FieldPlan(name, FieldStrategy.NAMESPACED_TAG, (selector,), (None,),
+                         attribute, None, replacements)
+    return FieldPlan(name, FieldStrategy.CSS, (selector,), (_compile_selector(selector),),
+                     attribute, None, replacements)
+
+
+def compile_plan(selectors: Dict[str, Any]) -> ExtractionPlan:
+    """Compile a scraper's field dict (as found in the site YAML) into an ExtractionPlan."""
+    return ExtractionPlan(tuple(compile_field(name, config) for name, config in selectors.items()))
+
+
+# Plans keyed by the content of the selector dict they were compiled from, so a
+# reloaded or edited site config gets a plan matching what it says now, and
+# equal dicts (a site loaded again) share one. The least recently used are
+# dropped past MAX_PLANS.
+MAX_PLANS = 256
+_plans: "OrderedDict[str, ExtractionPlan]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def _plan_key(selectors: Dict[str, Any]) -> str:
+    # Not sort_keys: the field order is the order of the extracted dict.
+    return json.dumps(selectors, default=str)
+
+
+def get_extraction_plan(selectors: Dict[str, Any]) -> ExtractionPlan:
+    """Return the cached plan for a selector dict, compiling it on first use."""
+    key = _plan_key(selectors)
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    plan = compile_plan(selectors)
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > MAX_PLANS:
+            _plans.popitem(last=False)
+    return plan
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Pagination Fan-out for Smutscrape
+
+Modes with `url_pattern_pages` can build any page's URL up front, so their
+list pages need not be read one after another. With fan-out on, the last
+page is found first -- exponential probing (start+1, +2, +4, ...) until a
+page comes back empty, then a binary search between the last full and the
+first empty probe -- and every page up to it is read on a thread pool. The
+pages are handed back in page order with items already seen on an earlier
+page dropped, since listings shift while they are being paged through.
+
+    fanout:
+      enabled:      false   # or --fan-out on the command line
+      workers:      4       # list pages read at once
+      probe_limit:  10000   # never probe past this page
+
+Requests still go through the per-domain rate limiter, so the `rate:` block
+is the budget the workers share; `between_pages` does not apply to them.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from smutscrape.network import merge_site_option
+
+DEFAULT_FANOUT = {'enabled': False, 'workers': 4, 'probe_limit': 10000}
+
+
+def fanout_settings(site_config: Optional[Dict[str, Any]],
+                    general_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fan-out settings: defaults, then config.yaml, then the site YAML."""
+    settings = dict(DEFAULT_FANOUT)
+    settings.update(merge_site_option('fanout', site_config, general_config))
+    settings['enabled'] = bool(settings['enabled'])
+    settings['workers'] = max(1, int(settings['workers']))
+    settings['probe_limit'] = max(1, int(settings['probe_limit']))
+    return settings
+
+
+def find_last_page(has_items: Callable[[int], bool], known: int = 1,
+                   limit: Optional[int] = None) -> int:
+    """
+    Last page that has items, by exponential probing then binary search.
+
+    Args:
+        has_items: Reads a page and says whether it has any items.
+        known: A page already known to have items.
+        limit: Highest page that may exist.
+
+    Returns:
+        The last page with items (at least `known`).
+    """
+    good, bad, step = known, None, 1
+    while bad is None:
+        probe = known + step
+        if limit is not None and probe >= limit:
+            probe = limit
+        if probe <= good:
+            return good
+        if has_items(probe):
+            good = probe
+            if probe == limit:
+                return good
+            step *= 2
+        else:
+            bad = probe
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if has_items(mid):
+            good = mid
+        else:
+            bad = mid
+    return good
+
+
+class PageFanout:
+    """Reads numbered list pages on a thread pool and hands them back in page order."""
+
+    def __init__(self, read_page: Callable[[int], Optional[List[Any]]], workers: int = 4,
+                 first: int = 1, limit: Optional[int] = None, stop_event=None):
+        """
+        Args:
+            read_page: Fetches page n and returns its items; None or an empty
+                list once past the end.
+            workers: Pages read at once.
+            first: Page the listing starts at.
+            limit: Highest page that may exist (max_pages / probe_limit).
+            stop_event: threading.Event; once set, no further pages are read.
+        """
+        self.read_page = read_page
+        self.first = first
+        self.limit = limit
+        self.stop_event = stop_event
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+        self._pages: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._first_keys: Optional[frozenset] = None
+
+    def stopped(self) -> bool:
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def _future(self, page: int) -> Future:
+        with self._lock:
+            future = self._pages.get(page)
+            # A page whose read failed is read again the next time it is asked for.
+            if future is None or (future.done() and not future.cancelled() and future.result() is None):
+                future = self._pages[page] = self._executor.submit(self._read, page)
+            return future
+
+    def _read(self, page: int) -> Optional[List[Any]]:
+        if self.stopped():
+            return []
+        try:
+            return self.read_page(page) or []
+        except Exception as e:
+            logger.error(f"[FANOUT] Reading page {page} failed: {e}")
+            return None
+
+    def items(self, page: int) -> List[Any]:
+        """
+        Page's items, reading it now unless it was already read or queued.
+        A page that failed to read has none (and is read again next time).
+        """
+        return self._future(page).result() or []
+
+    def has_items(self, page: int, key: Optional[Callable[[Any], Hashable]] = None) -> bool:
+        """
+        True if the page has items -- and, when key is given, is not the first
+        page over again (sites that redirect out-of-range pages to page one).
+        """
+        items = self.items(page)
+        if not items:
+            return False
+        if key is None or page == self.first:
+            return True
+        if self._first_keys is None:
+            self._first_keys = frozenset(key(item) for item in self.items(self.first))
+        return frozenset(key(item) for item in items) != self._first_keys
+
+    def last_page(self, key: Optional[Callable[[Any], Hashable]] = None) -> int:
+        """Find the last page; probes are read once and kept for pages()."""
+        last = find_last_page(lambda page: self.has_items(page, key), self.first, self.limit)
+        logger.info(f"[FANOUT] Last page: {last}")
+        return last
+
+    def pages(self, key: Optional[Callable[[Any], Hashable]] = None) -> Iterator[Tuple[int, List[Any]]]:
+        """
+        Yield (page, items) from the first page to the last, in page order,
+        leaving out items whose key was already yielded.
+
+        All pages are queued at once and read `workers` at a time. If the last
+        page is as full as the first one, the pages after it are read one by
+        one until an empty one, in case a failed probe cut the search short.
+        """
+        if not self.has_items(self.first):
+            return
+        last = self.last_page(key)
+        for page in range(self.first, last + 1):
+            self._future(page)
+        full = len(self.items(self.first))
+        seen = set()
+        page = self.first
+        while not self.stopped():
+            items = self.items(page)
+            if page > last and not self.has_items(page, key):
+                break
+            fresh = []
+            for item in items:
+                item_key = key(item) if key else None
+                if item_key is not None:
+                    if item_key in seen:
+                        continue
+                    seen.add(item_key)
+                fresh.append(item)
+            dropped = len(items) - len(fresh)
+            if dropped:
+                logger.debug(f"[FANOUT] Page {page}: dropped {dropped} item(s) seen on earlier pages")
+            yield page, fresh
+            if page >= last and (len(items) < full or (self.limit is not None and page >= self.limit)):
+                break
+            page += 1
+
+    def close(self):
+        """Cancel pages not yet read and let the workers go."""
+        with self._lock:
+            futures = list(self._pages.values())
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
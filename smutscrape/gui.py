@@ -15,7 +15,7 @@ import yaml
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 from smutscrape.cli import get_site_manager, load_configuration, get_session_manager
-from smutscrape.core import process_list_page, construct_url
+from smutscrape.core import process_list_pages, construct_url
 from smutscrape.config_editor import ConfigEditor
 
 _SITES_DIR = os.path.join(
@@ -230,6 +230,7 @@ class SmutscrapeGUI:
         self.log_queue       = queue.Queue()
         self._loguru_sink_id = None
         self._stop_event     = threading.Event()
+        self._job_rows       = {}
         self.site_manager    = get_site_manager()
         self.sites           = self.site_manager.sites
         self.site_names      = sorted([s.name for s in self.sites.values()])
@@ -660,6 +661,12 @@ class SmutscrapeGUI:
                     fg=C["fg"], font=("Courier", 9)
                     ).grid(row=3, column=2, sticky="w", padx=4)
 
+        # One bar per running download; only shown while several run at once.
+        self.jobs_frame = tk.Frame(prog, bg=C["panel"])
+        self.jobs_frame.columnconfigure(1, weight=1)
+        self.jobs_frame.grid(row=4, column=0, columnspan=4, sticky="ew", pady=(2, 0))
+        self.jobs_frame.grid_remove()
+
         # ── STATUS BAR ──────────────────────────────────────────────────────
         self.status_var = tk.StringVar(value="Ready")
         tk.Label(self._inner, textvariable=self.status_var,
@@ -850,6 +857,38 @@ class SmutscrapeGUI:
         if eta:   label += f"  ETA {eta}"
         self.dl_pct_var.set(label)
 
+    def _set_job_progress(self, job_id, title, pct, speed="", eta=""):
+        row = self._job_rows.get(job_id)
+        if pct is None:
+            if row:
+                for widget in row[:3]:
+                    widget.destroy()
+                del self._job_rows[job_id]
+        else:
+            if row is None:
+                name = title if len(title) <= 30 else title[:29] + "\u2026"
+                label = self._label(self.jobs_frame, name, width=32, anchor="e", fg=C["fg_dim"])
+                bar = ttk.Progressbar(self.jobs_frame, orient="horizontal", length=300,
+                                      mode="determinate", maximum=100,
+                                      style="green.Horizontal.TProgressbar")
+                pct_var = tk.StringVar(value="")
+                pct_label = self._label(self.jobs_frame, textvariable=pct_var, width=20,
+                                        anchor="w", font=("Courier", 9))
+                row = self._job_rows[job_id] = (label, bar, pct_label, pct_var)
+                r = job_id
+                label.grid(row=r, column=0, sticky="e", pady=1)
+                bar.grid(row=r, column=1, sticky="ew", padx=4)
+                pct_label.grid(row=r, column=2, sticky="w", padx=4)
+            row[1]["value"] = pct
+            text = f"{pct:.1f}%"
+            if speed: text += f"  {speed}"
+            if eta:   text += f"  ETA {eta}"
+            row[3].set(text)
+        if len(self._job_rows) > 1:
+            self.jobs_frame.grid()
+        else:
+            self.jobs_frame.grid_remove()
+
     def _set_global_progress(self, done, total):
         pct = (done / total * 100) if total else 0
         self.global_bar["value"] = pct
@@ -884,6 +923,9 @@ class SmutscrapeGUI:
                 elif kind == "dl_progress":
                     _, pct, speed, eta = item
                     self._set_dl_progress(pct, speed, eta)
+                elif kind == "job_progress":
+                    _, job_id, title, pct, speed, eta = item
+                    self._set_job_progress(job_id, title, pct, speed, eta)
                 elif kind == "global_progress":
                     _, done, total = item
                     self._set_global_progress(done, total)
@@ -955,11 +997,11 @@ class SmutscrapeGUI:
 
     def _stop_scraping(self):
         self._stop_event.set()
-        self.status_var.set("Stop requested \u2014 finishing current video...")
+        self.status_var.set("Stop requested \u2014 cancelling downloads...")
         self.stop_button.config(state="disabled")
         self._log(
             f"[{datetime.datetime.now().strftime('%H:%M:%S')}] "
-            "Stop requested by user \u2014 will abort after current video.",
+            "Stop requested by user \u2014 running downloads are being cancelled.",
             "stopped"
         )
 
@@ -993,8 +1035,8 @@ class SmutscrapeGUI:
                 self.log_queue.put(("video_info", title, date, duration))
             def global_progress_cb(done, total):
                 self.log_queue.put(("global_progress", done, total))
-
-            import time as _time
+            def job_progress_cb(job_id, title, pct, speed="", eta=""):
+                self.log_queue.put(("job_progress", job_id, title, pct, speed, eta))
 
             for target_idx, query in enumerate(targets):
                 if self._stop_event.is_set(): break
@@ -1010,38 +1052,30 @@ class SmutscrapeGUI:
                 ph_match        = _re.search(r'\{(\w+)\}', url_pattern)
                 placeholder_key = ph_match.group(1) if ph_match else mode
                 constructed_url = construct_url(
-                    site_obj.base_url, url_pattern, site_dict,
-                    mode=mode, **{placeholder_key: query}
+                    site_obj.base_url, url_pattern, site_dict, mode=mode,
+                    filters={'after': after_date, 'min_duration': min_duration},
+                    **{placeholder_key: query}
                 )
                 from loguru import logger as _logger
                 _logger.debug(f"[GUI] URL: {constructed_url}")
 
-                current_url  = constructed_url
-                current_page = start_page
-                while current_url:
-                    if self._stop_event.is_set(): break
-                    next_url, next_page, ok = process_list_page(
-                        current_url, site_dict, general_config,
-                        page_num=current_page, video_offset=0,
-                        mode=mode, identifier=query,
-                        overwrite=overwrite,
-                        headers=general_config.get('headers', {}),
-                        new_nfo=re_nfo,
-                        apply_state=self.applystate_var.get(),
-                        state_set=state_set,
-                        after_date=after_date,
-                        min_duration=min_duration,
-                        dl_progress_cb=dl_progress_cb,
-                        video_info_cb=video_info_cb,
-                        global_progress_cb=global_progress_cb,
-                        stop_event=self._stop_event,
-                    )
-                    current_url = next_url
-                    if next_page: current_page = next_page
-                    if current_url and not self._stop_event.is_set():
-                        _time.sleep(
-                            general_config.get('sleep', {}).get('between_pages', 3)
-                        )
+                process_list_pages(
+                    constructed_url, site_dict, general_config,
+                    page_num=start_page, video_offset=0,
+                    mode=mode, identifier=query,
+                    overwrite=overwrite,
+                    headers=general_config.get('headers', {}),
+                    new_nfo=re_nfo,
+                    apply_state=self.applystate_var.get(),
+                    state_set=state_set,
+                    after_date=after_date,
+                    min_duration=min_duration,
+                    dl_progress_cb=dl_progress_cb,
+                    video_info_cb=video_info_cb,
+                    global_progress_cb=global_progress_cb,
+                    stop_event=self._stop_event,
+                    job_progress_cb=job_progress_cb,
+                )
 
             if not self._stop_event.is_set():
                 self.log_queue.put(("log",
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Hashed Membership Index for Smutscrape
+
+A compact on-disk set of 64-bit URL hashes that answers "definitely not
+seen" without a database query or any per-URL Python objects, for
+download ledgers holding millions of URLs.
+
+    <name>.idx.N header, the hashes sorted as a uint64 array, a Bloom filter
+    <name>.log   hashes added since, appended 8 bytes at a time
+
+The .idx file is memory-mapped, so opening it costs the same for ten URLs
+or ten million. A lookup checks the Bloom filter (~1% false positives),
+then the few hashes in the log, then binary-searches the mapped array.
+Once the log passes COMPACT_AT entries it is merged into a new .idx.
+
+Several processes (CLI, GUI, API) may share an index: appends and
+compaction hold a lock file, and a reader notices a replaced or grown log
+and catches up before answering. Compaction writes the next generation,
+<name>.idx.N+1, rather than replacing a file other processes may have
+mapped (which Windows refuses); older generations are removed once no
+process maps them any more.
+
+The index can only say "no" or "maybe" -- hash collisions and removed
+entries are resolved by whatever it fronts (see ledger.py).
+"""
+
+import glob
+import hashlib
+import heapq
+import os
+import struct
+import time
+import uuid
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from mmap import ACCESS_READ, mmap
+from typing import Iterable, Iterator, Optional, Set
+
+from loguru import logger
+
+MAGIC = b'SSIX'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQ16s')   # magic, version, count, bloom bits, token
+BITS_PER_ENTRY = 10                    # Bloom filter size; ~1% false positives
+BLOOM_HASHES = 7
+COMPACT_AT = 4096                      # log entries before they are merged into the .idx
+LOCK_TIMEOUT = 10                      # seconds to wait for another process's lock
+STALE_LOCK = 60                        # seconds after which a leftover lock file is ignored
+LOG_CHECK_INTERVAL = 1.0               # seconds between lookups' checks for other processes' appends
+
+
+def url_hash(key: str) -> int:
+    """64-bit hash of a (canonical) URL."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _bloom_positions(h: int, bits: int):
+    # Double hashing: the two halves of the 64-bit hash give all k positions.
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    return ((h1 + i * h2) % bits for i in range(BLOOM_HASHES))
+
+
+def _unique(ordered: Iterable[int]) -> Iterator[int]:
+    last = None
+    for h in ordered:
+        if h != last:
+            yield h
+            last = h
+
+
+class HashIndex:
+    """Memory-mapped sorted uint64 hashes with a Bloom filter in front and an append log."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Base path; ``.idx``, ``.log`` and ``.lock`` are added to it.
+        """
+        self.base_idx_path = f"{path}.idx"
+        self.idx_path = self.base_idx_path
+        self.log_path = f"{path}.log"
+        self.lock_path = f"{path}.lock"
+        self.token: Optional[bytes] = None
+        self._map: Optional[mmap] = None
+        self._view = None
+        self._hashes = None
+        self._bloom = None
+        self._bloom_bits = 0
+        self._log: Set[int] = set()
+        self._log_id = None
+        self._log_offset = 0
+        self._checked_at = 0.0
+        self._load()
+
+    # -- reading -------------------------------------------------------------
+
+    def _generations(self):
+        """Existing .idx files as (generation, path), oldest first; a bare .idx is generation 0."""
+        found = []
+        for candidate in glob.glob(glob.escape(self.base_idx_path) + '*'):
+            suffix = candidate[len(self.base_idx_path):]
+            if not suffix:
+                found.append((0, candidate))
+            elif suffix[1:].isdigit() and suffix[0] == '.':
+                found.append((int(suffix[1:]), candidate))
+        return sorted(found)
+
+    def _load(self):
+        self._unmap()
+        self.token = None
+        generations = self._generations()
+        self.idx_path = generations[-1][1] if generations else self.base_idx_path
+        if os.path.exists(self.idx_path):
+            try:
+                self._map_index()
+            except Exception as e:
+                logger.warning(f"[INDEX] Ignoring unreadable index '{self.idx_path}': {e}")
+                self._unmap()
+                self.token = None
+        self._log, self._log_id, self._log_offset = set(), None, 0
+        self._read_log()
+
+    def _map_index(self):
+        with open(self.idx_path, 'rb') as f:
+            self._map = mmap(f.fileno(), 0, access=ACCESS_READ)
+        magic, version, count, bloom_bits, token = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a smutscrape index")
+        self._view = memoryview(self._map)
+        start = HEADER.size
+        self._hashes = self._view[start:start + 8 * count].cast('Q')
+        self._bloom = self._view[start + 8 * count:start + 8 * count + (bloom_bits + 7) // 8]
+        self._bloom_bits = bloom_bits
+        self.token = token
+
+    def _unmap(self):
+        for view in (self._hashes, self._bloom, self._view):
+            if view is not None:
+                view.release()
+        self._hashes = self._bloom = self._view = None
+        self._bloom_bits = 0
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _read_log(self):
+        """Catch up with hashes appended by this or another process; reload after a compaction."""
+        self._checked_at = time.monotonic()
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if self._log_id is not None and st.st_ino != self._log_id:
+            self._load()   # compacted elsewhere: the entries moved into a new .idx
+            return
+        if self._log_id is None:
+            generations = self._generations()
+            if generations and generations[-1][1] != self.idx_path:
+                self._load()   # written elsewhere since we found no index
+                return
+        self._log_id = st.st_ino
+        if st.st_size <= self._log_offset:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read(st.st_size - self._log_offset)
+        whole = len(data) - len(data) % 8   # a concurrent append may be half-written
+        self._log.update(array('Q', data[:whole]))
+        self._log_offset += whole
+
+    def __contains__(self, h: int) -> bool:
+        """False if h was definitely never added; True if it may have been."""
+        if time.monotonic() - self._checked_at >= LOG_CHECK_INTERVAL:
+            self._read_log()
+        if h in self._log:
+            return True
+        if self._hashes is None or not len(self._hashes):
+            return False
+        if not all(self._bloom[pos >> 3] & (1 << (pos & 7)) for pos in _bloom_positions(h, self._bloom_bits)):
+            return False
+        i = bisect_left(self._hashes, h)
+        return i < len(self._hashes) and self._hashes[i] == h
+
+    def __len__(self) -> int:
+        return (len(self._hashes) if self._hashes is not None else 0) + len(self._log)
+
+    # -- writing -------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > STALE_LOCK:
+                        os.remove(self.lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"index lock '{self.lock_path}' is held")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(self.lock_path)
+
+    def add(self, h: int):
+        """Record h (appended to the log; merged into the .idx by compact())."""
+        self._read_log()
+        if h in self:
+            return
+        with self._locked():
+            with open(self.log_path, 'ab') as f:
+                f.write(array('Q', [h]).tobytes())
+        self._read_log()
+        if len(self._log) >= COMPACT_AT:
+            self.compact()
+
+    def compact(self):
+        """Merge the log into a new .idx."""
+        with self._locked():
+            self._read_log()
+            if not self._log:
+                return
+            current = self._hashes if self._hashes is not None else ()
+            self._write(_unique(heapq.merge(current, sorted(self._log))), self.token)
+
+    def rebuild(self, hashes: Iterable[int], token: Optional[bytes] = None) -> bytes:
+        """
+        Replace the whole index with hashes (e.g. from the ledger it fronts).
+
+        Returns:
+            The new index's token, which the owner stores to recognise it later.
+        """
+        token = token or uuid.uuid4().bytes
+        with self._locked():
+            self._write(sorted(set(hashes)), token)
+        return token
+
+    def _write(self, ordered_hashes: Iterable[int], token: Optional[bytes]):
+        # Caller holds the lock. Hashes are stored in native byte order.
+        ordered = array('Q', ordered_hashes)
+        bloom_bits = max(64, len(ordered) * BITS_PER_ENTRY)
+        bloom = bytearray((bloom_bits + 7) // 8)
+        for h in ordered:
+            for pos in _bloom_positions(h, bloom_bits):
+                bloom[pos >> 3] |= 1 << (pos & 7)
+        generations = self._generations()
+        path = f"{self.base_idx_path}.{generations[-1][0] + 1 if generations else 1}"
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(ordered), bloom_bits, token or uuid.uuid4().bytes))
+            f.write(ordered.tobytes())
+            f.write(bloom)
+        # A new name: other processes may still have the current generation mapped.
+        os.replace(tmp, path)
+        # A fresh (empty) log with a new inode tells other processes to reload.
+        with open(f"{self.log_path}.tmp", 'wb'):
+            pass
+        os.replace(f"{self.log_path}.tmp", self.log_path)
+        self._load()
+        for _, old in generations:
+            try:
+                os.remove(old)
+            except OSError:
+                pass   # still mapped by another process (Windows); removed by a later write
+        logger.debug(f"[INDEX] Wrote {len(ordered)} hash(es) to {self.idx_path}")
+
+    def close(self):
+        """Compact a long log and unmap the index."""
+        if len(self._log) >= COMPACT_AT:
+            self.compact()
+        self._unmap()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Incremental Sync for Smutscrape
+
+With `--incremental`, a listing is walked only until it turns into videos
+seen before, instead of to its last page. Listings put the newest videos
+first, so pagination stops at the first of:
+
+  - the video that was newest when this query last ran (its high-water mark),
+  - `known_items` already-processed videos in a row,
+  - a page on which every video was already processed.
+
+The high-water mark -- the key, URL and listed date of the newest video
+that is downloaded -- is stored per query in the download ledger when a
+run that started on page one finishes. Newer videos that failed or were
+filtered out stay above the mark, so the next run reaches them again.
+Known videos listed above new ones are pinned (sticky) entries, not the
+newest, and never become the mark; nor does anything when a run is
+stopped or a page could not be read, since the videos below were never
+reached.
+Active --after/--min-duration filters are part of the query, so a
+filtered run never cuts short an unfiltered one. Dates are recorded but
+not used to stop: list pages often give them only to the month or year.
+
+    incremental:
+      known_items:  10    # consecutive known videos before pagination stops
+
+The same reasoning stops `--after` runs early on modes that declare
+`sort: date_desc` in the site YAML: once `date_cutoff_items` videos in a
+row, or every video on a page, predate the threshold, the rest of the
+listing is older still (see DateCutoff).
+"""
+
+import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from smutscrape.ledger import DONE
+from smutscrape.network import merge_site_option
+
+DEFAULT_INCREMENTAL = {'known_items': 10}
+DEFAULT_DATE_CUTOFF_ITEMS = 10
+
+
+def incremental_settings(site_config: Optional[Dict[str, Any]],
+                         general_config: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Incremental settings: defaults, then config.yaml, then the site YAML."""
+    settings = dict(DEFAULT_INCREMENTAL)
+    settings.update(merge_site_option('incremental', site_config, general_config))
+    return {'known_items': max(1, int(settings['known_items']))}
+
+
+class IncrementalSync:
+    """Decides, item by item, when an incremental run has reached videos it already knows."""
+
+    def __init__(self, query: str, ledger=None, known_items: int = DEFAULT_INCREMENTAL['known_items'],
+                 record_newest: bool = True):
+        """
+        Args:
+            query: Identifies the listing (site, mode, term and filters), e.g. "ml:tag:foo".
+            ledger: DownloadLedger holding the high-water marks, or None to keep none.
+            known_items: Consecutive known videos before pagination stops.
+            record_newest: Whether this run sees the listing's first item (started on page one).
+        """
+        self.query = query
+        self.ledger = ledger
+        self.known_items = known_items
+        self.record_newest = record_newest
+        self.mark = ledger.watermark(query) if ledger is not None else None
+        self._listed = []   # (url, key, date, known) in listing order, up to the first known item
+        self._listed_done = not record_newest
+        self._listed_new = False
+        self.stopped = False
+        self.aborted = False
+        self.reason = None
+        self._run = 0
+        self._page_items = 0
+        self._page_known = 0
+        if self.mark:
+            dated = f" ({self.mark['newest_date']})" if self.mark['newest_date'] else ""
+            logger.info(f"[INCREMENTAL] Last sync's newest video: {self.mark['newest_url']}{dated}")
+
+    def _stop(self, reason: str):
+        self.stopped, self.reason = True, reason
+        logger.info(f"[INCREMENTAL] Stopping: {reason}")
+
+    def abort(self, reason: str):
+        """The run ended before the listing did; finish() keeps the old high-water mark."""
+        self.aborted = True
+        logger.info(f"[INCREMENTAL] Keeping the high-water mark: {reason}")
+
+    def begin_page(self):
+        self._page_items = self._page_known = 0
+
+    def see(self, url: str, key: str, date: Optional[datetime.date], known: bool) -> bool:
+        """
+        Account for the next item in listing order.
+
+        Args:
+            url: The item's video URL.
+            key: Its canonical_url() key.
+            date: Its listed date, if any.
+            known: Whether it was already processed.
+
+        Returns:
+            True if pagination should stop here (this item and the rest are not processed).
+        """
+        if not self._listed_done:
+            self._listed.append((url, key, date, known))
+            # Known items above the first new one may be pinned; keep listing past them.
+            self._listed_done = known and self._listed_new
+            self._listed_new = self._listed_new or not known
+        if self.mark and key == self.mark['newest_key']:
+            self._stop("reached the newest video of the last sync")
+            return True
+        self._page_items += 1
+        if known:
+            self._page_known += 1
+            self._run += 1
+            if self._run >= self.known_items:
+                self._stop(f"{self._run} already-processed videos in a row")
+                return True
+        else:
+            self._run = 0
+        return False
+
+    def end_page(self):
+        """Stop after a page on which every video was already known."""
+        if not self.stopped and self._page_items and self._page_known == self._page_items:
+            self._stop("every video on the page was already processed")
+
+    def finish(self):
+        """
+        Move the query's high-water mark to the newest listed video now in
+        the ledger as downloaded (or already known when it was listed).
+        Known videos listed above the first new one are skipped as pinned.
+        Without one, or without any new video listed, or after abort(), the
+        previous mark is kept.
+        """
+        if self.ledger is None or self.aborted:
+            return
+        first_new = next((i for i, item in enumerate(self._listed) if not item[3]), len(self._listed))
+        for url, key, date, known in self._listed[first_new:]:
+            if known or self.ledger.status(url) == DONE:
+                self.ledger.set_watermark(self.query, key, url, date.isoformat() if date else None)
+                logger.debug(f"[INCREMENTAL] High-water mark for {self.query}: {url}")
+                return
+        logger.debug(f"[INCREMENTAL] Nothing new was downloaded for {self.query}; keeping its high-water mark")
+
+
+def date_sorted(site_config: Dict[str, Any], mode: Optional[str]) -> bool:
+    """True if the site YAML declares the mode's listing newest-first (`sort: date_desc`)."""
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    return mode_config.get('sort') == 'date_desc'
+
+
+def date_cutoff_items(site_config: Dict[str, Any], general_config: Optional[Dict[str, Any]],
+                      mode: Optional[str] = None) -> int:
+    """Consecutive too-old videos before a date-sorted listing stops: mode, then site, then config.yaml."""
+    mode_config = site_config.get('modes', {}).get(mode) or {}
+    for source in (mode_config, site_config, general_config or {}):
+        if source.get('date_cutoff_items') is not None:
+            return max(1, int(source['date_cutoff_items']))
+    return DEFAULT_DATE_CUTOFF_ITEMS
+
+
+class DateCutoff:
+    """Stops an --after run on a newest-first listing once it is past the threshold date."""
+
+    def __init__(self, threshold: datetime.date, old_items: int = DEFAULT_DATE_CUTOFF_ITEMS):
+        """
+        Args:
+            threshold: The --after date; older videos are filtered out.
+            old_items: Consecutive older videos before pagination stops.
+        """
+        self.threshold = threshold
+        self.old_items = old_items
+        self.stopped = False
+        self._run = 0
+        self._page_items = 0
+        self._page_old = 0
+
+    def _stop(self, reason: str):
+        self.stopped = True
+        logger.info(f"[FILTER] Listing is sorted by date; stopping: {reason}")
+
+    def begin_page(self):
+        self._page_items = self._page_old = 0
+
+    def see(self, date: Optional[datetime.date]) -> bool:
+        """
+        Account for the next item's date (None if it has none).
+
+        Returns:
+            True if pagination should stop here (this item and the rest are not processed).
+        """
+        self._page_items += 1
+        if date is None:
+            return False
+        if date >= self.threshold:
+            self._run = 0
+            return False
+        self._page_old += 1
+        self._run += 1
+        if self._run >= self.old_items:
+            self._stop(f"{self._run} videos in a row older than {self.threshold}")
+            return True
+        return False
+
+    def end_page(self):
+        """Stop after a page on which every video was older than the threshold."""
+        if not self.stopped and self._page_items and self._page_old == self._page_items:
+            self._stop(f"every video on the page is older than {self.threshold}")
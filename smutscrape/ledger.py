@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Download Ledger for Smutscrape
+
+Replaces the flat ``.state`` file (one URL per line, loaded whole into a
+set) with a SQLite database, ``.state.db`` next to it. Each video page gets
+one row, keyed by canonical URL, recording its site, status (downloading,
+done or failed), download attempts, bytes, final path and timestamps; the
+high-water marks of --incremental runs are kept alongside. The
+key is the table's primary key, so a lookup is an index search rather
+than a scan, and recent answers are kept in a small in-memory cache.
+In front of the table sits a memory-mapped HashIndex of the done URLs
+(``.state.db.idx.N`` / ``.log``, see hashindex.py), so the common answer
+for a list page -- "not downloaded yet" -- needs no query at all.
+
+The database runs in WAL mode so readers (the GUI, the API) are never
+blocked by a run that is writing, and writes are committed in batches --
+after COMMIT_EVERY changes or at most COMMIT_INTERVAL seconds after the
+first, and at exit -- rather than one commit each.
+
+Keys come from canonical_url() with the per-site rules registered from the
+site YAMLs; when the rules sites declare change, the rows are re-keyed on
+the next open (after a copy of the table is saved as downloads_before_rekey).
+
+An existing ``.state`` file is imported on first use (and again if it
+changes, e.g. when an older version appended to it); the file itself is
+left in place.
+
+    # ledger_file: "~/.smutscrape/state.db"   # default: .state.db next to .state
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableSet
+from typing import Any, Dict, Iterator, Optional
+
+from loguru import logger
+
+from smutscrape.hashindex import HashIndex, url_hash
+from smutscrape.utilities import canonical_rules_fingerprint, canonical_url
+
+DOWNLOADING = 'downloading'
+DONE = 'done'
+FAILED = 'failed'
+
+COMMIT_EVERY = 50        # pending writes before a commit
+COMMIT_INTERVAL = 2.0    # seconds a write may wait for its commit
+HOT_CACHE_SIZE = 4096    # recent lookups answered without a query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    key         TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    site        TEXT,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    bytes       INTEGER,
+    path        TEXT,
+    first_seen  REAL NOT NULL,
+    updated     REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS downloads_site_status ON downloads (site, status);
+CREATE TABLE IF NOT EXISTS watermarks (
+    query       TEXT PRIMARY KEY,
+    newest_key  TEXT NOT NULL,
+    newest_url  TEXT NOT NULL,
+    newest_date TEXT,
+    updated     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name        TEXT PRIMARY KEY,
+    value       TEXT
+);
+"""
+
+
+class DownloadLedger(MutableSet):
+    """
+    Download records in SQLite.
+
+    As a set it holds the URLs whose status is done, so it can stand in
+    wherever the loaded ``.state`` set was used: ``url in ledger`` and
+    ``ledger.add(url)``.
+    """
+
+    def __init__(self, path: str, state_file: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file.
+            state_file: Legacy ``.state`` file to import, if it exists.
+        """
+        self.path = os.path.expanduser(path)
+        self._lock = threading.RLock()
+        self._hot: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._pending = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._timer: Optional[threading.Timer] = None
+        self._index = HashIndex(self.path)
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'key_rules'").fetchone()
+        rules = canonical_rules_fingerprint()
+        if (row[0] if row else '') != rules:
+            self.rekey()
+        elif not row:
+            self._conn.execute("INSERT INTO meta (name, value) VALUES ('key_rules', ?)", (rules,))
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'index_token'").fetchone()
+        if self._index.token is None or not row or row[0] != self._index.token.hex():
+            self.rebuild_index()
+        if state_file:
+            self.import_state_file(state_file)
+
+    # -- set interface -------------------------------------------------------
+
+    def __contains__(self, url) -> bool:
+        if not isinstance(url, str):
+            return False
+        key = canonical_url(url)
+        with self._lock:
+            if key not in self._hot and url_hash(key) not in self._index:
+                return False
+            return self._status(key) == DONE
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM downloads WHERE status = ?", (DONE,)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM downloads WHERE status = ?", (DONE,)).fetchone()[0]
+
+    def indexed_count(self) -> int:
+        """
+        How many URLs are done, from the hash index without a query. It still
+        counts URLs discarded or failed since the index was last rebuilt.
+        """
+        with self._lock:
+            return len(self._index)
+
+    def add(self, url: str):
+        """Mark url as downloaded."""
+        self.record(url, DONE)
+
+    def discard(self, url: str):
+        """Forget url entirely."""
+        key = canonical_url(url)
+        with self._lock:
+            self._begin()
+            self._conn.execute("DELETE FROM downloads WHERE key = ?", (key,))
+            self._remember(key, None)
+            self._wrote()
+
+    # -- records -------------------------------------------------------------
+
+    def status(self, url: str) -> Optional[str]:
+        """url's status, or None if it has no record."""
+        with self._lock:
+            return self._status(canonical_url(url))
+
+    def _status(self, key: str) -> Optional[str]:
+        # Caller holds the lock.
+        if key in self._hot:
+            self._hot.move_to_end(key)
+            return self._hot[key]
+        row = self._conn.execute("SELECT status FROM downloads WHERE key = ?", (key,)).fetchone()
+        status = row[0] if row else None
+        self._remember(key, status)
+        return status
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """url's full record as a dict, or None."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM downloads WHERE key = ?", (canonical_url(url),))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def record(self, url: str, status: str, site: Optional[str] = None, attempt: bool = False,
+               size: Optional[int] = None, path: Optional[str] = None):
+        """
+        Insert or update url's record; values left as None keep what was recorded before.
+
+        Args:
+            url: Video page URL.
+            status: DOWNLOADING, DONE or FAILED.
+            site: Site shortcode.
+            attempt: Count this as a new download attempt.
+            size: Bytes downloaded.
+            path: Where the file ended up.
+        """
+        key, now = canonical_url(url), time.time()
+        with self._lock:
+            self._begin()
+            self._conn.execute(
+                """
+                INSERT INTO downloads (key, url, site, status, attempts, bytes, path, first_seen, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    status   = excluded.status,
+                    site     = COALESCE(excluded.site, site),
+                    attempts = attempts + excluded.attempts,
+                    bytes    = COALESCE(excluded.bytes, bytes),
+                    path     = COALESCE(excluded.path, path),
+                    updated  = excluded.updated
+                """,
+                (key, url, site, status, int(attempt), size, path, now, now),
+            )
+            if status == DONE:
+                self._index.add(url_hash(key))
+            self._remember(key, status)
+            self._wrote()
+
+    def import_state_file(self, state_file: str) -> int:
+        """
+        Import a ``.state`` file's URLs as done, unless this version of it
+        was imported already.
+
+        Returns:
+            How many URLs were new to the ledger.
+        """
+        if not os.path.exists(state_file):
+            return 0
+        stat = os.stat(state_file)
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'state_file'").fetchone()
+            if row and row[0] == signature:
+                return 0
+            now = time.time()
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    urls = [line.strip() for line in f if line.strip()]
+            except Exception as e:
+                logger.error(f"Failed to load state file '{state_file}': {e}")
+                return 0
+            self._begin()
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO downloads (key, url, status, first_seen, updated) VALUES (?, ?, ?, ?, ?)",
+                ((canonical_url(url), url, DONE, now, now) for url in urls),
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('state_file', ?)", (signature,))
+            self._hot.clear()
+            self.flush()
+            if added:
+                self.rebuild_index()
+        logger.info(f"Imported {added} URL(s) from {state_file} into {self.path}")
+        return added
+
+    def watermark(self, query: str) -> Optional[Dict[str, Any]]:
+        """The high-water mark --incremental stored for query (newest_key, newest_url, newest_date), or None."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM watermarks WHERE query = ?", (query,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def set_watermark(self, query: str, newest_key: str, newest_url: str, newest_date: Optional[str] = None):
+        """Store query's high-water mark."""
+        with self._lock:
+            self._begin()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (query, newest_key, newest_url, newest_date, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (query, newest_key, newest_url, newest_date, time.time()),
+            )
+            self.flush()
+
+    def rekey(self) -> int:
+        """
+        Recompute every row's key with the current canonical_url() rules.
+
+        The table is first copied to downloads_before_rekey. Rows are never
+        merged: a row whose new key another row already holds keeps its old
+        key, and is left as it was.
+
+        Returns:
+            How many rows changed key.
+        """
+        changed = collided = 0
+        with self._lock:
+            self._begin()
+            self._conn.execute("DROP TABLE IF EXISTS downloads_before_rekey")
+            self._conn.execute("CREATE TABLE downloads_before_rekey AS SELECT * FROM downloads")
+            pending = [(key, canonical_url(url)) for key, url in self._conn.execute("SELECT key, url FROM downloads")]
+            pending = [(old_key, new_key) for old_key, new_key in pending if new_key != old_key]
+            # A key can free up only after its row moves, so repeat until nothing moves.
+            while pending:
+                left = []
+                for old_key, new_key in pending:
+                    cursor = self._conn.execute("UPDATE OR IGNORE downloads SET key = ? WHERE key = ?",
+                                                (new_key, old_key))
+                    if cursor.rowcount:
+                        changed += 1
+                    else:
+                        left.append((old_key, new_key))
+                if len(left) == len(pending):
+                    collided = len(left)
+                    break
+                pending = left
+            for query, url in self._conn.execute("SELECT query, newest_url FROM watermarks").fetchall():
+                self._conn.execute("UPDATE watermarks SET newest_key = ? WHERE query = ?", (canonical_url(url), query))
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('key_rules', ?)",
+                               (canonical_rules_fingerprint(),))
+            self._hot.clear()
+            self.flush()
+            if collided:
+                logger.warning(f"{collided} row(s) kept their old key: another row has their new one")
+            if changed:
+                logger.info(f"Re-keyed {changed} ledger row(s) for the current URL rules")
+                self.rebuild_index()
+        return changed
+
+    def rebuild_index(self):
+        """Rebuild the hash index from the done rows and remember which index that is."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM downloads WHERE status = ?", (DONE,))
+            token = self._index.rebuild(url_hash(key) for (key,) in rows)
+            self._begin()
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('index_token', ?)", (token.hex(),))
+            self.flush()
+
+    # -- commits -------------------------------------------------------------
+
+    def _remember(self, key: str, status: Optional[str]):
+        # Caller holds the lock.
+        self._hot[key] = status
+        self._hot.move_to_end(key)
+        while len(self._hot) > HOT_CACHE_SIZE:
+            self._hot.popitem(last=False)
+
+    def _begin(self):
+        # Caller holds the lock. Writes collect in one transaction until flush().
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _wrote(self):
+        # Caller holds the lock.
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(COMMIT_INTERVAL, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Commit pending writes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.execute("COMMIT")
+            self._pending = 0
+
+    def close(self):
+        """Commit and close the database."""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._index.close()
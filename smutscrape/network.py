@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+Network Module for Smutscrape
+
+This module owns the HTTP sessions shared by the page fetchers and the
+downloaders, so connections and challenge cookies survive across requests.
+
+Sites with ``selenium_handoff: true`` only use Chrome to clear anti-bot
+challenges: the browser solves one per domain, its cookies and User-Agent
+are loaded into the pooled HTTP session and saved in the ClearanceStore
+(``.clearance.json``, next to ``.state``), and pages are fetched over plain
+HTTP until a challenge shows up again.
+"""
+
+import json
+import os
+import time
+import random
+import threading
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Callable, Optional, List
+from urllib.parse import urlparse
+from loguru import logger
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Used when neither config.yaml nor the site YAML declares a ``rate`` block;
+# roughly the pace of the old unconditional 1-3 s sleep, minus the idle cost.
+DEFAULT_RATE = {'rps': 0.5, 'burst': 1, 'jitter': 1.0}
+
+# Retry policy defaults; ``budget`` caps the total backoff seconds per site per run.
+DEFAULT_RETRY = {'max_attempts': 4, 'base_delay': 2.0, 'max_delay': 60.0, 'budget': 300.0}
+
+RETRYABLE_STATUS = {429, 503}
+
+# Where browser-solved clearances are kept between runs, and how long one is
+# trusted when none of its cookies carries an expiry of its own.
+DEFAULT_CLEARANCE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), '.clearance.json')
+DEFAULT_CLEARANCE_MAX_AGE = 12 * 3600
+
+# Markers of anti-bot interstitials that come back with a 200/403/503.
+CHALLENGE_MARKERS = (
+    'cf-browser-verification',
+    'cf_chl_opt',
+    '<title>Just a moment...</title>',
+    'Attention Required! | Cloudflare',
+    '<title>DDoS-Guard</title>',
+)
+
+
+class SessionRegistry:
+    """Keeps one persistent, connection-pooled HTTP session per site."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._sessions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, http_config: Optional[Dict[str, Any]] = None,
+            user_agents: Optional[List[str]] = None):
+        """Return the session for *key*, creating it on first use.
+
+        Args:
+            key: Registry key, normally the site shortcode
+            http_config: Merged ``http`` settings (pool sizes)
+            user_agents: User-Agent strings to pick the session's pinned UA from
+
+        Returns:
+            A cloudscraper session with keep-alive connection pooling
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_session(http_config or {}, user_agents)
+                self._sessions[key] = session
+                logger.debug(f"[HTTP] Created pooled session for '{key}'")
+            return session
+
+    @staticmethod
+    def _create_session(http_config: Dict[str, Any], user_agents: Optional[List[str]]):
+        """Build a cloudscraper session whose adapters keep a connection pool."""
+        import cloudscraper
+        from cloudscraper import CipherSuiteAdapter
+        from requests.adapters import HTTPAdapter
+
+        pool_connections = int(http_config.get('pool_connections', DEFAULT_POOL_CONNECTIONS))
+        pool_maxsize = int(http_config.get('pool_maxsize', DEFAULT_POOL_MAXSIZE))
+
+        scraper = cloudscraper.create_scraper()
+        # Re-mount with our pool sizes; the HTTPS adapter must stay a
+        # CipherSuiteAdapter or cloudscraper loses its TLS fingerprint.
+        scraper.mount('https://', CipherSuiteAdapter(
+            cipherSuite=scraper.cipherSuite,
+            ecdhCurve=scraper.ecdhCurve,
+            server_hostname=scraper.server_hostname,
+            source_address=scraper.source_address,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        ))
+        scraper.mount('http://', HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        ))
+
+        # Challenge clearance cookies are bound to the User-Agent that solved
+        # them, so the UA is pinned for the lifetime of the session.
+        if user_agents:
+            scraper.headers['User-Agent'] = random.choice(user_agents)
+        return scraper
+
+    def close(self, key: str):
+        """Close and forget the session for *key*."""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+
+class RateLimiter:
+    """Per-domain token bucket that sleeps only as long as actually needed.
+
+    Each host gets ``burst`` tokens refilled at ``rps`` per second. A request
+    that finds a token proceeds immediately, so a host that has been idle
+    (e.g. during a long download) costs no wait at all. Requests that have to
+    wait reserve their slot under the lock, so concurrent callers queue up
+    instead of stampeding.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, rng: Any = random):
+        """Initialize with no known hosts.
+
+        Args:
+            clock: Monotonic time source in seconds
+            sleep: Blocks for the given seconds
+            rng: Source of jitter (anything with ``uniform``)
+        """
+        self._buckets: Dict[str, Dict[str, float]] = {}
+        self._last_hit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def acquire(self, url: str, rate_config: Optional[Dict[str, Any]] = None) -> float:
+        """Block until a request to *url*'s host is allowed.
+
+        Args:
+            url: URL about to be requested
+            rate_config: ``{rps, burst, jitter}``; missing keys use DEFAULT_RATE
+
+        Returns:
+            Seconds slept
+        """
+        cfg = dict(DEFAULT_RATE)
+        cfg.update(rate_config or {})
+        rps = max(float(cfg['rps']), 0.001)
+        burst = max(float(cfg['burst']), 1.0)
+        host = self._host(url)
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault(host, {'tokens': burst, 'stamp': now})
+            bucket['tokens'] = min(burst, bucket['tokens'] + (now - bucket['stamp']) * rps)
+            bucket['stamp'] = now
+            bucket['tokens'] -= 1.0
+            wait = -bucket['tokens'] / rps if bucket['tokens'] < 0 else 0.0
+            if wait > 0:
+                wait += self._rng.uniform(0, float(cfg.get('jitter') or 0))
+            self._last_hit[host] = now + wait
+
+        if wait > 0:
+            logger.debug(f"[RATE] Waiting {wait:.2f}s for {host}")
+            self._sleep(wait)
+        return wait
+
+    def pace(self, url: str, min_interval: float) -> float:
+        """Sleep until *min_interval* seconds have passed since the last hit to *url*'s host.
+
+        Args:
+            url: URL about to be requested
+            min_interval: Minimum spacing in seconds (e.g. ``sleep.between_pages``)
+
+        Returns:
+            Seconds slept
+        """
+        with self._lock:
+            last = self._last_hit.get(self._host(url))
+        if last is None or not min_interval:
+            return 0.0
+        wait = float(min_interval) - (self._clock() - last)
+        if wait > 0:
+            logger.debug(f"[RATE] Pacing {wait:.2f}s before {url}")
+            self._sleep(wait)
+            return wait
+        return 0.0
+
+
+@dataclass
+class FetchStats:
+    """Per-site counters for the fetch layer, shared by every thread fetching for the site."""
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    challenges: int = 0
+    clearances: int = 0
+    rate_limited_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+
+    def add(self, **deltas):
+        """Add to counters, e.g. add(requests=1), under the stats lock."""
+        with _stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def reserve_backoff(self, delay: float, budget: float) -> bool:
+        """Count a retry and its delay, unless that would take backoff past budget."""
+        with _stats_lock:
+            if self.backoff_seconds + delay > budget:
+                return False
+            self.retries += 1
+            self.backoff_seconds += delay
+            return True
+
+    @property
+    def throttled_seconds(self) -> float:
+        """Total time spent waiting on the rate limiter and on backoff."""
+        return self.rate_limited_seconds + self.backoff_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        with _stats_lock:
+            data = asdict(self)
+        data['throttled_seconds'] = round(data['rate_limited_seconds'] + data['backoff_seconds'], 2)
+        return data
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests, {self.retries} retries, {self.failures} failures, "
+                f"{self.challenges} challenges ({self.clearances} cleared in browser), "
+                f"{self.throttled_seconds:.1f}s throttled "
+                f"({self.backoff_seconds:.1f}s backoff)")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter that honours ``Retry-After``.
+
+    A server's ``Retry-After`` is waited out in full -- ``max_delay`` only
+    caps the computed backoff -- and whether it fits is left to the site's
+    backoff budget: retrying before it has passed only earns another 429.
+    """
+
+    def __init__(self, retry_config: Optional[Dict[str, Any]] = None,
+                 clock: Callable[[], float] = time.time, rng: Any = random):
+        """
+        Args:
+            retry_config: ``{max_attempts, base_delay, max_delay, budget}``; missing keys use DEFAULT_RETRY
+            clock: Wall-clock time source, for ``Retry-After`` dates
+            rng: Source of jitter (anything with ``uniform``)
+        """
+        self._clock = clock
+        self._rng = rng
+        cfg = dict(DEFAULT_RETRY)
+        cfg.update(retry_config or {})
+        self.max_attempts = max(int(cfg['max_attempts']), 1)
+        self.base_delay = float(cfg['base_delay'])
+        self.max_delay = float(cfg['max_delay'])
+        self.budget = float(cfg['budget'])
+
+    def retry_after(self, response) -> Optional[float]:
+        """Parse a ``Retry-After`` header (seconds or HTTP date) into seconds."""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - self._clock(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def delay_for(self, attempt: int, response=None) -> float:
+        """Seconds to wait before retry number *attempt* (0-based)."""
+        hinted = self.retry_after(response)
+        if hinted is not None:
+            return hinted
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class ClearanceStore:
+    """Challenge clearances (cookies + User-Agent) per domain, persisted as JSON.
+
+    An entry is valid until its earliest cookie expiry, or ``max_age``
+    seconds after it was saved when the cookies carry no expiry.
+    """
+
+    def __init__(self, path: str = DEFAULT_CLEARANCE_FILE,
+                 max_age: float = DEFAULT_CLEARANCE_MAX_AGE):
+        """Load any clearances saved by earlier runs.
+
+        Args:
+            path: JSON file the store is read from and written to
+            max_age: Lifetime in seconds of entries without cookie expiries
+        """
+        self.path = os.path.expanduser(path)
+        self.max_age = max_age
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def domain(url: str) -> str:
+        """Store key for *url* (its host, without port)."""
+        return (urlparse(url).hostname or '').lower()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            now = time.time()
+            self._entries = {d: e for d, e in entries.items() if e.get('expires', 0) > now}
+            logger.debug(f"[CLEARANCE] Loaded {len(self._entries)} clearance(s) from {self.path}")
+        except Exception as e:
+            logger.warning(f"[CLEARANCE] Ignoring unreadable clearance file '{self.path}': {e}")
+
+    def _save(self):
+        # Caller holds the lock. Written to a temp file first so a crash never truncates it.
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=1)
+            os.chmod(tmp, 0o600)   # cookies are credentials
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"[CLEARANCE] Could not save clearance file '{self.path}': {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the unexpired clearance for *url*'s domain, or None."""
+        with self._lock:
+            entry = self._entries.get(self.domain(url))
+            if entry is not None and entry['expires'] <= time.time():
+                return None
+            return entry
+
+    def put(self, url: str, user_agent: str, cookies: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Save a clearance solved in the browser.
+
+        Args:
+            url: Page the challenge was solved on
+            user_agent: ``navigator.userAgent`` of the browser that solved it
+            cookies: Cookies as returned by Selenium's ``driver.get_cookies()``
+
+        Returns:
+            The stored entry
+        """
+        now = time.time()
+        expiries = [c['expiry'] for c in cookies if c.get('expiry')]
+        entry = {
+            'user_agent': user_agent,
+            'cookies': cookies,
+            'saved': now,
+            'expires': min(expiries) if expiries else now + self.max_age,
+        }
+        with self._lock:
+            self._entries[self.domain(url)] = entry
+            self._save()
+        return entry
+
+    def invalidate(self, url: str):
+        """Forget the clearance for *url*'s domain (e.g. after a new challenge)."""
+        with self._lock:
+            if self._entries.pop(self.domain(url), None) is not None:
+                self._save()
+
+    @staticmethod
+    def apply(session, entry: Dict[str, Any]) -> bool:
+        """Load a clearance into an HTTP session; False if it already carries it."""
+        if getattr(session, '_clearance_saved', None) == entry['saved']:
+            return False
+        for cookie in entry['cookies']:
+            session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False), expires=cookie.get('expiry'),
+            )
+        session.headers['User-Agent'] = entry['user_agent']
+        session._clearance_saved = entry['saved']
+        return True
+
+
+def is_challenge_response(response) -> bool:
+    """Return True if *response* looks like an anti-bot challenge page."""
+    if response is None or response.status_code not in (200, 403, 429, 503):
+        return False
+    if 'text/html' not in response.headers.get('Content-Type', 'text/html'):
+        return False
+    head = response.text[:4096] if response.content else ''
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def merge_site_option(name: str, site_config: Optional[Dict[str, Any]],
+                      general_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge a dict-valued option: general config defaults, site YAML overrides."""
+    merged = dict((general_config or {}).get(name) or {})
+    merged.update((site_config or {}).get(name) or {})
+    return merged
+
+
+def handoff_enabled(site_config: Optional[Dict[str, Any]],
+                    general_config: Optional[Dict[str, Any]] = None) -> bool:
+    """True if a Selenium site should fetch over HTTP and use the browser only for challenges."""
+    if not (site_config or {}).get('use_selenium'):
+        return False
+    enabled = (site_config or {}).get('selenium_handoff')
+    if enabled is None:
+        enabled = (general_config or {}).get('selenium_handoff', False)
+    return bool(enabled)
+
+
+def session_key(site_config: Optional[Dict[str, Any]]) -> str:
+    """Registry key for a site config (its shortcode)."""
+    return (site_config or {}).get('shortcode') or '_default'
+
+
+# Global session registry instance
+session_registry = None
+
+def get_session_registry():
+    """Get or create the session registry instance."""
+    global session_registry
+    if session_registry is None:
+        session_registry = SessionRegistry()
+    return session_registry
+
+
+# Global rate limiter instance
+rate_limiter = None
+
+def get_rate_limiter():
+    """Get or create the rate limiter instance."""
+    global rate_limiter
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    return rate_limiter
+
+
+# Global clearance store instance
+clearance_store = None
+
+def get_clearance_store(general_config: Optional[Dict[str, Any]] = None):
+    """Get or create the clearance store (``clearance_file`` in config.yaml moves it)."""
+    global clearance_store
+    if clearance_store is None:
+        clearance_store = ClearanceStore((general_config or {}).get('clearance_file') or DEFAULT_CLEARANCE_FILE)
+    return clearance_store
+
+
+# Per-site fetch statistics, keyed like the session registry
+fetch_stats: Dict[str, FetchStats] = {}
+_stats_lock = threading.Lock()
+
+def get_fetch_stats(key: Optional[str] = None):
+    """Return the FetchStats for one site key, or a dict of all of them."""
+    with _stats_lock:
+        if key is None:
+            return dict(fetch_stats)
+        return fetch_stats.setdefault(key, FetchStats())
+
+
+def throttle(url: str, site_config: Optional[Dict[str, Any]] = None,
+             general_config: Optional[Dict[str, Any]] = None) -> float:
+    """Apply the site's ``rate`` settings before requesting *url*."""
+    waited = get_rate_limiter().acquire(url, merge_site_option('rate', site_config, general_config))
+    get_fetch_stats(session_key(site_config)).add(rate_limited_seconds=waited)
+    return waited
+
+
+def get_http_session(site_config: Optional[Dict[str, Any]] = None,
+                     general_config: Optional[Dict[str, Any]] = None,
+                     user_agents: Optional[List[str]] = None):
+    """Return the shared HTTP session for a site.
+
+    Args:
+        site_config: Raw site config dict (only ``shortcode`` and ``http`` are read)
+        general_config: General config dict (``http`` defaults and ``user_agents``)
+        user_agents: User-Agent strings to pin the UA from when ``general_config``
+            has none; only used when the session is first created
+
+    Returns:
+        The pooled session for the site's shortcode
+    """
+    return get_session_registry().get(
+        session_key(site_config),
+        merge_site_option('http', site_config, general_config),
+        (general_config or {}).get('user_agents') or user_agents,
+    )
+
+
+# One browser solve at a time per domain
+_clearing: Dict[str, threading.Lock] = {}
+_clearing_lock = threading.Lock()
+
+def clear_challenge(url: str, site_config: Optional[Dict[str, Any]] = None,
+                    general_config: Optional[Dict[str, Any]] = None,
+                    stale: Optional[Dict[str, Any]] = None,
+                    browsers: Any = None) -> Optional[Dict[str, Any]]:
+    """Solve *url*'s challenge in a pooled browser and save the clearance.
+
+    Args:
+        url: Page that returned the challenge
+        site_config: Raw site config dict
+        general_config: General config dict
+        stale: The clearance the challenged request was sent with, if any
+        browsers: Driver provider (the ConfigManager): ``get_selenium_driver()``,
+            ``release_selenium_driver()`` and ``driver_pool``
+
+    Returns:
+        The new ClearanceStore entry, or None if the browser could not clear it
+    """
+    from smutscrape.browser import solve_challenge
+
+    store = get_clearance_store(general_config)
+    domain = ClearanceStore.domain(url)
+    with _clearing_lock:
+        lock = _clearing.setdefault(domain, threading.Lock())
+    with lock:
+        # Another thread may have cleared this domain while we waited.
+        entry = store.get(url)
+        if entry is not None and entry is not stale:
+            return entry
+        driver = browsers.get_selenium_driver() if browsers is not None else None
+        if driver is None:
+            logger.error(f"[CLEARANCE] No browser available to clear the challenge on {url}")
+            return None
+        try:
+            throttle(url, site_config, general_config)
+            logger.info(f"[CLEARANCE] Clearing challenge for {domain} in the browser")
+            solved = solve_challenge(driver, url)
+            browsers.driver_pool.record_navigation(driver)
+        finally:
+            browsers.release_selenium_driver()
+        if solved is None:
+            store.invalidate(url)
+            return None
+        user_agent, cookies = solved
+        get_fetch_stats(session_key(site_config)).add(clearances=1)
+        return store.put(url, user_agent, cookies)
+
+
+def http_get(url: str, site_config: Optional[Dict[str, Any]] = None,
+             general_config: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None, timeout: int = 30,
+             browsers: Any = None):
+    """GET *url* through the site's pooled session with rate limiting and retries.
+
+    429/503 responses, challenge pages and transient connection errors are
+    retried with exponential backoff (or the server's ``Retry-After``) until
+    the attempt limit or the site's backoff budget runs out. Other HTTP
+    errors fail immediately. With Selenium handoff enabled and *browsers*
+    given, a challenge is cleared in the browser once and the request is
+    retried with the new clearance; that retry is not counted as an attempt.
+
+    Args:
+        url: URL to fetch
+        site_config: Raw site config dict (``shortcode``, ``http``, ``rate``, ``retry``)
+        general_config: General config dict supplying the defaults
+        headers: Extra request headers
+        timeout: Per-request timeout in seconds
+        browsers: Driver provider passed on to clear_challenge
+
+    Returns:
+        The successful Response, or None if the fetch failed
+    """
+    import requests
+
+    key = session_key(site_config)
+    session = get_http_session(site_config, general_config)
+    policy = RetryPolicy(merge_site_option('retry', site_config, general_config))
+    stats = get_fetch_stats(key)
+    handoff = browsers is not None and handoff_enabled(site_config, general_config)
+    cleared, clearance = False, None
+
+    attempt = 0
+    while attempt < policy.max_attempts:
+        if handoff:
+            clearance = get_clearance_store(general_config).get(url)
+            if clearance is not None:
+                ClearanceStore.apply(session, clearance)
+                # The clearance only holds for the browser's User-Agent.
+                headers = {k: v for k, v in (headers or {}).items() if k.lower() != 'user-agent'}
+        throttle(url, site_config, general_config)
+        stats.add(requests=1)
+        response, reason, challenged = None, None, False
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+            if is_challenge_response(response):
+                stats.add(challenges=1)
+                challenged = True
+                reason = f"challenge page (HTTP {response.status_code})"
+            elif response.status_code in RETRYABLE_STATUS:
+                reason = f"HTTP {response.status_code}"
+            else:
+                response.raise_for_status()
+                return response
+        except (requests.ConnectionError, requests.Timeout) as e:
+            reason = f"{type(e).__name__}: {e}"
+        except requests.HTTPError as e:
+            logger.error(f"Error fetching {url}: {e}")
+            stats.add(failures=1)
+            return None
+        except Exception as e:
+            # cloudscraper raises its own exceptions for challenges it cannot solve
+            if 'Cloudflare' in type(e).__name__:
+                stats.add(challenges=1)
+                challenged = True
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                logger.error(f"Error fetching {url}: {e}")
+                stats.add(failures=1)
+                return None
+
+        if challenged and handoff and not cleared:
+            # At most one browser visit per call; retry at once with the new clearance.
+            cleared = True
+            if clear_challenge(url, site_config, general_config, stale=clearance,
+                               browsers=browsers) is not None:
+                continue
+
+        delay = policy.delay_for(attempt, response)
+        if attempt + 1 >= policy.max_attempts or not stats.reserve_backoff(delay, policy.budget):
+            if attempt + 1 < policy.max_attempts:
+                # E.g. a Retry-After longer than the site may spend waiting.
+                reason += f"; waiting {delay:.0f}s would exceed the {policy.budget:.0f}s backoff budget"
+            logger.error(f"Giving up on {url} after {attempt + 1} attempt(s): {reason}")
+            stats.add(failures=1)
+            return None
+        logger.warning(f"[RETRY] {reason} for {url}; retrying in {delay:.1f}s "
+                       f"(attempt {attempt + 2}/{policy.max_attempts})")
+        time.sleep(delay)
+        attempt += 1
+    return None
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for Smutscrape.
+
+Every fetched page goes through make_soup(), which builds a tree with the
+parser selected by the `parser:` option (config.yaml, overridable per site):
+
+  html.parser   BeautifulSoup + Python's built-in parser (default, slowest)
+  lxml          BeautifulSoup + lxml (same tree API, several times faster)
+  selectolax    selectolax's lexbor engine behind a small BeautifulSoup-like
+                adapter (fastest; selectors lexbor cannot compile, such as
+                :contains(), transparently fall back to soupsieve)
+
+Callers only rely on the subset of the BeautifulSoup API used by
+extract_data and the list-page code: select(), select_one(), find_all(),
+get(), .text, get_text(), .name, .title and .body.
+
+List pages can also be parsed partially: scope_strainer() turns the
+container and pagination selectors into a SoupStrainer so only the
+subtrees those selectors can match are built (see process_list_page).
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from loguru import logger
+
+SELECTOLAX_AVAILABLE = True
+try:
+    from selectolax.lexbor import LexborHTMLParser, SelectolaxError
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+PARSERS = ('html.parser', 'lxml', 'selectolax')
+DEFAULT_PARSER = 'html.parser'
+
+# Soupsieve-only pseudo-classes lexbor refuses to compile; skip straight to the fallback.
+SOUPSIEVE_ONLY = (':contains(', ':-soup-contains')
+
+# Root node tags of a lexbor tree (the document itself, <html>).
+DOCUMENT_TAGS = ('html', '-undef', '-document')
+# Element wrapped around a subtree re-parsed for soupsieve (see LexborNode._soupsieve).
+SCOPE_HOLDER = 'smutscrape-scope'
+# Elements whose text BeautifulSoup leaves out of an ancestor's get_text().
+NON_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+
+_warned = set()
+_fallback_selectors = set()
+
+
+def _warn_once(key: str, message: str):
+    if key not in _warned:
+        _warned.add(key)
+        logger.warning(message)
+
+
+def resolve_parser(site_config=None, general_config=None) -> str:
+    """
+    Pick the parser for a site: its own `parser:` key, else the global one.
+
+    Unknown names and backends whose package is missing degrade to the
+    next-fastest available parser rather than failing the fetch.
+    """
+    parser = ((site_config or {}).get('parser')
+              or (general_config or {}).get('parser')
+              or DEFAULT_PARSER)
+    parser = str(parser).strip().lower()
+    if parser in ('lexbor', 'selectolax.lexbor'):
+        parser = 'selectolax'
+    if parser not in PARSERS:
+        _warn_once(f"unknown:{parser}", f"[PARSER] Unknown parser '{parser}' -- using {DEFAULT_PARSER}.")
+        return DEFAULT_PARSER
+    if parser == 'selectolax' and not SELECTOLAX_AVAILABLE:
+        _warn_once('selectolax', "[PARSER] selectolax is not installed (pip install selectolax) -- using lxml.")
+        parser = 'lxml'
+    return parser
+
+
+def make_soup(markup, parser: str = DEFAULT_PARSER, parse_only: Optional[SoupStrainer] = None):
+    """
+    Parse markup (bytes or str) with the given backend.
+
+    Args:
+        markup: Page content, e.g. response.content or driver.page_source.
+        parser: One of PARSERS, normally from resolve_parser().
+        parse_only: Optional strainer limiting which subtrees are built.
+            Ignored by selectolax, which always parses the whole page.
+
+    Returns:
+        A BeautifulSoup object, or a LexborNode wrapping the document root.
+    """
+    if parser == 'selectolax' and SELECTOLAX_AVAILABLE:
+        if isinstance(markup, bytes):
+            markup = markup.decode('utf-8', errors='replace')
+        return LexborNode(LexborHTMLParser(markup).root)
+    if parser == 'lxml':
+        try:
+            return BeautifulSoup(markup, 'lxml', parse_only=parse_only)
+        except FeatureNotFound:
+            _warn_once('lxml', "[PARSER] lxml is not installed -- using html.parser.")
+    return BeautifulSoup(markup, 'html.parser', parse_only=parse_only)
+
+
+# ---------------------------------------------------------------------------
+# Scoped (partial) parsing
+# ---------------------------------------------------------------------------
+
+_COMPOUND_PART_RE = re.compile(
+    r'([#.])(-?[_a-zA-Z][\w-]*)'
+    r'|\[\s*([\w:-]+)\s*(?:([~|^$*]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]+))\s*([iIsS]\s*)?)?\]'
+)
+_TAG_RE = re.compile(r'^(\*|[a-zA-Z][\w-]*)')
+
+
+def _split_top_level(selector: str, separators: str) -> Optional[List[str]]:
+    """Split on separator characters outside brackets, parentheses and quotes."""
+    parts, current, depth, quote = [], [], 0, None
+    for ch in selector:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif depth == 0 and ch in separators:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    if quote or depth:
+        return None
+    parts.append(''.join(current))
+    return parts
+
+
+def _leading_compound(selector: str) -> Optional[str]:
+    """
+    First compound of a selector chained only by descendant/child combinators.
+
+    Returns None when the selector cannot be scoped: sibling combinators or
+    namespaces, or a pseudo-class on the first compound (its siblings and
+    ancestors are not part of a partial tree).
+    """
+    selector = selector.strip()
+    if '|' in selector or len(_split_top_level(selector, '+~') or ()) != 1:
+        return None
+    first = (_split_top_level(selector, ' \t\n>') or [''])[0]
+    if not first or ':' in re.sub(r'\[[^\]]*\]', '', first):
+        return None
+    return first
+
+
+class _Compound:
+    """A parsed simple compound selector: tag, ids, classes and attribute tests."""
+
+    __slots__ = ('tag', 'ids', 'classes', 'attrs')
+
+    def __init__(self, compound: str):
+        m = _TAG_RE.match(compound)
+        self.tag = m.group(1).lower() if m and m.group(1) != '*' else None
+        rest = compound[m.end():] if m else compound
+        self.ids, self.classes, self.attrs = [], [], []
+        pos = 0
+        for part in _COMPOUND_PART_RE.finditer(rest):
+            if part.start() != pos:
+                raise ValueError(compound)
+            pos = part.end()
+            if part.group(1) == '#':
+                self.ids.append(part.group(2).lower())
+            elif part.group(1) == '.':
+                self.classes.append(part.group(2).lower())
+            else:
+                value = next((g for g in part.group(5, 6, 7) if g is not None), None)
+                op = part.group(4) if not part.group(8) else None   # flagged: presence only
+                self.attrs.append((part.group(3).lower(), op, value.lower() if value else value))
+        if pos != len(rest):
+            raise ValueError(compound)
+
+    def matches(self, name: str, attrs) -> bool:
+        """
+        Loose match against a start tag. Comparisons ignore case so the
+        result is never stricter than soupsieve (quirks-mode pages and
+        case-insensitive HTML attributes); extra subtrees are harmless.
+        """
+        if self.tag and name != self.tag:
+            return False
+        attrs = attrs or {}
+        if self.ids and (attrs.get('id') or '').lower() not in self.ids:
+            return False
+        if self.classes:
+            classes = attrs.get('class') or ''
+            classes = ' '.join(classes) if isinstance(classes, list) else classes
+            classes = classes.lower().split()
+            if any(c not in classes for c in self.classes):
+                return False
+        for attr, op, value in self.attrs:
+            actual = attrs.get(attr)
+            if actual is None:
+                return False
+            if isinstance(actual, list):
+                actual = ' '.join(actual)
+            actual = actual.lower()
+            if op is None:
+                continue
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and value not in actual:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+            if op == '~=' and value not in actual.split():
+                return False
+            if op == '|=' and not (actual == value or actual.startswith(value + '-')):
+                return False
+        return True
+
+
+class ScopeStrainer(SoupStrainer):
+    """
+    Keeps only elements matching the first compound of any scoped selector,
+    with their whole subtree. Every match of the original selectors lies in
+    one of those subtrees, so select()/select_one() return the same elements
+    in the same order as on the full tree.
+    """
+
+    def __init__(self, compounds: List[_Compound]):
+        super().__init__(name=True)
+        self.compounds = compounds
+
+    def _allows(self, name, attrs) -> bool:
+        return any(c.matches(name, attrs) for c in self.compounds)
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self._allows(name, attrs)
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if hasattr(markup_name, 'name'):
+            return markup_name if self._allows(markup_name.name, markup_name.attrs) else None
+        return markup_name if self._allows(markup_name, markup_attrs) else None
+
+
+def scope_strainer(selectors: Iterable[str]) -> Optional[ScopeStrainer]:
+    """
+    Build a strainer covering every given CSS selector (comma lists allowed).
+
+    Returns None when any selector cannot be scoped safely, in which case
+    the caller should parse the full document.
+    """
+    compounds = []
+    for selector in selectors:
+        if not isinstance(selector, str) or not selector.strip():
+            return None
+        for alternative in _split_top_level(selector, ',') or [None]:
+            if alternative is None:
+                return None
+            first = _leading_compound(alternative)
+            if first is None:
+                return None
+            try:
+                compounds.append(_Compound(first))
+            except ValueError:
+                return None
+    return ScopeStrainer(compounds) if compounds else None
+
+
+def _text_nodes(node) -> Iterator[str]:
+    """Text under a lexbor node in document order, skipping NON_TEXT_TAGS subtrees."""
+    child = node.child
+    while child is not None:
+        if child.is_text_node:
+            yield child.text_content or ''
+        elif child.tag not in NON_TEXT_TAGS:
+            yield from _text_nodes(child)
+        child = child.next
+
+
+class LexborNode:
+    """BeautifulSoup-compatible view of a selectolax lexbor node."""
+
+    __slots__ = ('_node', '_fallback')
+
+    def __init__(self, node):
+        self._node = node
+        self._fallback = None
+
+    def __repr__(self) -> str:
+        return f"LexborNode(<{self._node.tag}>)"
+
+    # -- selection --------------------------------------------------------
+
+    def select(self, selector: str) -> List[Any]:
+        if any(token in selector for token in SOUPSIEVE_ONLY):
+            return self._soupsieve().select(selector)
+        try:
+            found = self._node.css(selector)
+        except SelectolaxError:
+            if selector not in _fallback_selectors:
+                _fallback_selectors.add(selector)
+                logger.debug(f"[PARSER] lexbor cannot compile '{selector}' -- using soupsieve for it.")
+            return self._soupsieve().select(selector)
+        # lexbor matches the scope node itself, and repeats a node once per selector in a
+        # comma list it matches; soupsieve only searches descendants, each node once.
+        seen = {self._node.mem_id}
+        return [LexborNode(n) for n in found if not (n.mem_id in seen or seen.add(n.mem_id))]
+
+    def select_one(self, selector: str):
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def find_all(self, name: str) -> List["LexborNode"]:
+        """Tag-name lookup; handles namespaced names such as 'media:content'."""
+        return self.select(name.replace(':', '\\:'))
+
+    def _soupsieve(self):
+        """
+        Re-parse this subtree with lxml for selectors only soupsieve understands.
+
+        The subtree is wrapped in (bare copies of) its ancestors first: on its
+        own a <tr> or <td> would be dropped by the parser, outside a table.
+        """
+        if self._fallback is None:
+            if self._node.tag in DOCUMENT_TAGS:
+                self._fallback = make_soup(self._node.html, 'lxml')
+            else:
+                ancestors = []
+                parent = self._node.parent
+                while parent is not None and parent.tag not in DOCUMENT_TAGS + ('body', 'head'):
+                    ancestors.append(parent.tag)
+                    parent = parent.parent
+                opening = ''.join(f"<{tag}>" for tag in reversed(ancestors))
+                closing = ''.join(f"</{tag}>" for tag in ancestors)
+                soup = make_soup(f"<{SCOPE_HOLDER}>{opening}{self._node.html}{closing}</{SCOPE_HOLDER}>", 'lxml')
+                holder = soup.find(SCOPE_HOLDER)
+                for tag in reversed(ancestors):
+                    holder = holder.find(tag, recursive=False) if holder is not None else None
+                node = holder.find(self._node.tag, recursive=False) if holder is not None else None
+                if node is None:
+                    # Still only this subtree's content, never the rest of the page.
+                    logger.debug(f"[PARSER] <{self._node.tag}> did not survive its re-parse for soupsieve.")
+                    node = soup.find(SCOPE_HOLDER) or soup
+                self._fallback = node
+        return self._fallback
+
+    # -- attributes and text ----------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        return {k: self.get(k) for k in self._node.attributes}
+
+    def get(self, attribute: str, default: Any = None) -> Any:
+        attributes = self._node.attributes
+        if attribute not in attributes:
+            return default
+        value = attributes[attribute]
+        if value is None:
+            return ''
+        if attribute == 'class':
+            return value.split()
+        return value
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        """Descendant text as BeautifulSoup gives it: without script, style and template contents."""
+        node = self._node
+        if node.tag in NON_TEXT_TAGS or node.css_first(', '.join(NON_TEXT_TAGS)) is None:
+            return node.text(deep=True, separator=separator, strip=strip)
+        strings = _text_nodes(node)
+        if strip:
+            strings = (s for s in (s.strip() for s in strings) if s)
+        return separator.join(strings)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def string(self) -> Optional[str]:
+        return self.get_text()
+
+    # -- document shortcuts -----------------------------------------------
+
+    @property
+    def title(self) -> Optional["LexborNode"]:
+        return self.select_one('title')
+
+    @property
+    def body(self) -> Optional["LexborNode"]:
+        return self.select_one('body')
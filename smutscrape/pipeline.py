@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Staged Scrape Pipeline for Smutscrape
+
+A list page's items flow through worker pools connected by bounded queues,
+so the next video page is fetched while the current file downloads:
+
+    discovery (caller)  ->  page workers  ->  download workers  ->  finalize
+
+Each stage is a function taking one item and returning the item for the
+next stage, or None to drop it (filtered, failed, already done). Queues
+are bounded, so discovery never runs more than `queue_size` items ahead
+of the slowest stage.
+
+Worker counts come from the `pipeline:` block of config.yaml, which a site
+YAML may override (e.g. fewer page workers for a Selenium site):
+
+    pipeline:
+      page_workers:     2   # video-page fetch + filter
+      queue_size:       4   # items buffered between stages
+
+The download stage gets one worker per download slot the site is allowed
+(max_concurrent_downloads, see scheduler.py).
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from smutscrape.network import merge_site_option
+from smutscrape.scheduler import download_concurrency
+
+DEFAULT_PIPELINE = {'page_workers': 1, 'queue_size': 4}
+
+_DONE = object()   # end-of-input marker passed from stage to stage
+
+
+def pipeline_settings(site_config: Optional[Dict[str, Any]],
+                      general_config: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Worker counts and queue size: defaults, then config.yaml, then the site YAML."""
+    settings = dict(DEFAULT_PIPELINE)
+    settings.update(merge_site_option('pipeline', site_config, general_config))
+    settings = {key: max(1, int(value)) for key, value in settings.items() if key in DEFAULT_PIPELINE}
+    settings['download_workers'] = download_concurrency(site_config, general_config)
+    return settings
+
+
+class Pipeline:
+    """Runs items through a sequence of stages, each backed by its own worker threads."""
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], queue_size: int = 4,
+                 stop_event=None, progress_cb: Optional[Callable[[int], None]] = None,
+                 total: Optional[int] = None):
+        """
+        Args:
+            stages: (name, function, worker count) per stage, in order.
+            queue_size: Capacity of the queue in front of each stage.
+            stop_event: threading.Event; once set, queued items are dropped
+                unprocessed and no new work starts.
+            progress_cb: Called with the running count of items that have
+                left the pipeline (finished, dropped, or reported via skip()).
+            total: How many items that count will reach. After a stop, the
+                items never fed in are counted as dropped, so it still does.
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stop_event = stop_event
+        self.progress_cb = progress_cb
+        self.total = total
+        self.done = 0
+        self.results: List[Any] = []
+        self._lock = threading.Lock()
+
+    def stopped(self) -> bool:
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def skip(self, count: int = 1):
+        """Count items the caller disposed of without feeding them in."""
+        self._finish(None, count)
+
+    def _finish(self, result, count: int = 1):
+        with self._lock:
+            if result is not None:
+                self.results.append(result)
+            self.done += count
+            done = self.done
+            if self.progress_cb:
+                self.progress_cb(done)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Feed items through every stage and wait for all of them to drain.
+
+        Returns:
+            What the last stage returned for each item that made it through,
+            in completion order.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for index, (name, func, workers) in enumerate(self.stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            remaining = [workers]
+            for n in range(workers):
+                thread = threading.Thread(
+                    target=self._work, args=(name, func, inbox, outbox, remaining),
+                    name=f"{name}-{n + 1}", daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+        try:
+            for item in items:
+                if self.stopped():
+                    logger.warning("[STOP] Aborting page processing due to user stop request.")
+                    break
+                queues[0].put(item)
+        finally:
+            queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+        with self._lock:
+            unfed = self.total - self.done if self.total is not None and self.stopped() else 0
+        if unfed > 0:
+            self._finish(None, unfed)   # never fed in because of the stop
+        return self.results
+
+    def _work(self, name, func, inbox, outbox, remaining):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if not last:
+                    inbox.put(_DONE)       # let the sibling workers see it too
+                elif outbox is not None:
+                    outbox.put(_DONE)      # stage drained; pass end-of-input on
+                return
+            if self.stopped():
+                self._finish(None)         # dropped, but still counted as done
+                continue
+            try:
+                result = func(item)
+            except Exception as e:
+                logger.error(f"[PIPELINE] {name} stage failed: {e}")
+                result = None
+            if result is None or outbox is None:
+                self._finish(result)
+            else:
+                outbox.put(result)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Background Prefetch for Smutscrape
+
+For modes with `url_pattern_pages` the next list page's URL is known as soon
+as the current one is read, so it is fetched and parsed on a background
+thread while the current page's videos download. When pagination reaches
+it, process_list_page takes the parsed items from here instead of waiting
+on the network.
+
+    prefetch_pages: 1     # config.yaml or site YAML; 0 turns it off
+
+Prefetches go through the normal fetch path, so the per-domain rate limiter
+and the `between_pages` pacing still apply to them. Each listing run has
+its own Prefetcher, closed when the run ends: a later run, with other
+filters or cookies, never gets an earlier run's pages.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_PREFETCH_PAGES = 1
+PREFETCH_TTL = 600   # seconds a prefetched page stays usable
+
+
+def prefetch_depth(site_config: Optional[Dict[str, Any]],
+                   general_config: Optional[Dict[str, Any]]) -> int:
+    """How many pages to read ahead: the site's `prefetch_pages`, else the global one."""
+    depth = (site_config or {}).get('prefetch_pages')
+    if depth is None:
+        depth = (general_config or {}).get('prefetch_pages', DEFAULT_PREFETCH_PAGES)
+    return max(0, int(depth or 0))
+
+
+class Prefetcher:
+    """Runs scheduled work on one background thread, in order, and keeps the results by key."""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Future]] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def schedule(self, key: Hashable, fn: Callable, *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs) under key unless it is already known; False if skipped."""
+        with self._lock:
+            self._expire()
+            if key in self._entries or len(self._entries) >= self.max_entries:
+                return False
+            future = Future()
+            self._entries[key] = (time.monotonic(), future)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._worker.start()
+        self._queue.put((key, future, fn, args, kwargs))
+        return True
+
+    def has(self, key: Hashable) -> bool:
+        """True if key is scheduled, running or done (and not expired)."""
+        with self._lock:
+            self._expire()
+            return key in self._entries
+
+    def take(self, key: Hashable, timeout: Optional[float] = None) -> Any:
+        """
+        Remove and return key's result, waiting for it if still in flight.
+
+        Returns:
+            The result, or None if the key is unknown or its work failed.
+        """
+        with self._lock:
+            self._expire()
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        future = entry[1]
+        if future.cancel():
+            return None   # never started; the caller is better off fetching it directly
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            logger.debug(f"[PREFETCH] Prefetch of {key!r} unusable: {e}")
+            return None
+
+    def clear(self):
+        """Forget everything; queued work is cancelled."""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for _, future in entries.values():
+            future.cancel()
+
+    def close(self):
+        """clear(), and let the background thread exit once its current work is done."""
+        self.clear()
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+
+    def _expire(self):
+        # Caller holds the lock.
+        cutoff = time.monotonic() - PREFETCH_TTL
+        for key in [k for k, (t, f) in self._entries.items() if t < cutoff and f.done()]:
+            del self._entries[key]
+
+    def _run(self):
+        while True:
+            work = self._queue.get()
+            if work is None:
+                return
+            key, future, fn, args, kwargs = work
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
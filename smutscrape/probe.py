@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Metadata Probe Service for Smutscrape
+
+When a date or duration filter is active and a site's pages don't show
+those fields, yt-dlp is asked for them. Rather than one blocking probe per
+video, a list page's candidates are handed to the ProbeService a window
+ahead of the item being processed (workers x batch_size videos): misses
+are split into batches that run concurrently (with the subprocess engine
+one yt-dlp process answers a whole batch), and the video pages later wait
+only for their own result, if it isn't in yet.
+
+Results are kept in a ProbeCache (``.probe_cache.json`` next to ``.state``)
+keyed by canonical URL, so a re-run with other --after/--min-duration
+values never probes the same video twice. The full info dicts of fresh
+probes stay in memory only (their media URLs expire) for the download that
+follows, so a filtered video's page is extracted once, not twice.
+
+    probe:
+      workers:     4      # batches probed at once
+      batch_size:  8      # URLs per batch
+      cache_days:  30     # how long a probed video's date/duration is trusted
+    # probe_cache_file: "~/.smutscrape/probe_cache.json"
+"""
+
+import atexit
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from smutscrape.network import merge_site_option
+from smutscrape.utilities import canonical_url
+from smutscrape.ytdlp import cookies_file, embedded, get_ytdlp_engine
+
+DEFAULT_PROBE = {'workers': 4, 'batch_size': 8, 'cache_days': 30}
+DEFAULT_PROBE_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), '.probe_cache.json')
+PROBE_TIMEOUT = 30        # seconds per URL for the subprocess engine
+SAVE_INTERVAL = 30        # seconds between cache writes while probing
+MAX_KEPT_INFOS = 128      # full info dicts held for the downloads that follow
+KEPT_INFO_TTL = 1800      # seconds before a kept info's media URLs are considered stale
+
+
+def probe_settings(site_config: Optional[Dict[str, Any]],
+                   general_config: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Probe settings: defaults, then config.yaml, then the site YAML."""
+    settings = dict(DEFAULT_PROBE)
+    settings.update(merge_site_option('probe', site_config, general_config))
+    return {key: max(1, int(value)) for key, value in settings.items() if key in DEFAULT_PROBE}
+
+
+def _na(value) -> Optional[str]:
+    value = str(value).strip() if value is not None else ''
+    return None if value in ('', 'NA', 'none', 'None') else value
+
+
+def summarize(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of an info dict the cache keeps: duration in seconds and upload date."""
+    duration = _na(info.get('duration'))
+    try:
+        seconds = float(duration) if duration else None
+    except ValueError:
+        seconds = None
+    return {'duration': seconds, 'upload_date': _na(info.get('upload_date'))}
+
+
+def probe_urls(urls: List[str], site_config: Optional[Dict[str, Any]],
+               general_config: Optional[Dict[str, Any]],
+               cookies: Optional[str] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Have yt-dlp extract several pages without downloading anything.
+
+    Returns:
+        url -> yt-dlp's full info dict, or None for a URL it could not extract.
+    """
+    cookies = cookies or cookies_file(site_config, general_config, tag="[PROBE]")
+    results: Dict[str, Optional[Dict[str, Any]]] = {url: None for url in urls}
+
+    if embedded(site_config, general_config):
+        options = {'noplaylist': True, 'socket_timeout': PROBE_TIMEOUT}
+        if cookies:
+            options['cookiefile'] = cookies
+        engine = get_ytdlp_engine()
+        for url in urls:
+            results[url] = engine.extract_info(url, options)
+        return results
+
+    # One process for the whole batch; it prints one info JSON per URL it could extract.
+    cmd = [
+        'yt-dlp',
+        '--no-download',
+        '--no-playlist',
+        '--ignore-errors',
+        '--dump-json',
+        '--quiet',
+        '--no-warnings',
+    ]
+    if cookies:
+        cmd += ['--cookies', cookies]
+    cmd += list(urls)
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT * len(urls))
+    except FileNotFoundError:
+        logger.warning("[PROBE] yt-dlp not found -- metadata probe skipped.")
+        return results
+    except subprocess.TimeoutExpired:
+        logger.warning(f"[PROBE] yt-dlp probe timed out for {len(urls)} URL(s)")
+        return results
+    for line in proc.stdout.splitlines():
+        try:
+            info = json.loads(line)
+        except ValueError:
+            continue
+        url = info.get('original_url') or info.get('webpage_url')
+        if url in results:
+            results[url] = info
+    if proc.returncode != 0 and all(r is None for r in results.values()):
+        stderr = proc.stderr.strip()
+        if stderr:
+            logger.warning(f"[PROBE] yt-dlp stderr: {stderr[:400]}")
+        else:
+            logger.warning(
+                f"[PROBE] yt-dlp returned no data (rc={proc.returncode}). "
+                "Site may require cookies/login for metadata."
+            )
+    return results
+
+
+class ProbeCache:
+    """Probe results by canonical URL, persisted as JSON and trusted for `ttl` seconds."""
+
+    def __init__(self, path: str = DEFAULT_PROBE_CACHE_FILE, ttl: float = DEFAULT_PROBE['cache_days'] * 86400):
+        """
+        Args:
+            path: JSON file the cache is read from and written to.
+            ttl: Seconds an entry stays valid.
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            cutoff = time.time() - self.ttl
+            self._entries = {url: e for url, e in entries.items() if e.get('saved', 0) > cutoff}
+            logger.debug(f"[PROBE] Loaded {len(self._entries)} cached probe result(s) from {self.path}")
+        except Exception as e:
+            logger.warning(f"[PROBE] Ignoring unreadable probe cache '{self.path}': {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """The cached result for url, or None if it was never probed or has expired."""
+        with self._lock:
+            entry = self._entries.get(canonical_url(url))
+        if entry is None or entry['saved'] <= time.time() - self.ttl:
+            return None
+        return entry
+
+    def put(self, url: str, result: Dict[str, Any]):
+        """Cache a probe result; written out at most every SAVE_INTERVAL seconds (and by flush())."""
+        with self._lock:
+            self._entries[canonical_url(url)] = dict(result, saved=time.time())
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                self._save()
+
+    def flush(self):
+        """Write pending results to disk."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        # Caller holds the lock. Written to a temp file first so a crash never truncates it.
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"[PROBE] Could not save probe cache '{self.path}': {e}")
+        self._saved_at = time.monotonic()
+
+
+class ProbeService:
+    """
+    Concurrent, batched, cached yt-dlp metadata probes.
+
+    The full info dict of each fresh probe is also kept in memory for a
+    while, so the download that usually follows can start from it
+    (take_info) instead of extracting the page again.
+    """
+
+    def __init__(self, cache: ProbeCache):
+        self.cache = cache
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers = 0
+        self._inflight: Dict[str, Future] = {}
+        self._infos: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keep(self, url: str, info: Dict[str, Any]):
+        """Cache the summary and hold on to the full info dict for take_info()."""
+        self.cache.put(url, summarize(info))
+        with self._lock:
+            self._infos[canonical_url(url)] = (time.monotonic(), info)
+            self._infos.move_to_end(canonical_url(url))
+            while len(self._infos) > MAX_KEPT_INFOS:
+                self._infos.popitem(last=False)
+
+    def take_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return the info dict a recent probe of url extracted, or
+        None if there is none (or it is too old for its media URLs to be trusted).
+        """
+        with self._lock:
+            kept = self._infos.pop(canonical_url(url), None)
+        if kept is None or time.monotonic() - kept[0] > KEPT_INFO_TTL:
+            return None
+        return kept[1]
+
+    def _pool(self, workers: int) -> ThreadPoolExecutor:
+        # Caller holds the lock.
+        if self._executor is None or workers > self._workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+            self._workers = workers
+        return self._executor
+
+    def schedule(self, urls: Iterable[str], site_config: Optional[Dict[str, Any]],
+                 general_config: Optional[Dict[str, Any]]) -> int:
+        """
+        Start probing the urls that are neither cached nor already in flight.
+
+        Returns:
+            How many URLs were queued.
+        """
+        settings = probe_settings(site_config, general_config)
+        with self._lock:
+            misses = []
+            for url in dict.fromkeys(urls):
+                key = canonical_url(url)
+                if key not in self._inflight and self.cache.get(url) is None:
+                    misses.append(url)
+            if not misses:
+                return 0
+            pool = self._pool(settings['workers'])
+            size = settings['batch_size']
+            for start in range(0, len(misses), size):
+                batch = misses[start:start + size]
+                future = pool.submit(self._run_batch, batch, site_config, general_config)
+                for url in batch:
+                    self._inflight[canonical_url(url)] = future
+        logger.info(f"[PROBE] Probing {len(misses)} video(s) in {(len(misses) + size - 1) // size} batch(es)")
+        return len(misses)
+
+    def _run_batch(self, urls, site_config, general_config):
+        try:
+            results = probe_urls(urls, site_config, general_config)
+            summaries = {}
+            for url, info in results.items():
+                if info is not None:
+                    self._keep(url, info)
+                summaries[canonical_url(url)] = summarize(info) if info is not None else None
+            return summaries
+        finally:
+            with self._lock:
+                for url in urls:
+                    self._inflight.pop(canonical_url(url), None)
+
+    def get(self, url: str, site_config: Optional[Dict[str, Any]],
+            general_config: Optional[Dict[str, Any]], cookies: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        The probe result for url: from the cache, from a batch already in
+        flight, or from a probe run now.
+        """
+        cached = self.cache.get(url)
+        if cached is not None:
+            logger.debug(f"[PROBE] Cached result for {url}")
+            return cached
+        with self._lock:
+            future = self._inflight.get(canonical_url(url))
+        if future is not None:
+            try:
+                return future.result().get(canonical_url(url))
+            except Exception as e:
+                logger.warning(f"[PROBE] Batch probe failed for {url}: {e}")
+                return None
+        cached = self.cache.get(url)   # a batch may have finished since the first look
+        if cached is not None:
+            return cached
+        logger.info(f"[PROBE] yt-dlp metadata probe \u2192 {url}")
+        info = probe_urls([url], site_config, general_config, cookies=cookies).get(url)
+        if info is None:
+            return None
+        self._keep(url, info)
+        return summarize(info)
+
+
+# Global probe service instance
+probe_service = None
+_service_lock = threading.Lock()
+
+def get_probe_service(general_config: Optional[Dict[str, Any]] = None) -> ProbeService:
+    """Get or create the probe service (``probe_cache_file`` in config.yaml moves its cache)."""
+    global probe_service
+    with _service_lock:
+        if probe_service is None:
+            ttl = probe_settings(None, general_config)['cache_days'] * 86400
+            cache = ProbeCache((general_config or {}).get('probe_cache_file') or DEFAULT_PROBE_CACHE_FILE, ttl)
+            probe_service = ProbeService(cache)
+            atexit.register(cache.flush)
+        return probe_service
+
+
+def take_probed_info(url: str) -> Optional[Dict[str, Any]]:
+    """The info dict a recent probe of url extracted (see ProbeService.take_info), or None."""
+    service = probe_service
+    return service.take_info(url) if service is not None else None
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Download Scheduler for Smutscrape
+
+Caps how many downloads run at once, both overall and per site, and owns
+the yt-dlp child processes so a stop request (or exit) kills them cleanly,
+including the ffmpeg processes they spawn. Downloads run by the in-process
+yt-dlp engine (ytdlp.py) are stopped through its progress hooks, and the
+processes yt-dlp starts for them (ffmpeg merges and downloads) are adopted
+and killed the same way.
+
+    max_concurrent_downloads: 3     # config.yaml: all sites together
+    max_concurrent_downloads: 1     # site YAML: this site (never above the global cap)
+
+The list-page pipeline sizes its download stage from the same setting, and
+every job reports through its own ProgressChannel so a UI can draw one bar
+per running download.
+"""
+
+import atexit
+import itertools
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 1
+KILL_GRACE_SECONDS = 5
+
+
+def download_concurrency(site_config: Optional[Dict[str, Any]],
+                         general_config: Optional[Dict[str, Any]]) -> int:
+    """Downloads a site may run at once: its own cap, bounded by the global one."""
+    overall = int((general_config or {}).get('max_concurrent_downloads') or DEFAULT_MAX_CONCURRENT_DOWNLOADS)
+    site = (site_config or {}).get('max_concurrent_downloads')
+    return max(1, min(int(site), overall) if site else overall)
+
+
+def popen_kwargs() -> Dict[str, Any]:
+    """Popen arguments that put the child in its own process group (see kill_process_tree)."""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Terminate a child and everything it spawned; escalate to a hard kill if it lingers."""
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(proc.pid)],
+                           capture_output=True, check=False)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        if os.name == 'nt':
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    except (ProcessLookupError, PermissionError, OSError):
+        proc.kill()
+        proc.wait()
+
+
+class ProgressChannel:
+    """Progress reporting for one download job."""
+
+    def __init__(self, job_id: int, title: str,
+                 progress_cb: Optional[Callable] = None, job_progress_cb: Optional[Callable] = None):
+        """
+        Args:
+            job_id: Scheduler-wide job number.
+            title: Shown next to the job's bar.
+            progress_cb: Old-style single-bar callback (pct, speed, eta).
+            job_progress_cb: Per-job callback (job_id, title, pct, speed, eta);
+                pct is None once the job has finished.
+        """
+        self.job_id = job_id
+        self.title = title
+        self.progress_cb = progress_cb
+        self.job_progress_cb = job_progress_cb
+
+    def __call__(self, pct: float, speed: str = "", eta: str = ""):
+        if self.progress_cb:
+            self.progress_cb(pct, speed, eta)
+        if self.job_progress_cb:
+            self.job_progress_cb(self.job_id, self.title, pct, speed, eta)
+
+    def close(self):
+        if self.job_progress_cb:
+            self.job_progress_cb(self.job_id, self.title, None, "", "")
+
+
+class DownloadScheduler:
+    """Global and per-site download slots, plus the child processes holding them."""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._global = threading.BoundedSemaphore(self.max_concurrent)
+        self._sites: Dict[str, threading.BoundedSemaphore] = {}
+        self._procs: Dict[int, subprocess.Popen] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _site_slots(self, site_config, general_config) -> threading.BoundedSemaphore:
+        key = (site_config or {}).get('shortcode') or '_default'
+        with self._lock:
+            slots = self._sites.get(key)
+            if slots is None:
+                limit = min(download_concurrency(site_config, general_config), self.max_concurrent)
+                slots = self._sites[key] = threading.BoundedSemaphore(limit)
+            return slots
+
+    @contextmanager
+    def slot(self, site_config, general_config, title: str = "",
+             progress_cb: Optional[Callable] = None, job_progress_cb: Optional[Callable] = None):
+        """
+        Hold a download slot for the site (and a global one) for the with-block.
+
+        Yields:
+            The job's ProgressChannel.
+        """
+        site_slots = self._site_slots(site_config, general_config)
+        with site_slots, self._global:
+            channel = ProgressChannel(next(self._ids), title, progress_cb, job_progress_cb)
+            try:
+                yield channel
+            finally:
+                channel.close()
+
+    def _watch(self, stop_event, done: threading.Event, stop: Callable[[], None], name: str):
+        """Call stop() if stop_event is set before done is."""
+        def watch():
+            while not done.is_set():
+                if stop_event.wait(0.5):
+                    if not done.is_set():
+                        stop()
+                    return
+        threading.Thread(target=watch, name=name, daemon=True).start()
+
+    @contextmanager
+    def track(self, proc: subprocess.Popen, stop_event=None):
+        """
+        Own a child process for the with-block: it is killed (with its
+        children) when stop_event is set or cancel_all() runs.
+        """
+        with self._lock:
+            self._procs[proc.pid] = proc
+        done = threading.Event()
+        if stop_event is not None:
+            def stop():
+                logger.warning(f"[DOWNLOAD] Stopping download process {proc.pid}.")
+                kill_process_tree(proc)
+            self._watch(stop_event, done, stop, f"dl-watch-{proc.pid}")
+        try:
+            yield proc
+        finally:
+            done.set()
+            with self._lock:
+                self._procs.pop(proc.pid, None)
+            if proc.poll() is None:
+                kill_process_tree(proc)
+
+    @contextmanager
+    def adopt(self, stop_event=None):
+        """
+        Own the processes an in-process download starts during the with-block
+        (see ytdlp.spawned_processes): like track(), they are killed when
+        stop_event is set or cancel_all() runs, and any still running at the
+        end of the block.
+
+        Yields:
+            The callback to hand each new process to.
+        """
+        adopted = []
+        done = threading.Event()
+
+        def register(proc: subprocess.Popen):
+            with self._lock:
+                adopted.append(proc)
+                self._procs[proc.pid] = proc
+            if stop_event is not None and stop_event.is_set():
+                kill_process_tree(proc)   # started after the watcher fired
+
+        if stop_event is not None:
+            def stop():
+                with self._lock:
+                    procs = list(adopted)
+                for proc in procs:
+                    if proc.poll() is None:
+                        logger.warning(f"[DOWNLOAD] Stopping yt-dlp child process {proc.pid}.")
+                        kill_process_tree(proc)
+            self._watch(stop_event, done, stop, "dl-watch-in-process")
+        try:
+            yield register
+        finally:
+            done.set()
+            with self._lock:
+                for proc in adopted:
+                    if self._procs.get(proc.pid) is proc:
+                        del self._procs[proc.pid]
+            for proc in adopted:
+                if proc.poll() is None:
+                    kill_process_tree(proc)
+
+    def cancel_all(self):
+        """Kill every running download process."""
+        with self._lock:
+            procs = list(self._procs.values())
+        for proc in procs:
+            logger.debug(f"[DOWNLOAD] Killing download process {proc.pid}")
+            kill_process_tree(proc)
+
+
+# Global download scheduler instance
+download_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_download_scheduler(general_config: Optional[Dict[str, Any]] = None) -> DownloadScheduler:
+    """Get or create the scheduler, sized from config.yaml's max_concurrent_downloads."""
+    global download_scheduler
+    with _scheduler_lock:
+        if download_scheduler is None:
+            download_scheduler = DownloadScheduler(download_concurrency(None, general_config))
+            # Children run in their own process group, so Ctrl+C no longer reaches them.
+            atexit.register(download_scheduler.cancel_all)
+        return download_scheduler
@@ -3,63 +3,62 @@
 Session and State Management Module for Smutscrape
 
 This module handles state file operations, progress tracking, and session management.
+Processed URLs live in the SQLite download ledger (see ledger.py), which
+imports the legacy ``.state`` file.
 """
 
-import os
+import atexit
 import time
-from typing import Set, Optional
+from typing import Optional
 from loguru import logger
 
+from smutscrape.ledger import DownloadLedger
+
 
 class SessionManager:
     """Manages session state and processed URL tracking."""
     
-    def __init__(self, state_file_path: str):
+    def __init__(self, state_file_path: str, ledger_path: Optional[str] = None):
         """Initialize session manager with state file path.
         
         Args:
-            state_file_path: Path to the state file for tracking processed URLs
+            state_file_path: Path to the legacy state file, imported into the ledger
+            ledger_path: Path to the ledger database (default: the state file path + ".db")
         """
         self.state_file = state_file_path
-        self.processed_urls: Set[str] = set()
+        self.ledger_file = ledger_path or f"{state_file_path}.db"
+        self.processed_urls: Optional[DownloadLedger] = None
         self.last_vpn_action_time = 0
         
         # Load existing state
         self.load_state()
     
-    def load_state(self) -> Set[str]:
-        """Load processed video URLs from state file.
+    def load_state(self) -> DownloadLedger:
+        """Open the download ledger, importing the state file if it changed.
         
         Returns:
-            Set of processed URLs
+            The ledger, a set of processed URLs
         """
-        if not os.path.exists(self.state_file):
-            self.processed_urls = set()
-            return self.processed_urls
-        
-        try:
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                self.processed_urls = set(line.strip() for line in f if line.strip())
-            logger.debug(f"Loaded {len(self.processed_urls)} URLs from state file")
-        except Exception as e:
-            logger.error(f"Failed to load state file '{self.state_file}': {e}")
-            self.processed_urls = set()
-        
+        if self.processed_urls is None:
+            self.processed_urls = DownloadLedger(self.ledger_file, self.state_file)
+            atexit.register(self.processed_urls.close)
+        else:
+            self.processed_urls.import_state_file(self.state_file)
+        # The index's count, not len(): counting rows would scan the whole ledger on every start.
+        logger.debug(f"Opened {self.ledger_file} ({self.processed_urls.indexed_count()} processed URLs indexed)")
         return self.processed_urls
     
     def save_state(self, url: str):
-        """Append a single URL to the state file.
+        """Record a single URL as processed in the ledger.
         
         Args:
             url: URL to mark as processed
         """
         try:
-            with open(self.state_file, 'a', encoding='utf-8') as f:
-                f.write(f"{url}\n")
             self.processed_urls.add(url)
             logger.debug(f"Added URL to state: {url}")
         except Exception as e:
-            logger.error(f"Failed to append to state file '{self.state_file}': {e}")
+            logger.error(f"Failed to record URL in ledger '{self.ledger_file}': {e}")
     
     def is_processed(self, url: str) -> bool:
         """Check if a URL has been processed.
@@ -73,7 +72,7 @@ class SessionManager:
         return url in self.processed_urls
     
     def mark_processed(self, url: str):
-        """Mark a URL as processed without immediately saving to file.
+        """Mark a URL as processed (committed with the ledger's next batch).
         
         Args:
             url: URL to mark as processed
@@ -101,12 +100,12 @@ class SessionManager:
         return current_time - self.last_vpn_action_time > interval
     
     def get_state_count(self) -> int:
-        """Get the number of processed URLs.
+        """Get the number of processed URLs, as counted by the ledger's hash index.
         
         Returns:
-            Number of processed URLs
+            Number of processed URLs (including any discarded since the index was built)
         """
-        return len(self.processed_urls)
+        return self.processed_urls.indexed_count()
 
 def is_url_processed(url, state_set):
 	"""Check if a URL is in the state set."""
@@ -16,6 +16,9 @@ from loguru import logger
 from rich.table import Table
 from rich.console import Group
 
+from smutscrape.extraction import ExtractionPlan, get_extraction_plan
+from smutscrape.utilities import register_canonical_rules
+
 
 @dataclass
 class ModeConfig:
@@ -27,6 +30,8 @@ class ModeConfig:
     url_pattern_pages: Optional[str] = None
     scraper: Optional[str] = None
     max_pages: Optional[int] = None
+    sort: Optional[str] = None  # 'date_desc' for newest-first listings
+    filter_params: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # --after/--min-duration pushdown
     url_encoding_rules: Dict[str, str] = field(default_factory=dict)
     video_id_placeholder: Optional[str] = None  # For video mode
     
@@ -72,24 +77,28 @@ class ScraperConfig:
     pagination: Optional[Dict[str, Any]] = None
     video_container: Optional[Dict[str, str]] = None
     video_item: Optional[Dict[str, Any]] = None
+    plan: Optional[ExtractionPlan] = None
     
     @classmethod
     def from_dict(cls, name: str, data: Dict[str, Any]) -> 'ScraperConfig':
-        """Create from dictionary"""
+        """Create from dictionary, compiling the extraction plan for its fields"""
         # Handle different scraper structures
         if name == 'list_scraper':
             fields = {}
+            plan = None
             if 'video_item' in data and 'fields' in data['video_item']:
                 fields = {
                     field_name: ScraperFieldConfig.from_dict(field_config)
                     for field_name, field_config in data['video_item']['fields'].items()
                 }
+                plan = get_extraction_plan(data['video_item']['fields'])
             return cls(
                 name=name,
                 fields=fields,
                 pagination=data.get('pagination'),
                 video_container=data.get('video_container'),
-                video_item=data.get('video_item')
+                video_item=data.get('video_item'),
+                plan=plan
             )
         else:
             # Video or RSS scraper
@@ -98,7 +107,7 @@ class ScraperConfig:
                 for field_name, field_config in data.items()
                 if field_name not in ['pagination', 'video_container', 'video_item']
             }
-            return cls(name=name, fields=fields)
+            return cls(name=name, fields=fields, plan=get_extraction_plan(data))
 
 
 @dataclass
@@ -161,6 +170,8 @@ class SiteConfiguration:
                 url_pattern_pages=mode_data.get('url_pattern_pages'),
                 scraper=mode_data.get('scraper'),
                 max_pages=mode_data.get('max_pages'),
+                sort=mode_data.get('sort'),
+                filter_params=mode_data.get('filter_params') or {},
                 url_encoding_rules=mode_data.get('url_encoding_rules', {}),
                 video_id_placeholder=mode_data.get('video_id_placeholder')
             )
@@ -354,6 +365,7 @@ class SiteManager:
                         site = SiteConfiguration(config_dict, config_file)
                         # Store by shortcode for quick lookup
                         self.sites[site.shortcode] = site
+                        register_canonical_rules(config_dict)
                         logger.debug(f"Loaded site config: {site.shortcode} ({site.name})")
                 except Exception as e:
                     logger.warning(f"Failed to load site config '{config_file}': {e}")
@@ -6,13 +6,15 @@ This module contains utility functions for terminal display, ASCII art rendering
 color manipulation, and VPN management.
 """
 
+import fnmatch
+import hashlib
 import os
 import re
 import random
 import subprocess
 import time
 import string
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse
 from typing import Tuple, Optional, Dict, Any, List
 from loguru import logger
 from termcolor import colored
@@ -355,6 +357,140 @@ def is_url(string: str) -> bool:
     return bool(parsed.netloc) or bool(parsed.scheme)
 
 
+# Query parameters that never identify a video (fnmatch patterns).
+DEFAULT_STRIP_PARAMS = ('utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid',
+                        'mc_cid', 'mc_eid', '_ga', '_gl', 'igshid')
+
+CANONICAL_VERSION = 1   # bump when canonical_url() changes the keys of video_id sites
+
+# Per-host dedupe rules registered from site YAMLs (see register_canonical_rules).
+_canonical_rules: Dict[str, Dict[str, Any]] = {}
+
+
+def _bare_host(host: str) -> str:
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def canonical_rules(site_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    A site's dedupe-key rules, from its `canonical:` block and the video
+    mode's url_pattern:
+
+        canonical:
+          strip_params: [sort, t]   # more query parameters to drop (utm_*, fbclid, ... always are)
+          keep_params:  [id]        # or: the only query parameters kept
+          video_id:     video       # key video pages by this placeholder of modes.video.url_pattern
+
+    `video_id` is off unless set, and must name a placeholder that holds a
+    stable id: on many sites `{video}` is the title slug, and keying by it
+    would make different videos with the same title one.
+    """
+    site_config = site_config or {}
+    block = site_config.get('canonical') or {}
+    rules = {
+        'strip_params': tuple(DEFAULT_STRIP_PARAMS) + tuple(block.get('strip_params') or ()),
+        'keep_params': tuple(str(p).lower() for p in block.get('keep_params') or ()),
+        'video_regex': None,
+        'video_group': None,
+        'declared': bool(block),
+    }
+    video_id = block.get('video_id')
+    if video_id is True:
+        video_id = 'video'
+    pattern = ((site_config.get('modes') or {}).get('video') or {}).get('url_pattern')
+    if isinstance(video_id, str) and pattern:
+        if f"{{{video_id}}}" in pattern:
+            rules['video_regex'] = pattern_to_regex(pattern)[0]
+            rules['video_group'] = video_id
+        else:
+            logger.warning(f"canonical.video_id '{video_id}' is not a placeholder of {pattern}; ignoring it")
+    return rules
+
+
+_rules_by_site: Dict[str, Dict[str, Any]] = {}
+
+
+def _site_rules(site_config: Dict[str, Any]) -> Dict[str, Any]:
+    key = site_config.get('shortcode') or str(id(site_config))
+    if key not in _rules_by_site:
+        _rules_by_site[key] = canonical_rules(site_config)
+    return _rules_by_site[key]
+
+
+def register_canonical_rules(site_config: Optional[Dict[str, Any]]):
+    """Use a site's rules for canonical_url() calls on its hosts (base_url and domain)."""
+    site_config = site_config or {}
+    rules = canonical_rules(site_config)
+    for host in (urlparse(site_config.get('base_url') or '').hostname, site_config.get('domain')):
+        if host and host != 'n/a':
+            _canonical_rules[_bare_host(host)] = rules
+
+
+def canonical_rules_fingerprint() -> str:
+    """
+    Changes whenever the rules sites declared in `canonical:` blocks would
+    produce different keys (stores keyed by them re-key); '' while no site
+    declares any. CANONICAL_VERSION only counts for video_id sites.
+    """
+    parts = sorted(
+        f"{host}|{','.join(r['strip_params'])}|{','.join(r['keep_params'])}|"
+        + (f"v{CANONICAL_VERSION}:{r['video_group']}:{r['video_regex'].pattern}" if r['video_regex'] else '')
+        for host, r in _canonical_rules.items() if r['declared']
+    )
+    if not parts:
+        return ''
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def canonical_url(url: str, site_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable dedupe key for a page URL, used by the ledger, probe cache and
+    in-flight dedupe.
+
+    http, https and protocol-relative links are one scheme; the host is
+    lower-cased without `www.` or a default port; the fragment, trailing
+    slash and tracking parameters go and the rest of the query is sorted.
+    Where the site (given, or registered for the URL's host) opts in with
+    `canonical.video_id`, a page matching its video pattern is keyed by the
+    id alone, so slug or category changes in the path don't make it a new
+    video.
+    """
+    url = url.strip()
+    if url.startswith('//'):
+        url = f"https:{url}"
+    parsed = urlparse(url)
+    scheme = (parsed.scheme or 'https').lower()
+    if scheme == 'http':
+        scheme = 'https'
+    host = _bare_host(parsed.hostname or '')
+    rules = _canonical_rules.get(host)
+    if rules is None and site_config is not None:
+        rules = _site_rules(site_config)
+
+    if rules and rules['video_regex'] is not None:
+        path = parsed.path.rstrip('/') or '/'
+        for target in (path, f"{path}?{parsed.query}" if parsed.query else None):
+            match = rules['video_regex'].match(target) if target else None
+            if match and match.group(rules['video_group']):
+                return f"video:{host}/{match.group(rules['video_group'])}"
+
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    path = parsed.path.rstrip('/') or '/'
+    strip = rules['strip_params'] if rules else DEFAULT_STRIP_PARAMS
+    keep = rules['keep_params'] if rules else ()
+    params = []
+    for param in filter(None, parsed.query.split('&')):
+        name = param.split('=', 1)[0].lower()
+        if keep and name not in keep:
+            continue
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in strip):
+            continue
+        params.append(param)
+    return urlunparse((scheme, host, path, '', '&'.join(sorted(params)), ''))
+
+
 def process_title(title: str, invalid_chars: List[str]) -> str:
     """Process title by removing invalid characters."""
     logger.debug(f"Processing {title} for invalid chars...")
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+yt-dlp Engine for Smutscrape
+
+Runs yt-dlp inside this process through `yt_dlp.YoutubeDL` instead of
+starting a `yt-dlp` process per video, so Python startup, extractor imports
+and cookie-file parsing are paid once per site rather than once per video.
+YoutubeDL instances are kept per option set (format, cookies, headers)
+and reused; progress comes from yt-dlp's progress hooks rather than from
+parsing its console output. An info dict from an earlier metadata probe
+can be downloaded directly (download_info) without extracting the page again.
+The processes yt-dlp itself starts (ffmpeg merges, ffmpeg downloads) can be
+handed to the download scheduler, which kills them on a stop request.
+
+    ytdlp_engine: embedded     # config.yaml or site YAML; "subprocess" runs the yt-dlp command
+
+The subprocess path is also used when the yt_dlp module can't be imported.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from smutscrape.scheduler import popen_kwargs
+
+YTDLP_AVAILABLE = True
+try:
+    import yt_dlp
+    import yt_dlp.utils
+    from yt_dlp.utils import DownloadCancelled, parse_bytes
+except ImportError:
+    YTDLP_AVAILABLE = False
+
+DEFAULT_ENGINE = 'embedded'
+DEFAULT_FORMAT = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best'
+MAX_IDLE_PER_KEY = 4   # idle YoutubeDL instances kept per option set
+
+# Options read at use time rather than in YoutubeDL.__init__; they are set per
+# call on a leased instance, so a per-video output path doesn't force a new one.
+CALL_OPTIONS = ('outtmpl', 'paths', 'overwrites')
+
+
+def engine_mode(site_config: Optional[Dict[str, Any]],
+                general_config: Optional[Dict[str, Any]]) -> str:
+    """'embedded' or 'subprocess': the site's `ytdlp_engine`, else the global one."""
+    mode = (site_config or {}).get('ytdlp_engine') or (general_config or {}).get('ytdlp_engine') or DEFAULT_ENGINE
+    if mode == 'embedded' and not YTDLP_AVAILABLE:
+        return 'subprocess'
+    return mode
+
+
+def embedded(site_config: Optional[Dict[str, Any]], general_config: Optional[Dict[str, Any]]) -> bool:
+    """True if yt-dlp work for this site runs in-process."""
+    return engine_mode(site_config, general_config) == 'embedded'
+
+
+def cookies_file(site_config: Optional[Dict[str, Any]], general_config: Optional[Dict[str, Any]],
+                 tag: str = "[DOWNLOAD]") -> Optional[str]:
+    """The configured cookies file (config.yaml first, then the site YAML), or None if unset or missing."""
+    cookies = (general_config or {}).get('cookies_file') or (site_config or {}).get('cookies_file')
+    if not cookies:
+        return None
+    cookies = os.path.expanduser(cookies)
+    if not os.path.isfile(cookies):
+        logger.warning(f"{tag} cookies_file not found: {cookies}")
+        return None
+    logger.debug(f"{tag} Using cookies: {cookies}")
+    return cookies
+
+
+def rate_limit_bytes(rate_limit) -> Optional[int]:
+    """`rate_limit` from config.yaml (e.g. "2M") as bytes per second."""
+    if not rate_limit:
+        return None
+    if isinstance(rate_limit, (int, float)):
+        return int(rate_limit)
+    return parse_bytes(str(rate_limit))
+
+
+def extractor_args(spec: str) -> Dict[str, Dict[str, List[str]]]:
+    """An --extractor-args value ("ie:key=a,b;key2") as YoutubeDL's `extractor_args` option."""
+    ie, _, args = spec.partition(':')
+    parsed: Dict[str, List[str]] = {}
+    for arg in filter(None, args.split(';')):
+        key, _, value = arg.partition('=')
+        parsed[key.strip().lower().replace('-', '_')] = value.split(',')
+    return {ie.strip().lower(): parsed}
+
+
+def downloaded_files(info: Optional[Dict[str, Any]]) -> List[str]:
+    """Paths of the files a download produced (playlist entries included)."""
+    if not info:
+        return []
+    files = [d['filepath'] for d in info.get('requested_downloads') or [] if d.get('filepath')]
+    for entry in info.get('entries') or []:
+        files.extend(downloaded_files(entry))
+    return files
+
+
+def write_info_json(info: Dict[str, Any]) -> str:
+    """Save an info dict to a temporary file for `yt-dlp --load-info-json`; the caller removes it."""
+    fd, path = tempfile.mkstemp(prefix='smutscrape-', suffix='.info.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    return path
+
+
+def _format_speed(speed: Optional[float]) -> str:
+    if not speed:
+        return ""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if speed < 1024 or unit == 'GiB':
+            return f"{speed:.2f}{unit}/s"
+        speed /= 1024
+    return ""
+
+
+def _format_eta(eta: Optional[float]) -> str:
+    if eta is None:
+        return ""
+    minutes, seconds = divmod(int(eta), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+_spawn = threading.local()
+_hook_lock = threading.Lock()
+
+
+def _hook_popen():
+    """Report each process yt-dlp starts to the current thread's spawned_processes() callback."""
+    popen = yt_dlp.utils.Popen   # yt-dlp starts ffmpeg, ffprobe and external downloaders through it
+    with _hook_lock:
+        if getattr(popen, '_smutscrape_init', None) is not None:
+            return
+        original = popen.__init__
+
+        def __init__(self, *args, **kwargs):
+            on_spawn = getattr(_spawn, 'callback', None)
+            if on_spawn is not None:
+                kwargs = {**popen_kwargs(), **kwargs}   # its own group, so its children die with it
+            original(self, *args, **kwargs)
+            if on_spawn is not None:
+                on_spawn(self)
+
+        popen._smutscrape_init = original
+        popen.__init__ = __init__
+
+
+@contextmanager
+def spawned_processes(on_spawn: Optional[Callable]):
+    """Pass every process yt-dlp starts on this thread during the with-block to on_spawn."""
+    if on_spawn is None:
+        yield
+        return
+    _hook_popen()
+    previous = getattr(_spawn, 'callback', None)
+    _spawn.callback = on_spawn
+    try:
+        yield
+    finally:
+        _spawn.callback = previous
+
+
+class _YtDlpLogger:
+    """Routes yt-dlp's messages to loguru; warnings are debug-level, like --no-warnings."""
+
+    def debug(self, msg):
+        logger.debug(f"[yt-dlp] {msg}")
+
+    def info(self, msg):
+        logger.debug(f"[yt-dlp] {msg}")
+
+    def warning(self, msg):
+        logger.debug(f"[yt-dlp] {msg}")
+
+    def error(self, msg):
+        logger.error(f"[yt-dlp] {msg}")
+
+
+class _Hooks:
+    """
+    Per-lease progress callback and stop event, read by an instance's
+    progress and postprocessor hooks; a stop raises in either, so yt-dlp
+    also abandons its remaining postprocessors.
+    """
+
+    def __init__(self):
+        self.progress_cb: Optional[Callable] = None
+        self.stop_event = None
+        self.files: List[str] = []
+        self.defaults: Dict[str, Any] = {}   # the instance's own CALL_OPTIONS values
+
+    def __call__(self, status: Dict[str, Any]):
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise DownloadCancelled("stop requested")
+        if status.get('status') == 'finished' and status.get('filename'):
+            self.files.append(status['filename'])
+        if not self.progress_cb or status.get('status') != 'downloading':
+            return
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if total:
+            pct = 100.0 * (status.get('downloaded_bytes') or 0) / total
+        elif status.get('fragment_count'):
+            pct = 100.0 * (status.get('fragment_index') or 0) / status['fragment_count']
+        else:
+            return
+        self.progress_cb(min(pct, 100.0), _format_speed(status.get('speed')), _format_eta(status.get('eta')))
+
+
+class YtDlpEngine:
+    """Pool of reusable in-process YoutubeDL instances, keyed by their options."""
+
+    BASE_OPTIONS = {
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True,
+    }
+
+    def __init__(self):
+        self._idle: Dict[str, List[Any]] = {}
+        self._hooks: Dict[int, _Hooks] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(options: Dict[str, Any]) -> str:
+        return json.dumps(options, sort_keys=True, default=str)
+
+    def _lease(self, key: str, options: Dict[str, Any]):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        hooks = _Hooks()
+        params = dict(self.BASE_OPTIONS)
+        params.update(options)
+        params['logger'] = _YtDlpLogger()
+        params['progress_hooks'] = [hooks]
+        params['postprocessor_hooks'] = [hooks]
+        ydl = yt_dlp.YoutubeDL(params)
+        hooks.defaults = {name: ydl.params.get(name) for name in CALL_OPTIONS}
+        hooks.defaults['outtmpl'] = dict(ydl.params['outtmpl'])
+        with self._lock:
+            self._hooks[id(ydl)] = hooks
+        logger.debug(f"[yt-dlp] New in-process instance ({len(self._hooks)} total)")
+        return ydl
+
+    def _release(self, key: str, ydl):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < MAX_IDLE_PER_KEY:
+                idle.append(ydl)
+                return
+            self._hooks.pop(id(ydl), None)
+
+    @contextmanager
+    def instance(self, options: Dict[str, Any], progress_cb: Optional[Callable] = None, stop_event=None):
+        """
+        Lease a YoutubeDL built with options for the with-block.
+
+        Yields:
+            (ydl, hooks): the instance and its _Hooks, which collect the
+            finished file names and forward progress to progress_cb.
+        """
+        options = dict(options)
+        call = {name: options.pop(name) for name in CALL_OPTIONS if name in options}
+        key = self._key(options)
+        ydl = self._lease(key, options)
+        hooks = self._hooks[id(ydl)]
+        hooks.progress_cb, hooks.stop_event, hooks.files = progress_cb, stop_event, []
+        for name in CALL_OPTIONS:
+            value = hooks.defaults[name]
+            if name == 'outtmpl':
+                value = dict(value, default=call['outtmpl']) if 'outtmpl' in call else dict(value)
+            elif name in call:
+                value = call[name]
+            if value is None:
+                ydl.params.pop(name, None)
+            else:
+                ydl.params[name] = value
+        try:
+            yield ydl, hooks
+        finally:
+            hooks.progress_cb, hooks.stop_event = None, None
+            self._release(key, ydl)
+
+    def extract_info(self, url: str, options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Info dict for url without downloading anything, or None on failure."""
+        try:
+            with self.instance(options or {}) as (ydl, _):
+                return ydl.sanitize_info(ydl.extract_info(url, download=False))
+        except Exception as e:
+            logger.warning(f"[yt-dlp] Extraction failed for {url}: {e}")
+            return None
+
+    def download(self, url: str, options: Dict[str, Any], progress_cb: Optional[Callable] = None,
+                 stop_event=None, on_spawn: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
+        """
+        Download url in-process.
+
+        Args:
+            url: Page URL.
+            options: YoutubeDL options (outtmpl, format, cookiefile, ...).
+            progress_cb: Called with (pct, speed, eta) while downloading.
+            stop_event: threading.Event; setting it cancels the download.
+            on_spawn: Called with each process yt-dlp starts (e.g. the
+                callback DownloadScheduler.adopt() yields).
+
+        Returns:
+            The info dict (its requested_downloads name the files), or None on
+            failure or cancellation.
+        """
+        return self._run(url, lambda ydl: ydl.extract_info(url, download=True),
+                         options, progress_cb, stop_event, on_spawn)
+
+    def download_info(self, info: Dict[str, Any], options: Dict[str, Any],
+                      progress_cb: Optional[Callable] = None, stop_event=None,
+                      on_spawn: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
+        """
+        Download from an info dict an earlier extract_info() returned, like
+        --load-info-json: the page is not extracted again, only the format is
+        re-selected with these options. Same arguments and result as download().
+        """
+        url = info.get('webpage_url') or info.get('original_url') or info.get('id', '?')
+        return self._run(url, lambda ydl: ydl.process_ie_result(dict(info), download=True),
+                         options, progress_cb, stop_event, on_spawn)
+
+    def _run(self, url: str, action: Callable, options: Dict[str, Any],
+             progress_cb: Optional[Callable], stop_event,
+             on_spawn: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
+        if stop_event is not None and stop_event.is_set():
+            return None
+        try:
+            with self.instance(options, progress_cb, stop_event) as (ydl, hooks), spawned_processes(on_spawn):
+                info = action(ydl)
+                if info is not None and not downloaded_files(info) and hooks.files:
+                    info['requested_downloads'] = [{'filepath': f} for f in hooks.files]
+                return info
+        except DownloadCancelled:
+            logger.warning(f"[yt-dlp] Download cancelled: {url}")
+            return None
+        except Exception as e:
+            if stop_event is not None and stop_event.is_set():
+                # e.g. the postprocessor whose ffmpeg the scheduler killed
+                logger.warning(f"[yt-dlp] Download cancelled: {url}")
+            else:
+                logger.error(f"[yt-dlp] Download failed for {url}: {e}")
+            return None
+
+
+# Global engine instance
+ytdlp_engine = None
+_engine_lock = threading.Lock()
+
+def get_ytdlp_engine() -> YtDlpEngine:
+    """Get or create the in-process yt-dlp engine."""
+    global ytdlp_engine
+    with _engine_lock:
+        if ytdlp_engine is None:
+            ytdlp_engine = YtDlpEngine()
+        return ytdlp_engine
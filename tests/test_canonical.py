@@ -0,0 +1,116 @@
+"""
+canonical_url() dedupe keys: default normalisation, per-host rules from
+site YAMLs, opt-in video-id keys and the rules fingerprint the ledger
+re-keys on.
+"""
+
+import pytest
+
+from smutscrape import utilities
+from smutscrape.utilities import canonical_rules_fingerprint, canonical_url, register_canonical_rules
+
+
+@pytest.fixture(autouse=True)
+def clean_rules(monkeypatch):
+    monkeypatch.setattr(utilities, '_canonical_rules', {})
+    monkeypatch.setattr(utilities, '_rules_by_site', {})
+
+
+def _site(shortcode, base_url, video_pattern=None, canonical=None):
+    site = {'shortcode': shortcode, 'base_url': base_url, 'domain': 'n/a'}
+    if video_pattern:
+        site['modes'] = {'video': {'url_pattern': video_pattern}}
+    if canonical is not None:
+        site['canonical'] = canonical
+    return site
+
+
+@pytest.mark.parametrize('url,expected', [
+    ('http://www.Example.com/watch/1/', 'https://example.com/watch/1'),
+    ('//example.com/watch/1#comments', 'https://example.com/watch/1'),
+    ('https://example.com:443/watch/1', 'https://example.com/watch/1'),
+    ('https://example.com:8080/watch/1', 'https://example.com:8080/watch/1'),
+    ('https://example.com/watch?b=2&a=1', 'https://example.com/watch?a=1&b=2'),
+    ('https://example.com/watch/1?utm_source=x&UTM_medium=y&fbclid=z&gclid=g', 'https://example.com/watch/1'),
+    ('https://example.com/watch/1?t=30&_ga=1&igshid=2', 'https://example.com/watch/1?t=30'),
+])
+def test_default_normalisation_strips_tracking_params(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_per_host_rules_apply_only_to_their_host():
+    register_canonical_rules(_site('a', 'https://www.a.com', canonical={'strip_params': ['sort', 't']}))
+    register_canonical_rules(_site('b', 'https://b.com', canonical={'keep_params': ['id']}))
+    assert canonical_url('https://a.com/v/1?sort=new&t=5&q=x') == 'https://a.com/v/1?q=x'
+    assert canonical_url('https://b.com/watch?id=7&ref=home&utm_source=x') == 'https://b.com/watch?id=7'
+    assert canonical_url('https://c.com/v/1?sort=new&t=5') == 'https://c.com/v/1?sort=new&t=5'
+
+
+def test_site_config_rules_used_for_unregistered_hosts():
+    site = _site('a', 'https://a.com', canonical={'strip_params': ['sort']})
+    assert canonical_url('https://mirror.a.net/v/1?sort=new', site) == 'https://mirror.a.net/v/1'
+
+
+def test_slug_patterns_are_not_video_keys_by_default():
+    # xvideos-style: {video} is the title slug, so two videos can share it.
+    register_canonical_rules(_site('xv', 'https://www.xvideos.com', '/video.{any}/{video}'))
+    register_canonical_rules(_site('ml', 'https://motherless.com', '/{video}'))
+    first = canonical_url('https://www.xvideos.com/video.abc/some-slug')
+    second = canonical_url('https://www.xvideos.com/video.def/some-slug')
+    assert first != second
+    assert not first.startswith('video:')
+    assert canonical_url('https://motherless.com/term') == 'https://motherless.com/term'
+
+
+def test_video_id_keys_by_the_named_placeholder():
+    register_canonical_rules(_site('xv', 'https://www.xvideos.com', '/video.{any}/{video}',
+                                   canonical={'video_id': 'any'}))
+    assert canonical_url('https://www.xvideos.com/video.abc/some-slug') == 'video:xvideos.com/abc'
+    assert canonical_url('http://xvideos.com/video.abc/renamed-slug/') == 'video:xvideos.com/abc'
+    assert canonical_url('https://www.xvideos.com/video.def/some-slug') == 'video:xvideos.com/def'
+
+
+def test_video_id_on_a_query_id_pattern():
+    register_canonical_rules(_site('ph', 'https://www.pornhub.com', '/view_video.php?viewkey={video}',
+                                   canonical={'video_id': 'video'}))
+    assert canonical_url('https://www.pornhub.com/view_video.php?viewkey=ph123&pkey=9') == 'video:pornhub.com/ph123'
+    assert canonical_url('https://pornhub.com/model/someone/videos?page=2') == \
+        'https://pornhub.com/model/someone/videos?page=2'
+
+
+def test_video_id_naming_a_missing_placeholder_is_ignored():
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}', canonical={'video_id': 'id'}))
+    assert canonical_url('https://a.com/watch/1') == 'https://a.com/watch/1'
+
+
+def test_fingerprint_is_empty_without_declared_rules():
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}'))
+    assert canonical_rules_fingerprint() == ''
+
+
+def test_fingerprint_is_stable_and_follows_declared_rules():
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}', canonical={'strip_params': ['t']}))
+    register_canonical_rules(_site('b', 'https://b.com', '/v/{video}', canonical={'video_id': 'video'}))
+    fingerprint = canonical_rules_fingerprint()
+    assert fingerprint and fingerprint == canonical_rules_fingerprint()
+
+    # Registration order and undeclared sites don't matter.
+    utilities._canonical_rules.clear()
+    register_canonical_rules(_site('c', 'https://c.com', '/{video}'))
+    register_canonical_rules(_site('b', 'https://b.com', '/v/{video}', canonical={'video_id': 'video'}))
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}', canonical={'strip_params': ['t']}))
+    assert canonical_rules_fingerprint() == fingerprint
+
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}', canonical={'strip_params': ['sort']}))
+    assert canonical_rules_fingerprint() != fingerprint
+
+
+def test_fingerprint_version_only_counts_for_video_id_sites(monkeypatch):
+    register_canonical_rules(_site('a', 'https://a.com', '/watch/{video}', canonical={'strip_params': ['t']}))
+    before = canonical_rules_fingerprint()
+    monkeypatch.setattr(utilities, 'CANONICAL_VERSION', utilities.CANONICAL_VERSION + 1)
+    assert canonical_rules_fingerprint() == before
+    register_canonical_rules(_site('b', 'https://b.com', '/v/{video}', canonical={'video_id': 'video'}))
+    with_video = canonical_rules_fingerprint()
+    monkeypatch.setattr(utilities, 'CANONICAL_VERSION', utilities.CANONICAL_VERSION + 1)
+    assert canonical_rules_fingerprint() != with_video
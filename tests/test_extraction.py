@@ -0,0 +1,39 @@
+"""
+The compiled-plan cache follows what a selector dict says, not which dict
+object it is, and stays bounded.
+"""
+
+import copy
+
+from smutscrape import extraction
+from smutscrape.extraction import get_extraction_plan
+
+FIELDS = {
+    'title': {'selector': 'h1'},
+    'tags': {'selector': 'a.tag', 'attribute': 'href'},
+}
+
+
+def test_equal_dicts_share_a_plan():
+    assert get_extraction_plan(FIELDS) is get_extraction_plan(copy.deepcopy(FIELDS))
+
+
+def test_edited_dict_gets_a_new_plan():
+    fields = copy.deepcopy(FIELDS)
+    before = get_extraction_plan(fields)
+    fields['title']['selector'] = 'h2'
+    after = get_extraction_plan(fields)
+    assert after is not before
+    assert [f.selectors for f in after.fields if f.name == 'title'] == [('h2',)]
+
+
+def test_field_order_is_kept():
+    reordered = dict(reversed(list(FIELDS.items())))
+    assert [f.name for f in get_extraction_plan(reordered).fields] == ['tags', 'title']
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(extraction, 'MAX_PLANS', 3)
+    for n in range(10):
+        get_extraction_plan({'title': {'selector': f'h{n}'}})
+    assert len(extraction._plans) == 3
@@ -0,0 +1,141 @@
+"""
+Last-page discovery (exponential probe, then binary search) and the
+PageFanout that reads pages concurrently, against fake listings.
+"""
+
+import threading
+
+import pytest
+
+from smutscrape.fanout import PageFanout, find_last_page
+
+
+class Listing:
+    """Fake page-exists callable: pages first..last have items; `errors` raise once each."""
+
+    def __init__(self, last, errors=(), first=1):
+        self.last = last
+        self.first = first
+        self.errors = set(errors)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, page):
+        with self._lock:
+            self.calls.append(page)
+            if page in self.errors:
+                self.errors.discard(page)
+                raise ConnectionError(f"page {page} timed out")
+        return self.first <= page <= self.last
+
+    def read_page(self, page, per_page=3):
+        if not self(page):
+            return None
+        return [f"p{page}-{i}" for i in range(per_page if page < self.last else 1)]
+
+
+@pytest.mark.parametrize('last,known,limit,expected', [
+    (1, 1, None, 1),          # one page
+    (2, 1, None, 2),
+    (3, 1, None, 3),          # known + 2
+    (5, 1, None, 5),          # known + 4
+    (8, 1, None, 8),          # a power of two
+    (9, 1, None, 9),          # known + 8, the last probe that hits
+    (16, 1, None, 16),
+    (17, 1, None, 17),
+    (1024, 1, None, 1024),
+    (100, 1, 50, 50),         # max_pages cap below the real last page
+    (100, 1, 64, 64),         # cap on a power of two
+    (100, 1, 9, 9),           # cap exactly on a probe
+    (40, 1, 50, 40),          # cap above the real last page
+    (3, 3, None, 3),          # started on the last page
+    (30, 7, None, 30),
+    (5, 5, 5, 5),             # started on the capped page
+])
+def test_find_last_page(last, known, limit, expected):
+    listing = Listing(last)
+    assert find_last_page(listing, known=known, limit=limit) == expected
+    assert len(listing.calls) == len(set(listing.calls))   # each page probed once
+
+
+@pytest.mark.parametrize('last', [1, 2, 7, 8, 9, 63, 64, 65, 1000])
+def test_find_last_page_probes_logarithmically(last):
+    listing = Listing(last)
+    assert find_last_page(listing) == last
+    assert len(listing.calls) <= 2 * last.bit_length() + 2
+
+
+def test_find_last_page_never_probes_past_the_cap():
+    listing = Listing(10 ** 6)
+    assert find_last_page(listing, limit=100) == 100
+    assert max(listing.calls) == 100
+
+
+def _pages(fanout, key=lambda item: item):
+    try:
+        return list(fanout.pages(key=key))
+    finally:
+        fanout.close()
+
+
+def test_fanout_one_page_listing():
+    listing = Listing(1)
+    pages = _pages(PageFanout(listing.read_page, workers=3))
+    assert pages == [(1, ['p1-0'])]
+    assert max(listing.calls) <= 2
+
+
+@pytest.mark.parametrize('last', [2, 8, 16, 17])
+def test_fanout_reads_every_page_in_order(last):
+    listing = Listing(last)
+    pages = _pages(PageFanout(listing.read_page, workers=4))
+    assert [page for page, _ in pages] == list(range(1, last + 1))
+    assert pages[-1][1] == [f"p{last}-0"]
+
+
+def test_fanout_probe_error_mid_search_is_read_again():
+    # Page 19 fails while the binary search probes it, so the search settles
+    # on 18; the full page 18 makes the fan-out read on, and 19 is retried.
+    listing = Listing(20, errors={19})
+    pages = _pages(PageFanout(listing.read_page, workers=2))
+    assert [page for page, _ in pages] == list(range(1, 21))
+    assert listing.calls.count(19) == 2
+
+
+def test_fanout_respects_max_pages():
+    listing = Listing(100)
+    pages = _pages(PageFanout(listing.read_page, workers=4, limit=16))
+    assert [page for page, _ in pages] == list(range(1, 17))
+    assert max(listing.calls) == 16
+
+
+def test_fanout_starts_at_a_later_page():
+    listing = Listing(12)
+    pages = _pages(PageFanout(listing.read_page, workers=4, first=5))
+    assert [page for page, _ in pages] == list(range(5, 13))
+
+
+def test_fanout_drops_repeated_items_and_redirects_to_page_one():
+    def read_page(page):
+        if page == 1:
+            return ['a', 'b', 'c']
+        if page == 2:
+            return ['c', 'd', 'e']   # the listing shifted by one
+        return ['a', 'b', 'c']       # out of range: the site serves page one again
+    pages = _pages(PageFanout(read_page, workers=2, limit=50))
+    assert pages == [(1, ['a', 'b', 'c']), (2, ['d', 'e'])]
+
+
+def test_fanout_stops_when_the_event_is_set():
+    stop = threading.Event()
+    listing = Listing(50)
+    fanout = PageFanout(listing.read_page, workers=1, stop_event=stop)
+    seen = []
+    try:
+        for page, _ in fanout.pages(key=lambda item: item):
+            seen.append(page)
+            if page == 3:
+                stop.set()
+    finally:
+        fanout.close()
+    assert seen == [1, 2, 3]
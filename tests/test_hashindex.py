@@ -0,0 +1,145 @@
+"""
+HashIndex: no false negatives from the Bloom filter, append-log replay
+across instances, compaction into a new generation, and the ledger's
+rebuild when the index on disk is not the one it recorded.
+"""
+
+import os
+import random
+
+import pytest
+
+from smutscrape import hashindex
+from smutscrape.hashindex import HashIndex, url_hash
+from smutscrape.ledger import DownloadLedger
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'state.db')
+
+
+def _hashes(n, seed=1):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(n)]
+
+
+def test_bloom_filter_has_no_false_negatives(path):
+    hashes = _hashes(20000)
+    index = HashIndex(path)
+    try:
+        index.rebuild(hashes)
+        assert all(h in index for h in hashes)
+        assert len(index) == len(set(hashes))
+        # ~1% false positives are allowed; the sorted array resolves them.
+        assert not any(h in index for h in _hashes(2000, seed=2))
+    finally:
+        index.close()
+
+
+def test_empty_index_contains_nothing(path):
+    index = HashIndex(path)
+    try:
+        assert url_hash('https://a.com/v/1') not in index
+        assert len(index) == 0
+    finally:
+        index.close()
+
+
+def test_log_is_replayed_by_other_and_new_instances(path, monkeypatch):
+    monkeypatch.setattr(hashindex, 'LOG_CHECK_INTERVAL', 0)
+    writer, reader = HashIndex(path), HashIndex(path)
+    try:
+        writer.rebuild([1, 2, 3])
+        writer.add(10)
+        writer.add(11)
+        writer.add(10)
+        assert os.path.getsize(writer.log_path) == 16
+        assert 10 in reader and 11 in reader and 2 in reader
+    finally:
+        writer.close()
+        reader.close()
+    reopened = HashIndex(path)
+    try:
+        assert all(h in reopened for h in (1, 2, 3, 10, 11))
+        assert len(reopened) == 5
+    finally:
+        reopened.close()
+
+
+def test_half_written_log_entry_is_ignored(path):
+    index = HashIndex(path)
+    index.add(7)
+    index.close()
+    with open(index.log_path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    reopened = HashIndex(path)
+    try:
+        assert 7 in reopened and len(reopened) == 1
+    finally:
+        reopened.close()
+
+
+def test_compaction_merges_log_into_a_new_generation(path, monkeypatch):
+    monkeypatch.setattr(hashindex, 'COMPACT_AT', 8)
+    monkeypatch.setattr(hashindex, 'LOG_CHECK_INTERVAL', 0)
+    writer, reader = HashIndex(path), HashIndex(path)
+    try:
+        token = writer.rebuild(range(100, 200))
+        assert 150 in reader
+        mapped = {reader.idx_path}
+        replaced = []
+        real_replace = os.replace
+        monkeypatch.setattr(hashindex.os, 'replace', lambda src, dst: (replaced.append(dst), real_replace(src, dst)))
+        for h in range(8):
+            writer.add(h)
+        # Compacted without replacing the file the reader has mapped.
+        assert os.path.getsize(writer.log_path) == 0
+        assert writer.idx_path not in mapped and not mapped & set(replaced)
+        assert writer.token == token
+        assert all(h in writer for h in list(range(8)) + list(range(100, 200)))
+        assert all(h in reader for h in range(8)) and reader.idx_path == writer.idx_path
+        assert [p for _, p in writer._generations()] == [writer.idx_path]
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_old_generation_still_mapped_is_kept_until_later(path, monkeypatch):
+    writer = HashIndex(path)
+    try:
+        writer.rebuild([1])
+        first = writer.idx_path
+        real_remove = os.remove
+
+        def refuse(p):
+            if p == first:
+                raise PermissionError(p)
+            real_remove(p)
+        monkeypatch.setattr(hashindex.os, 'remove', refuse)
+        writer.rebuild([2])
+        assert os.path.exists(first) and writer.idx_path != first
+        monkeypatch.setattr(hashindex.os, 'remove', real_remove)
+        writer.rebuild([3])
+        assert not os.path.exists(first)
+        assert 3 in writer and 1 not in writer
+    finally:
+        writer.close()
+
+
+def test_ledger_rebuilds_an_index_with_a_stale_token(path):
+    ledger = DownloadLedger(path)
+    ledger.add('https://a.com/v/1')
+    ledger.close()
+
+    # Another index (say, restored from a backup) takes the ledger's place.
+    index = HashIndex(path)
+    index.rebuild([])
+    index.close()
+
+    ledger = DownloadLedger(path)
+    try:
+        assert url_hash('https://a.com/v/1') in ledger._index
+        assert 'https://a.com/v/1' in ledger
+    finally:
+        ledger.close()
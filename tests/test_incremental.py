@@ -0,0 +1,217 @@
+"""
+IncrementalSync and DateCutoff decide when a listing stops early; a wrong
+answer silently ends a scrape before its new videos. Covers the
+high-water mark, pinned items, date parsing for the cutoff and runs that
+end before the listing does.
+"""
+
+import datetime
+
+import pytest
+
+from smutscrape import core
+from smutscrape.core import parse_date_loose
+from smutscrape.incremental import DateCutoff, IncrementalSync
+from smutscrape.ledger import DONE, FAILED, DownloadLedger
+
+QUERY = 'ml:tag:foo'
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = DownloadLedger(str(tmp_path / 'state.db'))
+    yield ledger
+    ledger.close()
+
+
+def _url(n):
+    return f"https://a.com/v/{n}"
+
+
+def _walk(sync, items):
+    """Feed (n, known) items on one page; the index of the item that stopped it, or None."""
+    sync.begin_page()
+    for i, (n, known) in enumerate(items):
+        if sync.see(_url(n), _url(n), None, known):
+            return i
+    sync.end_page()
+    return None
+
+
+# ---------------------------------------------------------------------------
+# IncrementalSync
+# ---------------------------------------------------------------------------
+
+def test_stops_at_the_last_runs_newest_video(ledger):
+    ledger.set_watermark(QUERY, _url(5), _url(5))
+    sync = IncrementalSync(QUERY, ledger, known_items=10)
+    assert _walk(sync, [(8, False), (7, False), (6, True), (5, True), (4, True)]) == 3
+    assert sync.stopped and 'newest video' in sync.reason
+
+
+@pytest.mark.parametrize('known_items,items,stop_at', [
+    (3, [(1, True), (2, True), (3, True), (4, False)], 2),
+    (3, [(1, True), (2, True), (3, False), (4, True), (5, True), (6, True)], 5),
+    (3, [(1, False), (2, True), (3, True), (4, False), (5, True)], None),
+    (1, [(1, False), (2, True)], 1),
+])
+def test_known_items_in_a_row(known_items, items, stop_at):
+    sync = IncrementalSync(QUERY, None, known_items=known_items)
+    assert _walk(sync, items) == stop_at
+    assert sync.stopped == (stop_at is not None)
+
+
+def test_page_of_only_known_videos_stops():
+    sync = IncrementalSync(QUERY, None, known_items=10)
+    assert _walk(sync, [(1, True), (2, True)]) is None
+    assert sync.stopped and 'every video' in sync.reason
+
+
+def test_pinned_known_videos_do_not_stop_or_become_the_mark(ledger):
+    for n in (100, 101, 3, 2, 1):
+        ledger.add(_url(n))
+    sync = IncrementalSync(QUERY, ledger, known_items=3)
+    # Two sticky videos sit above the new ones on every run.
+    items = [(100, True), (101, True), (5, False), (4, False), (3, True), (2, True), (1, True)]
+    assert _walk(sync, items) == 6
+    ledger.add(_url(5))
+    ledger.add(_url(4))
+    sync.finish()
+    assert ledger.watermark(QUERY)['newest_url'] == _url(5)
+
+    # The next run gets past the pinned videos to the newer ones again.
+    ledger.add(_url(6))
+    sync = IncrementalSync(QUERY, ledger, known_items=3)
+    assert _walk(sync, [(100, True), (101, True), (7, False), (6, True), (5, True)]) == 4
+
+
+def test_listing_with_nothing_new_keeps_the_mark(ledger):
+    ledger.set_watermark(QUERY, _url(1), _url(1))
+    ledger.add(_url(100))
+    ledger.add(_url(1))
+    sync = IncrementalSync(QUERY, ledger, known_items=10)
+    _walk(sync, [(100, True), (1, True)])
+    sync.finish()
+    assert ledger.watermark(QUERY)['newest_url'] == _url(1)
+
+
+def test_failed_newest_video_stays_above_the_mark(ledger):
+    sync = IncrementalSync(QUERY, ledger, known_items=10)
+    _walk(sync, [(3, False), (2, False), (1, False)])
+    ledger.record(_url(3), FAILED, attempt=True)
+    ledger.record(_url(2), DONE)
+    sync.finish()
+    assert ledger.watermark(QUERY)['newest_url'] == _url(2)
+
+
+def test_aborted_run_keeps_the_mark(ledger):
+    ledger.set_watermark(QUERY, _url(1), _url(1))
+    sync = IncrementalSync(QUERY, ledger, known_items=10)
+    _walk(sync, [(3, False), (2, False)])
+    ledger.add(_url(3))
+    sync.abort("page 2 could not be read")
+    sync.finish()
+    assert ledger.watermark(QUERY)['newest_url'] == _url(1)
+
+
+def test_run_not_started_on_page_one_keeps_the_mark(ledger):
+    sync = IncrementalSync(QUERY, ledger, known_items=10, record_newest=False)
+    _walk(sync, [(3, False)])
+    ledger.add(_url(3))
+    sync.finish()
+    assert ledger.watermark(QUERY) is None
+
+
+def test_unreadable_page_aborts_the_run(monkeypatch):
+    monkeypatch.setattr(core, 'browser_fetches', lambda *a: False)
+    monkeypatch.setattr(core, '_scrape_list_page', lambda *a: None)
+    sync = IncrementalSync(QUERY, None)
+    assert core.process_list_page(_url('list'), {'name': 'A'}, {}, page_num=2, incremental=sync) == \
+        (None, None, False)
+    assert sync.aborted
+
+
+# ---------------------------------------------------------------------------
+# Dates
+# ---------------------------------------------------------------------------
+
+TODAY = datetime.date.today()
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('2024-03-15', datetime.date(2024, 3, 15)),
+    ('2024-03-15T10:20:30', datetime.date(2024, 3, 15)),
+    ('20240315', datetime.date(2024, 3, 15)),
+    ('March 15, 2024', datetime.date(2024, 3, 15)),
+    ('15 Mar 2024', datetime.date(2024, 3, 15)),
+    ('2024-03', datetime.date(2024, 3, 1)),
+    ('March 2024', datetime.date(2024, 3, 1)),
+    ('2024', datetime.date(2024, 1, 1)),
+    ('Added 2024/02', datetime.date(2024, 2, 1)),
+    ('today', TODAY),
+    ('Yesterday', TODAY - datetime.timedelta(days=1)),
+    ('5 hours ago', TODAY),
+    ('3 days ago', TODAY - datetime.timedelta(days=3)),
+    ('an hour ago', TODAY),
+    ('a week ago', TODAY - datetime.timedelta(days=7)),
+    ('2 weeks ago', TODAY - datetime.timedelta(days=14)),
+    ('1 month ago', TODAY - datetime.timedelta(days=28)),
+    ('Added 2 years ago', TODAY - datetime.timedelta(days=730)),
+    ('', None),
+    ('soon', None),
+])
+def test_parse_date_loose(text, expected):
+    assert parse_date_loose(text) == expected
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('2024-03', datetime.date(2024, 3, 31)),
+    ('2024-02', datetime.date(2024, 2, 29)),
+    ('March 2024', datetime.date(2024, 3, 31)),
+    ('2024', datetime.date(2024, 12, 31)),
+    ('2024-03-15', datetime.date(2024, 3, 15)),
+    ('3 days ago', TODAY - datetime.timedelta(days=3)),
+])
+def test_parse_date_loose_latest(text, expected):
+    assert parse_date_loose(text, latest=True) == expected
+
+
+def _cut(cutoff, dates):
+    cutoff.begin_page()
+    for i, date in enumerate(dates):
+        if cutoff.see(parse_date_loose(date, latest=True)):
+            return i
+    cutoff.end_page()
+    return None
+
+
+def test_date_cutoff_stops_after_a_run_of_older_videos():
+    cutoff = DateCutoff(TODAY - datetime.timedelta(days=10), old_items=3)
+    dates = ['1 day ago', '5 days ago', '2 weeks ago', '3 weeks ago', '1 month ago', '2 months ago']
+    assert _cut(cutoff, dates) == 4
+    assert cutoff.stopped
+
+
+def test_date_cutoff_tolerates_pinned_old_videos():
+    cutoff = DateCutoff(datetime.date(2024, 3, 1), old_items=3)
+    dates = ['2019-01-01', '2020-05-05', '2024-04-01', '2024-03-20', None, '2024-03-02']
+    assert _cut(cutoff, dates) is None
+    assert not cutoff.stopped
+
+
+def test_date_cutoff_month_dates_in_the_threshold_month_are_not_old():
+    cutoff = DateCutoff(datetime.date(2024, 3, 15), old_items=2)
+    assert _cut(cutoff, ['2024-03', '2024-03', 'March 2024']) is None
+    assert _cut(cutoff, ['2024-02', '2024-01']) == 1
+
+
+def test_date_cutoff_page_of_only_older_videos_stops():
+    cutoff = DateCutoff(datetime.date(2024, 3, 1), old_items=10)
+    assert _cut(cutoff, ['2023-01-01', '20 years ago']) is None
+    assert cutoff.stopped
+
+
+def test_date_cutoff_ignores_undated_videos():
+    cutoff = DateCutoff(datetime.date(2024, 3, 1), old_items=1)
+    assert _cut(cutoff, [None, 'soon', '']) is None
+    assert not cutoff.stopped
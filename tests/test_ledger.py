@@ -0,0 +1,162 @@
+"""
+DownloadLedger: the set behaviour the old ``.state`` callers rely on, the
+legacy file import, re-keying when declared URL rules change, and WAL
+persistence across connections.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from smutscrape import utilities
+from smutscrape.ledger import DONE, DOWNLOADING, FAILED, DownloadLedger
+from smutscrape.utilities import register_canonical_rules
+
+
+@pytest.fixture(autouse=True)
+def clean_rules(monkeypatch):
+    monkeypatch.setattr(utilities, '_canonical_rules', {})
+    monkeypatch.setattr(utilities, '_rules_by_site', {})
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = DownloadLedger(str(tmp_path / 'state.db'))
+    yield ledger
+    ledger.close()
+
+
+def test_set_semantics(ledger):
+    ledger.add('https://a.com/v/1')
+    ledger.add('http://www.a.com/v/1/')   # same canonical key
+    ledger.add('https://a.com/v/2')
+    assert 'https://a.com/v/1' in ledger
+    assert 'http://a.com/v/1#t=3' in ledger
+    assert 'https://a.com/v/3' not in ledger
+    assert None not in ledger and 42 not in ledger
+    assert len(ledger) == 2
+    assert sorted(ledger) == ['https://a.com/v/1', 'https://a.com/v/2']
+    assert not ledger.isdisjoint({'https://a.com/v/2'})
+
+    ledger.discard('https://a.com/v/2')
+    ledger.discard('https://a.com/v/never')
+    assert 'https://a.com/v/2' not in ledger and len(ledger) == 1
+    with pytest.raises(KeyError):
+        ledger.remove('https://a.com/v/2')
+
+
+def test_only_done_records_are_members(ledger):
+    ledger.record('https://a.com/v/1', DOWNLOADING, site='a', attempt=True)
+    ledger.record('https://a.com/v/2', FAILED, site='a', attempt=True)
+    assert 'https://a.com/v/1' not in ledger and 'https://a.com/v/2' not in ledger
+    assert len(ledger) == 0
+    ledger.record('https://a.com/v/1', DONE, size=10, path='/x.mp4')
+    record = ledger.get('https://a.com/v/1')
+    assert (record['status'], record['site'], record['attempts'], record['bytes']) == (DONE, 'a', 1, 10)
+    assert 'https://a.com/v/1' in ledger
+
+
+def test_imports_legacy_state_file_once(tmp_path):
+    state = tmp_path / '.state'
+    state.write_text('https://a.com/v/1\n\nhttps://a.com/v/2\n', encoding='utf-8')
+    ledger = DownloadLedger(str(tmp_path / 'state.db'), state_file=str(state))
+    try:
+        assert {'https://a.com/v/1', 'https://a.com/v/2'} <= set(ledger)
+        assert ledger.import_state_file(str(state)) == 0
+
+        # An older version appending to the file is picked up again.
+        with open(state, 'a', encoding='utf-8') as f:
+            f.write('https://a.com/v/3\nhttps://a.com/v/1\n')
+        os.utime(state, ns=(1, 1))
+        assert ledger.import_state_file(str(state)) == 1
+        assert 'https://a.com/v/3' in ledger and len(ledger) == 3
+        assert state.exists()
+    finally:
+        ledger.close()
+
+
+def test_missing_state_file_is_ignored(ledger, tmp_path):
+    assert ledger.import_state_file(str(tmp_path / 'nope')) == 0
+
+
+def _declare_video_id(pattern='/watch/{any}/{video}', video_id='any'):
+    register_canonical_rules({'shortcode': 'a', 'base_url': 'https://a.com', 'domain': 'n/a',
+                              'modes': {'video': {'url_pattern': pattern}},
+                              'canonical': {'video_id': video_id}})
+
+
+def test_no_rekey_without_declared_rules(tmp_path):
+    path = str(tmp_path / 'state.db')
+    ledger = DownloadLedger(path)
+    ledger.add('https://a.com/watch/1/slug')
+    ledger.close()
+    register_canonical_rules({'shortcode': 'a', 'base_url': 'https://a.com', 'domain': 'n/a',
+                              'modes': {'video': {'url_pattern': '/watch/{any}/{video}'}}})
+    ledger = DownloadLedger(path)
+    try:
+        assert 'https://a.com/watch/1/slug' in ledger
+        conn = sqlite3.connect(path)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        assert 'downloads_before_rekey' not in tables
+    finally:
+        ledger.close()
+
+
+def test_rekey_keeps_colliding_rows_and_backs_up(tmp_path):
+    path = str(tmp_path / 'state.db')
+    ledger = DownloadLedger(path)
+    ledger.add('https://a.com/watch/1/old-title')
+    ledger.record('https://a.com/watch/1/new-title', FAILED, attempt=True)
+    ledger.record('https://a.com/watch/2/other', DOWNLOADING, attempt=True)
+    ledger.close()
+
+    _declare_video_id()
+    ledger = DownloadLedger(path)
+    try:
+        conn = sqlite3.connect(path)
+        rows = dict(conn.execute("SELECT url, status FROM downloads").fetchall())
+        keys = dict(conn.execute("SELECT url, key FROM downloads").fetchall())
+        backup = conn.execute("SELECT COUNT(*) FROM downloads_before_rekey").fetchone()[0]
+        conn.close()
+        # Nothing merged: every row and its status survives.
+        assert rows == {'https://a.com/watch/1/old-title': DONE,
+                        'https://a.com/watch/1/new-title': FAILED,
+                        'https://a.com/watch/2/other': DOWNLOADING}
+        assert backup == 3
+        assert keys['https://a.com/watch/2/other'] == 'video:a.com/2'
+        assert sorted(k.startswith('video:') for u, k in keys.items() if '/watch/1/' in u) == [False, True]
+        # A second open under the same rules leaves the table alone.
+        assert ledger.rekey() == 0
+    finally:
+        ledger.close()
+
+
+def test_rekey_moves_rows_whose_key_frees_up(ledger):
+    ledger.add('https://a.com/watch/1/x')
+    _declare_video_id()
+    assert ledger.rekey() == 1
+    assert 'https://a.com/watch/1/renamed' in ledger
+
+
+def test_wal_writes_are_visible_to_a_second_open(tmp_path):
+    path = str(tmp_path / 'state.db')
+    writer = DownloadLedger(path)
+    try:
+        writer.add('https://a.com/v/1')
+        writer.flush()
+        assert os.path.exists(f"{path}-wal")
+        reader = DownloadLedger(path)
+        try:
+            assert 'https://a.com/v/1' in reader
+            assert reader._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        finally:
+            reader.close()
+    finally:
+        writer.close()
+    reopened = DownloadLedger(path)
+    try:
+        assert 'https://a.com/v/1' in reopened and len(reopened) == 1
+    finally:
+        reopened.close()
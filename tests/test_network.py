@@ -0,0 +1,194 @@
+"""
+RateLimiter and RetryPolicy on an injected clock, and how http_get acts on
+a server's Retry-After.
+"""
+
+import email.utils
+
+import pytest
+
+from smutscrape import network
+from smutscrape.network import RateLimiter, RetryPolicy
+
+
+class FakeClock:
+    """A clock that only moves when slept on."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+
+class Upper:
+    """Jitter source that always picks the top of the range."""
+
+    @staticmethod
+    def uniform(low, high):
+        return high
+
+
+class Lower:
+    @staticmethod
+    def uniform(low, high):
+        return low
+
+
+class Response:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = dict(headers or {})
+        self.content = b'ok'
+        self.text = 'ok'
+
+    def raise_for_status(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# RateLimiter
+# ---------------------------------------------------------------------------
+
+def _limiter(clock, rng=Lower):
+    return RateLimiter(clock=clock, sleep=clock.sleep, rng=rng)
+
+
+def test_burst_is_free_then_requests_are_spaced():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    rate = {'rps': 2, 'burst': 3, 'jitter': 0}
+    waits = [limiter.acquire('https://a.com/1', rate) for _ in range(6)]
+    assert waits == [0, 0, 0, 0.5, 0.5, 0.5]
+    assert clock.now == pytest.approx(1001.5)
+
+
+def test_idle_host_refills_its_bucket():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    rate = {'rps': 0.5, 'burst': 2, 'jitter': 0}
+    assert [limiter.acquire('https://a.com/', rate) for _ in range(2)] == [0, 0]
+    clock.now += 60   # e.g. a long download
+    assert [limiter.acquire('https://a.com/', rate) for _ in range(3)] == [0, 0, 2.0]
+
+
+def test_hosts_have_separate_buckets():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    rate = {'rps': 1, 'burst': 1, 'jitter': 0}
+    assert limiter.acquire('https://a.com/', rate) == 0
+    assert limiter.acquire('https://B.com/x', rate) == 0
+    assert limiter.acquire('https://a.com/y', rate) == 1.0
+
+
+def test_waiting_callers_reserve_consecutive_slots():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, sleep=lambda seconds: None, rng=Lower)   # nobody's clock moves
+    rate = {'rps': 1, 'burst': 1, 'jitter': 0}
+    assert [limiter.acquire('https://a.com/', rate) for _ in range(4)] == [0, 1.0, 2.0, 3.0]
+
+
+def test_jitter_is_added_only_to_real_waits():
+    clock = FakeClock()
+    limiter = _limiter(clock, rng=Upper)
+    rate = {'rps': 1, 'burst': 1, 'jitter': 0.25}
+    assert limiter.acquire('https://a.com/', rate) == 0
+    assert limiter.acquire('https://a.com/', rate) == 1.25
+
+
+def test_pace_spaces_hits_to_a_host():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    assert limiter.pace('https://a.com/', 3) == 0   # never hit
+    limiter.acquire('https://a.com/', {'rps': 100, 'burst': 5, 'jitter': 0})
+    clock.now += 1
+    assert limiter.pace('https://a.com/next', 3) == pytest.approx(2.0)
+    assert limiter.pace('https://a.com/next', 3) == 0
+
+
+# ---------------------------------------------------------------------------
+# RetryPolicy
+# ---------------------------------------------------------------------------
+
+def test_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy({'base_delay': 2, 'max_delay': 20}, rng=Upper)
+    assert [policy.delay_for(attempt) for attempt in range(6)] == [2, 4, 8, 16, 20, 20]
+    assert RetryPolicy({'base_delay': 2}, rng=Lower).delay_for(3) == 0
+
+
+def test_retry_after_seconds_is_not_capped():
+    policy = RetryPolicy({'max_delay': 60}, rng=Upper)
+    assert policy.delay_for(0, Response(429, {'Retry-After': '120'})) == 120
+    assert policy.delay_for(0, Response(429, {'Retry-After': ' 5 '})) == 5
+
+
+def test_retry_after_http_date_uses_the_clock():
+    clock = FakeClock(now=1_700_000_000.0)
+    policy = RetryPolicy(clock=clock, rng=Upper)
+    header = email.utils.formatdate(clock.now + 90, usegmt=True)
+    assert policy.delay_for(0, Response(503, {'Retry-After': header})) == pytest.approx(90)
+    past = email.utils.formatdate(clock.now - 90, usegmt=True)
+    assert policy.delay_for(0, Response(503, {'Retry-After': past})) == 0
+
+
+def test_unparseable_retry_after_falls_back_to_backoff():
+    policy = RetryPolicy({'base_delay': 3}, rng=Upper)
+    assert policy.delay_for(0, Response(429, {'Retry-After': 'soon'})) == 3
+    assert policy.delay_for(1, Response(429)) == 6
+
+
+def test_settings_are_clamped():
+    policy = RetryPolicy({'max_attempts': 0})
+    assert policy.max_attempts == 1
+
+
+# ---------------------------------------------------------------------------
+# http_get and Retry-After
+# ---------------------------------------------------------------------------
+
+class Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.headers = {}
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    slept = []
+    monkeypatch.setattr(network, 'throttle', lambda *a, **k: 0.0)
+    monkeypatch.setattr(network.time, 'sleep', slept.append)
+    monkeypatch.setattr(network, 'fetch_stats', {})
+
+    def install(responses):
+        session = Session(responses)
+        monkeypatch.setattr(network, 'get_http_session', lambda *a, **k: session)
+        return session
+    return install, slept
+
+
+def test_http_get_waits_out_a_long_retry_after(fake_fetch):
+    install, slept = fake_fetch
+    session = install([Response(429, {'Retry-After': '120'}), Response(200)])
+    site = {'shortcode': 'ra1', 'retry': {'max_delay': 10, 'budget': 300}}
+    assert network.http_get('https://a.com/', site).status_code == 200
+    assert slept == [120] and session.calls == 2
+
+
+def test_http_get_gives_up_when_retry_after_exceeds_the_budget(fake_fetch):
+    install, slept = fake_fetch
+    session = install([Response(429, {'Retry-After': '3600'}), Response(200)])
+    site = {'shortcode': 'ra2', 'retry': {'budget': 300}}
+    assert network.http_get('https://a.com/', site) is None
+    assert slept == [] and session.calls == 1
+    stats = network.get_fetch_stats('ra2')
+    assert (stats.failures, stats.retries, stats.backoff_seconds) == (1, 0, 0)
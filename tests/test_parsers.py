@@ -0,0 +1,302 @@
+"""
+Parser backend compatibility: every selector in sites/*.yaml must give the
+same results through html.parser, lxml and the selectolax LexborNode
+adapter (including the soupsieve fallback for :contains()).
+
+Pages are synthesised from each site's own selectors, so the tests need no
+network access and follow the YAML files as they change.
+"""
+
+import glob
+import os
+import re
+
+import pytest
+import yaml
+
+from smutscrape.extraction import compile_plan
+from smutscrape.parsers import (
+    PARSERS, SELECTOLAX_AVAILABLE, _COMPOUND_PART_RE, _TAG_RE, _split_top_level, make_soup,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE_FILES = sorted(glob.glob(os.path.join(ROOT, 'sites', '*.yaml')))
+BACKENDS = [p for p in PARSERS if p != 'selectolax' or SELECTOLAX_AVAILABLE]
+
+VOID_TAGS = {'meta', 'link', 'img', 'input', 'br', 'source', 'hr'}
+HEAD_TAGS = {'title', 'meta', 'link'}
+TABLE_PARENTS = {'tr': ('table', 'tbody'), 'td': ('table', 'tbody', 'tr'), 'th': ('table', 'tbody', 'tr'),
+                 'tbody': ('table',), 'thead': ('table',)}
+_PSEUDO_RE = re.compile(r":(?:-soup-)?contains\(\s*(['\"])(.*?)\1\s*\)|:has\((.*)\)|:[\w-]+(?:\([^)]*\))?")
+
+# soupsieve deprecates :contains() in favour of :-soup-contains(); the site YAMLs use the former.
+pytestmark = pytest.mark.filterwarnings("ignore:The pseudo class '.contains' is deprecated:FutureWarning")
+
+
+def _load_site(path):
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    return config if isinstance(config, dict) and config.get('scrapers') else None
+
+
+SITES = [(os.path.basename(p), c) for p, c in ((p, _load_site(p)) for p in SITE_FILES) if c]
+
+
+# ---------------------------------------------------------------------------
+# Page synthesis
+# ---------------------------------------------------------------------------
+
+def _selectors(config):
+    if isinstance(config, str):
+        return [config]
+    if isinstance(config, dict) and config.get('selector'):
+        selector = config['selector']
+        return list(selector) if isinstance(selector, list) else [selector]
+    return []
+
+
+def _element(compound, text, inner=''):
+    """Markup for one compound selector, e.g. "a.title[href*='/watch/']"."""
+    contains = []
+    has = []
+
+    def strip_pseudo(m):
+        if m.group(2) is not None:
+            contains.append(m.group(2))
+        elif m.group(3) is not None:
+            has.append(m.group(3))
+        return ''
+
+    compound = _PSEUDO_RE.sub(strip_pseudo, compound).strip()
+    tag = _tag(compound) or 'div'
+    tag_match = _TAG_RE.match(compound)
+    attrs, classes = {}, []
+    # Kept case-sensitive: html.parser pages are matched in quirks mode, the others are not.
+    for part in _COMPOUND_PART_RE.finditer(compound[tag_match.end() if tag_match else 0:]):
+        if part.group(1) == '#':
+            attrs['id'] = part.group(2)
+        elif part.group(1) == '.':
+            classes.append(part.group(2))
+        else:
+            value = next((g for g in part.group(5, 6, 7) if g is not None), '')
+            op = part.group(4)
+            attrs[part.group(3)] = {'*=': f"x{value}x", '^=': f"{value}x", '$=': f"x{value}"}.get(op, value)
+    if classes:
+        attrs['class'] = ' '.join(classes)
+    if tag == 'a':
+        attrs.setdefault('href', f"/watch/{abs(hash(text)) % 10000}")
+    if tag in ('img', 'source'):
+        attrs.setdefault('src', f"/thumb/{abs(hash(text)) % 10000}.jpg")
+    attributes = ''.join(f' {k}="{v}"' for k, v in attrs.items())
+    if tag in VOID_TAGS:
+        return f"<{tag}{attributes} content=\"{text}\">"
+    body = ' '.join(contains + [text]) + ''.join(_chain(h, text) for h in has) + inner
+    return f"<{tag}{attributes}>{body}</{tag}>"
+
+
+def _tag(compound):
+    m = _TAG_RE.match(_PSEUDO_RE.sub('', compound).strip())
+    return m.group(1).lower() if m and m.group(1) != '*' else None
+
+
+def _chain(selector, text):
+    """Nested markup that the selector (descendant/child combinators only) matches."""
+    compounds = [c for c in _split_top_level(selector.strip(), ' \t\n>') or [] if c.strip()]
+    compounds = [c for c in compounds if (_tag(c) or '') not in ('html', 'body', 'head')]
+    if not compounds:
+        return ''
+    markup = ''
+    for i, compound in enumerate(reversed(compounds)):
+        markup = _element(compound, text if i == 0 else '', markup)
+    first = _tag(compounds[0])
+    for parent in reversed(TABLE_PARENTS.get(first, ())):
+        markup = f"<{parent}>{markup}</{parent}>"
+    return markup
+
+
+def _generatable(selector):
+    if '|' in selector or '+' in selector or '~' in selector:
+        return False
+    return _split_top_level(selector, ',') is not None
+
+
+def _markup_for(selectors, text):
+    head, body = [], []
+    for selector in selectors:
+        if not _generatable(selector):
+            continue
+        alternative = _split_top_level(selector, ',')[0].strip()
+        leaf = _tag(alternative.split()[-1].split('>')[-1])
+        (head if leaf in HEAD_TAGS or alternative.startswith('head') else body).append(_chain(alternative, text))
+    return head, body
+
+
+def _video_page(site):
+    fields = site['scrapers'].get('video_scraper') or {}
+    head, body = [], []
+    for name, config in fields.items():
+        h, b = _markup_for(_selectors(config), f"{name} value")
+        head += h
+        body += b
+    return f"<html><head>{''.join(head)}</head><body>{''.join(body)}</body></html>"
+
+
+def _list_page(list_scraper, items=3):
+    fields = list_scraper['video_item'].get('fields') or {}
+    rows = []
+    for n in range(items):
+        item = _split_top_level(list_scraper['video_item']['selector'], ',')[0].strip()
+        compounds = [c for c in _split_top_level(item, ' \t\n>') if c.strip()]
+        cells = []
+        for name, config in fields.items():
+            # An <a> inside an <a> item is split apart by every parser; real pages never do it.
+            cells += [cell for cell in _markup_for(_selectors(config), f"{name} {n}")[1]
+                      if not (re.search(r'<a[\s>]', cell) and any(_tag(c) == 'a' for c in compounds))]
+        markup = ''.join(cells)
+        for i, compound in enumerate(reversed(compounds)):
+            markup = _element(compound, '', markup)
+        rows.append(markup)
+    container = _selectors(list_scraper['video_container'])[0]
+    compounds = [c for c in _split_top_level(container, ' \t\n>') if c.strip()]
+    compounds = [c for c in compounds if (_tag(c) or '') not in ('html', 'body')]
+    markup = ''.join(rows)
+    for compound in reversed(compounds):
+        markup = _element(compound, '', markup)
+    pagination = list_scraper.get('pagination') or {}
+    next_page = ''.join(_markup_for(_selectors(pagination.get('next_page')), 'next')[1])
+    return f"<html><head><title>List</title></head><body>{markup}{next_page}</body></html>"
+
+
+# ---------------------------------------------------------------------------
+# Running selectors
+# ---------------------------------------------------------------------------
+
+def _signature(element):
+    return (element.name, (element.get_text(' ', strip=True) if hasattr(element, 'get_text') else ''),
+            element.get('href'), element.get('content'))
+
+
+def _run_selectors(soup, selectors):
+    results = {}
+    for selector in selectors:
+        results[selector] = [_signature(el) for el in soup.select(selector)] if '|' not in selector else None
+    return results
+
+
+def _run_list_page(soup, list_scraper):
+    container = None
+    for selector in _selectors(list_scraper['video_container']):
+        container = soup.select_one(selector)
+        if container is not None:
+            break
+    assert container is not None
+    plan = compile_plan(list_scraper['video_item'].get('fields') or {})
+    items = [plan.extract(el) for el in container.select(list_scraper['video_item']['selector'])]
+    next_cfg = (list_scraper.get('pagination') or {}).get('next_page') or {}
+    next_el = soup.select_one(next_cfg['selector']) if next_cfg.get('selector') else None
+    next_url = next_el.get(next_cfg.get('attribute', 'href')) if next_el is not None else None
+    return items, next_url
+
+
+def _all_field_selectors(site):
+    selectors = []
+    for scraper in site['scrapers'].values():
+        if not isinstance(scraper, dict):
+            continue
+        for key, config in scraper.items():
+            if key in ('video_container', 'video_item', 'pagination'):
+                continue
+            selectors += _selectors(config)
+        item = scraper.get('video_item') or {}
+        for config in (item.get('fields') or {}).values():
+            selectors += _selectors(config)
+    return selectors
+
+
+def _same_across_backends(markup, run):
+    results = {backend: run(make_soup(markup, backend)) for backend in BACKENDS}
+    reference = results[BACKENDS[0]]
+    for backend, result in results.items():
+        assert result == reference, f"{backend} differs from {BACKENDS[0]}"
+    return reference
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize('name,site', SITES, ids=[name for name, _ in SITES])
+def test_video_page_selectors_match(name, site):
+    page = _video_page(site)
+    selectors = _all_field_selectors(site)
+    _same_across_backends(page, lambda soup: _run_selectors(soup, selectors))
+    plan = compile_plan(site['scrapers'].get('video_scraper') or {})
+    _same_across_backends(page, lambda soup: plan.extract(soup))
+
+
+@pytest.mark.parametrize('name,site', [(n, s) for n, s in SITES if 'list_scraper' in s['scrapers']],
+                         ids=[n for n, s in SITES if 'list_scraper' in s['scrapers']])
+def test_list_page_items_match(name, site):
+    list_scraper = site['scrapers']['list_scraper']
+    items, _ = _same_across_backends(_list_page(list_scraper), lambda soup: _run_list_page(soup, list_scraper))
+    assert len(items) == 3
+
+
+TABLE_SCRAPER = {
+    'video_container': {'selector': 'table.videos'},
+    'video_item': {
+        'selector': 'tr.video',
+        'fields': {
+            'url': {'selector': "td.title a", 'attribute': 'href'},
+            'title': "td.title a",
+            'duration': "td:contains('Duration')",
+            'tags': {'selector': "td:contains('Tags') a"},
+        },
+    },
+}
+
+TABLE_PAGE = """<html><body><p>Header row: Duration Tags</p><table class="videos"><tbody>
+<tr class="video"><td class="title"><a href="/v/1">First</a></td><td>Duration 5:00</td>
+  <td>Tags <a>red</a> <a>blue</a></td></tr>
+<tr class="video"><td class="title"><a href="/v/2">Second</a></td><td>Duration 7:30</td>
+  <td>Tags <a>green</a></td></tr>
+</tbody></table></body></html>"""
+
+
+def test_table_row_items_keep_their_own_cells():
+    items, _ = _same_across_backends(TABLE_PAGE, lambda soup: _run_list_page(soup, TABLE_SCRAPER))
+    assert items == [
+        {'url': '/v/1', 'title': 'First', 'duration': 'Duration 5:00', 'tags': ['red', 'blue']},
+        {'url': '/v/2', 'title': 'Second', 'duration': 'Duration 7:30', 'tags': ['green']},
+    ]
+
+
+@pytest.mark.skipif(not SELECTOLAX_AVAILABLE, reason="selectolax is not installed")
+def test_contains_on_table_cell_searches_only_that_cell():
+    soup = make_soup(TABLE_PAGE, 'selectolax')
+    cell = soup.select('tr.video td')[2]
+    assert [a.get_text() for a in cell.select("a:contains('e')")] == ['red', 'blue']
+
+
+@pytest.mark.skipif(not SELECTOLAX_AVAILABLE, reason="selectolax is not installed")
+def test_contains_fallback_reparses_rows_inside_their_table():
+    # A bare <tr> fragment is dropped by HTML5-conformant parsers (newer libxml2);
+    # the re-parse must keep the row's ancestors rather than fall back to the page.
+    row = make_soup(TABLE_PAGE, 'selectolax').select('tr.video')[1]
+    reparsed = row._soupsieve()
+    assert reparsed.name == 'tr'
+    assert [p.name for p in reparsed.parents][:2] == ['tbody', 'table']
+    assert 'First' not in reparsed.get_text()
+
+
+SCRIPT_PAGE = """<html><head><style>body {}</style></head><body>
+<div class="info">1<script>var x=1</script>2<style>.a{}</style>3<noscript>ns</noscript><template>tp</template>t</div>
+<p class="meta"> a <b> b </b><script>z()</script></p></body></html>"""
+
+
+def test_text_leaves_out_script_and_style():
+    def texts(soup):
+        info, meta = soup.select_one('div.info'), soup.select_one('p.meta')
+        return (info.get_text(), info.text, meta.get_text(' ', strip=True), meta.get_text('|'),
+                soup.select_one('p.meta script').get_text())
+    assert _same_across_backends(SCRIPT_PAGE, texts) == ('123nst', '123nst', 'a b', ' a | b ', 'z()')
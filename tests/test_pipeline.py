@@ -0,0 +1,137 @@
+"""
+Pipeline: items drain through every stage, stage errors drop items, a stop
+still accounts for every item, and end-of-input reaches every worker.
+"""
+
+import threading
+import time
+
+import pytest
+
+from smutscrape.pipeline import Pipeline
+
+
+def _run(pipeline, items, timeout=10):
+    """Run the pipeline on a thread so a lost end-of-input fails the test instead of hanging it."""
+    out = {}
+    thread = threading.Thread(target=lambda: out.setdefault('results', pipeline.run(items)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not drain"
+    return out['results']
+
+
+def test_single_workers_keep_order_and_drain_everything():
+    trace = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def func(item):
+            with lock:
+                trace.append((name, item))
+            return item
+        return func
+
+    progress = []
+    pipeline = Pipeline([('a', stage('a'), 1), ('b', stage('b'), 1), ('c', stage('c'), 1)],
+                        queue_size=2, progress_cb=progress.append, total=20)
+    assert _run(pipeline, range(20)) == list(range(20))
+    for name in 'abc':
+        assert [item for stage_name, item in trace if stage_name == name] == list(range(20))
+    # Each item passes a stage only after the one before it.
+    for item in range(20):
+        assert trace.index(('a', item)) < trace.index(('b', item)) < trace.index(('c', item))
+    assert progress == list(range(1, 21))
+
+
+def test_run_returns_only_after_the_last_stage_finished():
+    finished = []
+
+    def slow_finalize(item):
+        time.sleep(0.01)
+        finished.append(item)
+        return item
+
+    pipeline = Pipeline([('page', lambda x: x, 2), ('finalize', slow_finalize, 1)], queue_size=1)
+    results = _run(pipeline, range(10))
+    assert sorted(results) == sorted(finished) == list(range(10))
+
+
+def test_stage_exceptions_and_none_become_drops():
+    def page(item):
+        if item % 3 == 0:
+            raise RuntimeError(f"page {item} broke")
+        return item
+
+    def download(item):
+        return None if item % 3 == 1 else item * 10
+
+    pipeline = Pipeline([('page', page, 2), ('download', download, 2)], total=12)
+    results = _run(pipeline, range(12))
+    assert sorted(results) == [20, 50, 80, 110]
+    assert pipeline.done == 12
+
+
+def test_skip_counts_towards_progress():
+    progress = []
+    pipeline = Pipeline([('page', lambda x: x, 1)], progress_cb=progress.append, total=5)
+
+    def items():
+        pipeline.skip(2)
+        yield from range(3)
+
+    _run(pipeline, items())
+    assert pipeline.done == 5 and max(progress) == 5
+
+
+def test_stop_accounts_for_items_never_fed_in():
+    stop = threading.Event()
+    progress = []
+
+    def page(item):
+        if item == 3:
+            stop.set()
+        return item
+
+    def items():
+        for item in range(100):
+            time.sleep(0.001)
+            yield item
+
+    pipeline = Pipeline([('page', page, 1), ('download', lambda x: x, 2)], queue_size=1,
+                        stop_event=stop, progress_cb=progress.append, total=100)
+    results = _run(pipeline, items())
+    assert len(results) < 100
+    assert pipeline.done == 100
+    assert progress[-1] == 100
+
+
+def test_stop_without_total_counts_only_what_was_fed():
+    stop = threading.Event()
+    stop.set()
+    pipeline = Pipeline([('page', lambda x: x, 1)], stop_event=stop)
+    assert _run(pipeline, range(10)) == []
+    assert pipeline.done == 0
+
+
+@pytest.mark.parametrize('workers', [(1, 1, 1), (4, 1, 1), (1, 4, 3), (5, 5, 5)])
+def test_end_of_input_reaches_every_worker(workers):
+    def slow(item):
+        time.sleep(0.002)
+        return item
+
+    stages = [(name, slow, count) for name, count in zip(('page', 'download', 'finalize'), workers)]
+    before = threading.active_count()
+    pipeline = Pipeline(stages, queue_size=2, total=30)
+    assert sorted(_run(pipeline, range(30))) == list(range(30))
+    assert pipeline.done == 30
+    # Every worker thread has exited.
+    deadline = time.monotonic() + 2
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() <= before
+
+
+def test_empty_input_drains():
+    pipeline = Pipeline([('page', lambda x: x, 3), ('download', lambda x: x, 3)])
+    assert _run(pipeline, []) == []
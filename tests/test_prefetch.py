@@ -0,0 +1,76 @@
+"""
+Prefetcher results, expiry and shutdown, and that every listing run reads
+ahead on its own Prefetcher rather than one shared across runs.
+"""
+
+import threading
+
+from smutscrape import core, prefetch
+from smutscrape.prefetch import Prefetcher
+
+
+def test_take_returns_the_result_once():
+    prefetcher = Prefetcher()
+    try:
+        assert prefetcher.schedule('p2', lambda n: n * 2, 21)
+        assert not prefetcher.schedule('p2', lambda n: n, 0)   # already known
+        assert prefetcher.has('p2')
+        prefetcher._entries['p2'][1].result(timeout=5)
+        assert prefetcher.take('p2') == 42
+        assert prefetcher.take('p2') is None
+    finally:
+        prefetcher.close()
+
+
+def test_failed_work_is_none():
+    prefetcher = Prefetcher()
+    try:
+        prefetcher.schedule('p2', lambda: 1 / 0)
+        prefetcher._entries['p2'][1].exception(timeout=5)
+        assert prefetcher.take('p2') is None
+    finally:
+        prefetcher.close()
+
+
+def test_expired_results_are_dropped(monkeypatch):
+    prefetcher = Prefetcher()
+    try:
+        prefetcher.schedule('p2', lambda: 'page')
+        prefetcher._entries['p2'][1].result(timeout=5)
+        monkeypatch.setattr(prefetch, 'PREFETCH_TTL', -1)
+        assert not prefetcher.has('p2')
+    finally:
+        prefetcher.close()
+
+
+def test_close_cancels_queued_work_and_ends_the_worker():
+    prefetcher = Prefetcher()
+    release = threading.Event()
+    ran = []
+    prefetcher.schedule('p2', release.wait, 5)
+    prefetcher.schedule('p3', ran.append, 3)
+    worker = prefetcher._worker
+    prefetcher.close()
+    release.set()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert ran == [] and not prefetcher.has('p2')
+
+
+def test_each_run_has_its_own_prefetcher(monkeypatch):
+    seen = []
+
+    def process_list_page(url, *args, prefetcher=None, **kwargs):
+        prefetcher.schedule(url, lambda: 'read ahead')
+        seen.append(prefetcher)
+        return None, None, True
+
+    monkeypatch.setattr(core, 'process_list_page', process_list_page)
+    monkeypatch.setattr(core, '_fanout_applies', lambda *a: False)
+    site = {'name': 'A', 'shortcode': 'a'}
+    for _ in range(2):
+        assert core.process_list_pages('https://a.com/list', site, {}, mode='tag', identifier='x')
+    first, second = seen
+    assert first is not second
+    # The first run's pages are gone once it ended.
+    assert not first.has('https://a.com/list') and not second.has('https://a.com/list')
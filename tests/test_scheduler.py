@@ -0,0 +1,62 @@
+"""
+DownloadScheduler stops the processes an in-process yt-dlp download
+starts (ffmpeg merges and downloads), not only its own subprocesses.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from smutscrape.scheduler import DownloadScheduler
+
+yt_dlp_utils = pytest.importorskip('yt_dlp.utils')
+from smutscrape.ytdlp import spawned_processes  # noqa: E402
+
+SLEEPER = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+
+def _wait_for_exit(proc, timeout=10):
+    deadline = time.monotonic() + timeout
+    while proc.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return proc.poll() is not None
+
+
+def test_stop_kills_a_process_yt_dlp_started():
+    scheduler = DownloadScheduler()
+    stop = threading.Event()
+    with scheduler.adopt(stop) as adopt, spawned_processes(adopt):
+        proc = yt_dlp_utils.Popen(SLEEPER)
+        assert proc.pid in scheduler._procs
+        stop.set()
+        assert _wait_for_exit(proc)
+    assert proc.pid not in scheduler._procs
+
+
+def test_process_started_after_the_stop_is_killed():
+    scheduler = DownloadScheduler()
+    stop = threading.Event()
+    stop.set()
+    with scheduler.adopt(stop) as adopt, spawned_processes(adopt):
+        proc = yt_dlp_utils.Popen(SLEEPER)
+        assert _wait_for_exit(proc)
+
+
+def test_cancel_all_reaches_adopted_processes():
+    scheduler = DownloadScheduler()
+    with scheduler.adopt() as adopt, spawned_processes(adopt):
+        proc = yt_dlp_utils.Popen(SLEEPER)
+        scheduler.cancel_all()
+        assert _wait_for_exit(proc)
+
+
+def test_processes_outside_the_block_are_not_adopted():
+    scheduler = DownloadScheduler()
+    with scheduler.adopt() as adopt:
+        with spawned_processes(adopt):
+            pass
+        proc = yt_dlp_utils.Popen([sys.executable, '-c', 'pass'])
+        proc.wait()
+    assert not scheduler._procs